@@ -0,0 +1,50 @@
+"""photo faces
+
+Revision ID: 0c4d8e2b9f37
+Revises: 71d0c2f8a6e9
+Create Date: 2026-02-23 17:40:52.318846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4d8e2b9f37'
+down_revision: Union[str, Sequence[str], None] = '71d0c2f8a6e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('faces_indexed', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table(
+        'photo_faces',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('photo_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('x', sa.Integer(), nullable=False),
+        sa.Column('y', sa.Integer(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['photo_id'], ['photos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_photo_faces_id'), 'photo_faces', ['id'], unique=False)
+    op.create_index(op.f('ix_photo_faces_photo_id'), 'photo_faces', ['photo_id'], unique=False)
+    op.create_index(op.f('ix_photo_faces_event_id'), 'photo_faces', ['event_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_photo_faces_event_id'), table_name='photo_faces')
+    op.drop_index(op.f('ix_photo_faces_photo_id'), table_name='photo_faces')
+    op.drop_index(op.f('ix_photo_faces_id'), table_name='photo_faces')
+    op.drop_table('photo_faces')
+    op.drop_column('photos', 'faces_indexed')
@@ -0,0 +1,28 @@
+"""photos event_id keyset index
+
+Revision ID: 3f1c9a7d2b64
+Revises: 7025bcd668e3
+Create Date: 2026-02-12 10:14:32.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '7025bcd668e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_photos_event_id_id', 'photos', ['event_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_photos_event_id_id', table_name='photos')
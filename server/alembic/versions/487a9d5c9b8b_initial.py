@@ -20,13 +20,113 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # The base tables used to be created by create_all at app import, which left
+    # this revision empty. They are created here so `alembic upgrade head` builds
+    # the full schema on an empty database.
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('full_name', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_superuser', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_full_name'), 'users', ['full_name'], unique=False)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table(
+        'test',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('a', sa.Integer(), nullable=True),
+        sa.Column('b', sa.Integer(), nullable=True),
+        sa.Column('sum', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_test_id'), 'test', ['id'], unique=False)
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('event_type', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('template_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_events_id'), 'events', ['id'], unique=False)
+    op.create_table(
+        'photos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_photos_id'), 'photos', ['id'], unique=False)
+    op.create_index(op.f('ix_photos_title'), 'photos', ['title'], unique=False)
+    op.create_table(
+        'studio_settings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('profile_picture_url', sa.String(), nullable=True),
+        sa.Column('full_name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('job_title', sa.String(), nullable=True),
+        sa.Column('company_name', sa.String(), nullable=False),
+        sa.Column('website_url', sa.String(), nullable=True),
+        sa.Column('business_address', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_studio_settings_email'), 'studio_settings', ['email'], unique=True)
+    op.create_index(op.f('ix_studio_settings_id'), 'studio_settings', ['id'], unique=False)
+    op.create_table(
+        'super_admin_settings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('platform_name', sa.String(), nullable=False),
+        sa.Column('system_domain', sa.String(), nullable=False),
+        sa.Column('support_email', sa.String(), nullable=False),
+        sa.Column('maintenance_mode', sa.Boolean(), nullable=True),
+        sa.Column('total_storage_tb', sa.Float(), nullable=True),
+        sa.Column('active_regions', sa.Integer(), nullable=True),
+        sa.Column('total_assets', sa.Float(), nullable=True),
+        sa.Column('image_compression_enabled', sa.Boolean(), nullable=True),
+        sa.Column('cdn_enabled', sa.Boolean(), nullable=True),
+        sa.Column('default_currency', sa.String(), nullable=True),
+        sa.Column('tax_rate', sa.Float(), nullable=True),
+        sa.Column('stripe_live_key', sa.String(), nullable=True),
+        sa.Column('google_workspace_connected', sa.Boolean(), nullable=True),
+        sa.Column('aws_rekognition_active', sa.Boolean(), nullable=True),
+        sa.Column('whatsapp_api_connected', sa.Boolean(), nullable=True),
+        sa.Column('forced_2fa', sa.Boolean(), nullable=True),
+        sa.Column('session_timeout_minutes', sa.Integer(), nullable=True),
+        sa.Column('auto_approval_enabled', sa.Boolean(), nullable=True),
+        sa.Column('email_notifications_enabled', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_super_admin_settings_id'), 'super_admin_settings', ['id'], unique=False)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f('ix_super_admin_settings_id'), table_name='super_admin_settings')
+    op.drop_table('super_admin_settings')
+    op.drop_index(op.f('ix_studio_settings_id'), table_name='studio_settings')
+    op.drop_index(op.f('ix_studio_settings_email'), table_name='studio_settings')
+    op.drop_table('studio_settings')
+    op.drop_index(op.f('ix_photos_title'), table_name='photos')
+    op.drop_index(op.f('ix_photos_id'), table_name='photos')
+    op.drop_table('photos')
+    op.drop_index(op.f('ix_events_id'), table_name='events')
+    op.drop_table('events')
+    op.drop_index(op.f('ix_test_id'), table_name='test')
+    op.drop_table('test')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_full_name'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,31 @@
+"""event stats photo revision
+
+Revision ID: 4c8e1f7a2d59
+Revises: b6e1c9d74a08
+Create Date: 2026-04-02 10:17:36.842193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e1f7a2d59'
+down_revision: Union[str, Sequence[str], None] = 'b6e1c9d74a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'event_stats',
+        sa.Column('photo_revision', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('event_stats', 'photo_revision')
@@ -0,0 +1,32 @@
+"""photo derivative keys
+
+Revision ID: 5b7e3a90d1c8
+Revises: c51f7e09b2a4
+Create Date: 2026-02-18 09:31:05.662817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e3a90d1c8'
+down_revision: Union[str, Sequence[str], None] = 'c51f7e09b2a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('thumbnail_key', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('preview_key', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('web_key', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('photos', 'web_key')
+    op.drop_column('photos', 'preview_key')
+    op.drop_column('photos', 'thumbnail_key')
@@ -0,0 +1,31 @@
+"""photos event fk cascade
+
+Revision ID: 5e0d7b3a2c91
+Revises: 9a2c6e4f1b87
+Create Date: 2026-03-19 14:22:48.630571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0d7b3a2c91'
+down_revision: Union[str, Sequence[str], None] = '9a2c6e4f1b87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Created unnamed in 7025bcd668e3, so it carries Postgres' default name
+    op.drop_constraint('photos_event_id_fkey', 'photos', type_='foreignkey')
+    op.create_foreign_key('photos_event_id_fkey', 'photos', 'events', ['event_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('photos_event_id_fkey', 'photos', type_='foreignkey')
+    op.create_foreign_key('photos_event_id_fkey', 'photos', 'events', ['event_id'], ['id'])
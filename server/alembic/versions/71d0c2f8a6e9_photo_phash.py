@@ -0,0 +1,28 @@
+"""photo phash
+
+Revision ID: 71d0c2f8a6e9
+Revises: e93a0b4c7d15
+Create Date: 2026-02-21 10:05:17.730264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71d0c2f8a6e9'
+down_revision: Union[str, Sequence[str], None] = 'e93a0b4c7d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('phash', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('photos', 'phash')
@@ -0,0 +1,31 @@
+"""super admin settings version
+
+Revision ID: 8d3b6f1a4e27
+Revises: 1f8a4c6d9e52
+Create Date: 2026-03-24 09:41:52.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3b6f1a4e27'
+down_revision: Union[str, Sequence[str], None] = '1f8a4c6d9e52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'super_admin_settings',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('super_admin_settings', 'version')
@@ -0,0 +1,38 @@
+"""analytics hourly
+
+Revision ID: 9a2c6e4f1b87
+Revises: f6b3e81c0d29
+Create Date: 2026-03-18 11:05:37.214093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2c6e4f1b87'
+down_revision: Union[str, Sequence[str], None] = 'f6b3e81c0d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'analytics_hourly',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id', 'hour', 'kind'),
+    )
+    op.create_index(op.f('ix_analytics_hourly_hour'), 'analytics_hourly', ['hour'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_analytics_hourly_hour'), table_name='analytics_hourly')
+    op.drop_table('analytics_hourly')
@@ -0,0 +1,30 @@
+"""event listing indexes
+
+Revision ID: b4f19c2e7a63
+Revises: 0c4d8e2b9f37
+Create Date: 2026-03-09 11:02:47.630915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4f19c2e7a63'
+down_revision: Union[str, Sequence[str], None] = '0c4d8e2b9f37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_events_status'), 'events', ['status'], unique=False)
+    op.create_index(op.f('ix_events_start_date'), 'events', ['start_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_events_start_date'), table_name='events')
+    op.drop_index(op.f('ix_events_status'), table_name='events')
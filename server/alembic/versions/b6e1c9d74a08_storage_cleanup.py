@@ -0,0 +1,37 @@
+"""storage cleanup
+
+Revision ID: b6e1c9d74a08
+Revises: 8d3b6f1a4e27
+Create Date: 2026-03-25 14:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1c9d74a08'
+down_revision: Union[str, Sequence[str], None] = '8d3b6f1a4e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'storage_cleanup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('multipart_id', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_storage_cleanup_event_id_id', 'storage_cleanup', ['event_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_storage_cleanup_event_id_id', table_name='storage_cleanup')
+    op.drop_table('storage_cleanup')
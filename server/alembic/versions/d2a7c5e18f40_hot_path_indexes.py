@@ -0,0 +1,32 @@
+"""hot path indexes
+
+Revision ID: d2a7c5e18f40
+Revises: b4f19c2e7a63
+Create Date: 2026-03-12 16:27:05.114382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c5e18f40'
+down_revision: Union[str, Sequence[str], None] = 'b4f19c2e7a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing looks photos up by title; the index only slowed down inserts
+    op.drop_index(op.f('ix_photos_title'), table_name='photos')
+    # Deleting a photo sets upload_sessions.photo_id to NULL, which scanned the table
+    op.create_index(op.f('ix_upload_sessions_photo_id'), 'upload_sessions', ['photo_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_sessions_photo_id'), table_name='upload_sessions')
+    op.create_index(op.f('ix_photos_title'), 'photos', ['title'], unique=False)
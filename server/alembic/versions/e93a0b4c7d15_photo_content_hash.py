@@ -0,0 +1,34 @@
+"""photo content hash
+
+Revision ID: e93a0b4c7d15
+Revises: 5b7e3a90d1c8
+Create Date: 2026-02-19 14:22:40.105391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93a0b4c7d15'
+down_revision: Union[str, Sequence[str], None] = '5b7e3a90d1c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('uq_photos_event_id_content_hash', 'photos', ['event_id', 'content_hash'], unique=True)
+    op.add_column('upload_sessions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.alter_column('upload_sessions', 'multipart_id', existing_type=sa.String(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('upload_sessions', 'multipart_id', existing_type=sa.String(), nullable=False)
+    op.drop_column('upload_sessions', 'content_hash')
+    op.drop_index('uq_photos_event_id_content_hash', table_name='photos')
+    op.drop_column('photos', 'content_hash')
@@ -0,0 +1,50 @@
+"""event stats
+
+Revision ID: f6b3e81c0d29
+Revises: d2a7c5e18f40
+Create Date: 2026-03-16 09:48:21.507736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b3e81c0d29'
+down_revision: Union[str, Sequence[str], None] = 'd2a7c5e18f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('photos', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.create_table(
+        'event_stats',
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('photo_count', sa.BigInteger(), nullable=False),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('download_count', sa.BigInteger(), nullable=False),
+        sa.Column('face_search_count', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id'),
+    )
+    # Sizes of photos that came in through resumable uploads are already known
+    op.execute(
+        "UPDATE photos SET size_bytes = upload_sessions.total_size FROM upload_sessions "
+        "WHERE upload_sessions.photo_id = photos.id AND upload_sessions.status = 'completed'"
+    )
+    op.execute(
+        "INSERT INTO event_stats (event_id, photo_count, total_bytes, download_count, face_search_count, updated_at) "
+        "SELECT events.id, count(photos.id), coalesce(sum(photos.size_bytes), 0), 0, 0, now() "
+        "FROM events LEFT JOIN photos ON photos.event_id = events.id GROUP BY events.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_stats')
+    op.drop_column('photos', 'size_bytes')
@@ -3,19 +3,21 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db, get_db
+from app.services.user_cache import get_user_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_read_db),
     token: str = Depends(reusable_oauth2)
 ) -> models.User:
     try:
@@ -28,7 +30,14 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(models.User).filter(models.User.id == int(token_data.sub)).first()
+    cache = get_user_cache()
+    if cache:
+        user = await cache.get(token_data.sub)
+        if user:
+            return user
+    user = await db.get(models.User, int(token_data.sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    if cache:
+        await cache.set(token_data.sub, user)
     return user
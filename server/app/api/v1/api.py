@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Response
 from sqlalchemy.orm import Session
-from app.api.v1.endpoints import photos, studio_settings, super_admin_settings, events, auth
+from app.api.v1.endpoints import photos, studio_settings, super_admin_settings, events, auth, uploads, internal, analytics, jobs
+from app.core import metrics
 from app.db.session import get_db
 from app.models.test import Test
 
@@ -10,7 +11,17 @@ api_router.include_router(studio_settings.router, prefix="/studio-settings", tag
 api_router.include_router(super_admin_settings.router, prefix="/super-admin-settings", tags=["super-admin-settings"])
 api_router.include_router(events.router, prefix="/events", tags=["events"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 @api_router.get("/health", tags=["health"])
 def health_check():
     return {"status": "ok", "message": "Server is healthy"}
+
+@api_router.get("/metrics", tags=["health"])
+def read_metrics():
+    """Prometheus metrics of all API workers (see app/core/metrics.py)."""
+    data, content_type = metrics.render()
+    return Response(content=data, media_type=content_type)
@@ -0,0 +1,105 @@
+import datetime
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.db.session import get_async_read_db
+from app.services import analytics
+
+router = APIRouter()
+
+DEFAULT_RANGE = datetime.timedelta(days=30)
+
+def _utc(at: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    # Rollup hours are stored as naive UTC
+    if at is not None and at.tzinfo is not None:
+        at = at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return at
+
+def _range(since: Optional[datetime.datetime], until: Optional[datetime.datetime]):
+    until = _utc(until) or datetime.datetime.utcnow()
+    return _utc(since) or until - DEFAULT_RANGE, until
+
+def _report(rows, interval: str, since: datetime.datetime, until: datetime.datetime) -> dict:
+    points = analytics.series(rows, interval)
+    totals = {kind: sum(point[kind] for point in points) for kind in analytics.KINDS}
+    return {"interval": interval, "since": since, "until": until, "totals": totals, "points": points}
+
+@router.post("/events/{id}", status_code=202)
+async def track_event_hit(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    id: int,
+    hit_in: schemas.AnalyticsHit,
+) -> Any:
+    """
+    Record a photo view. Buffered in memory and written with the next batch.
+
+    Each client may report ANALYTICS_CLIENT_HITS_PER_MINUTE hits per minute.
+    """
+    client = request.client.host if request.client else "unknown"
+    if not analytics.client_limiter.allow(client):
+        raise HTTPException(status_code=429, detail="Too many analytics hits")
+    if not await db.get(models.Event, id):
+        raise HTTPException(status_code=404, detail="Event not found")
+    analytics.record(id, hit_in.kind)
+    return {"status": "accepted"}
+
+@router.get("/events/{id}", response_model=schemas.AnalyticsReport)
+async def read_event_analytics(
+    *,
+    db: AsyncSession = Depends(get_async_read_db),
+    id: int,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    interval: Literal["hour", "day"] = "day",
+) -> Any:
+    """
+    Views, photo views, downloads and face searches of an event per hour or day (UTC),
+    read from the hourly rollup. Defaults to the last 30 days.
+    """
+    event = await db.get(models.Event, id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    since, until = _range(since, until)
+    result = await db.execute(
+        select(models.AnalyticsHourly.hour, models.AnalyticsHourly.kind, models.AnalyticsHourly.count)
+        .where(
+            models.AnalyticsHourly.event_id == id,
+            models.AnalyticsHourly.hour >= analytics.hour_of(since),
+            models.AnalyticsHourly.hour < until,
+        )
+        .order_by(models.AnalyticsHourly.hour)
+    )
+    return _report(result.all(), interval, since, until)
+
+@router.get("/", response_model=schemas.AnalyticsReport)
+async def read_analytics(
+    *,
+    db: AsyncSession = Depends(get_async_read_db),
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    interval: Literal["hour", "day"] = "day",
+) -> Any:
+    """
+    The same series summed over all events.
+    """
+    since, until = _range(since, until)
+    result = await db.execute(
+        select(
+            models.AnalyticsHourly.hour,
+            models.AnalyticsHourly.kind,
+            func.sum(models.AnalyticsHourly.count),
+        )
+        .where(
+            models.AnalyticsHourly.hour >= analytics.hour_of(since),
+            models.AnalyticsHourly.hour < until,
+        )
+        .group_by(models.AnalyticsHourly.hour, models.AnalyticsHourly.kind)
+        .order_by(models.AnalyticsHourly.hour)
+    )
+    return _report(result.all(), interval, since, until)
@@ -3,6 +3,8 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 from pydantic import ValidationError
@@ -15,19 +17,25 @@ from app.core.config import settings
 router = APIRouter()
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     response: Response,
     user_in: schemas.UserLogin,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
-    if not user or not security.verify_password(user_in.password, user.hashed_password):
+    user = (await db.execute(select(models.User).where(models.User.email == user_in.email))).scalars().first()
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    valid, new_hash = await security.verify_and_update_password(user_in.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
@@ -51,16 +59,16 @@ def login(
     }
 
 @router.post("/register", response_model=schemas.Token)
-def register(
+async def register(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate,
     response: Response
 ) -> Any:
     """
     Create new user without the need to be logged in
     """
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user = (await db.execute(select(models.User).where(models.User.email == user_in.email))).scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
@@ -68,14 +76,14 @@ def register(
         )
     user = models.User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await security.get_password_hash(user_in.password),
         full_name=user_in.full_name,
         is_active=True,
         role="studio"
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     access_token = security.create_access_token(user.id)
     refresh_token = security.create_refresh_token(user.id)
@@ -95,16 +103,16 @@ def register(
     }
 
 @router.post("/super-admin/register", response_model=schemas.Token)
-def register_super_admin(
+async def register_super_admin(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate,
     response: Response
 ) -> Any:
     """
     Create new super admin user
     """
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user = (await db.execute(select(models.User).where(models.User.email == user_in.email))).scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
@@ -112,15 +120,15 @@ def register_super_admin(
         )
     user = models.User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await security.get_password_hash(user_in.password),
         full_name=user_in.full_name,
         is_active=True,
         is_superuser=True,
         role="admin"
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     access_token = security.create_access_token(user.id)
     refresh_token = security.create_refresh_token(user.id)
@@ -193,7 +201,7 @@ def logout(response: Response) -> Any:
     return {"message": "Logged out successfully"}
 
 @router.get("/me", response_model=schemas.User)
-def read_users_me(
+async def read_users_me(
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
@@ -1,22 +1,60 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app import models, schemas
-from app.db.session import get_db
+import bisect
+from datetime import date
+from typing import Any, Dict, Iterator, List, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, File, Header, HTTPException, Path, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from app import crud, models, schemas
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.session import get_async_read_db, get_db, get_read_db, read_session_factory
+from app.services import analytics, dedup, derivatives, downloads, event_cleanup, event_stats, response_cache
+from app.storage import event_prefix, get_storage, is_event_key
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Event])
-def read_events(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=List[schemas.EventSummary])
+async def read_events(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = 0,
     limit: int = 100,
+    status: Optional[str] = None,
+    event_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    q: Optional[str] = None,
+    sort: str = Query("id", pattern=f"^-?({'|'.join(crud.EVENT_SORT_COLUMNS)})$"),
 ) -> Any:
     """
-    Retrieve events.
+    Retrieve events with their photo count and cover photo.
+
+    Filter by `status`, `event_type`, a `date_from`/`date_to` range on the start
+    date and `q` (substring of name or location). `sort` is a column name,
+    prefixed with "-" for descending; ties are broken by id.
     """
-    events = db.query(models.Event).offset(skip).limit(limit).all()
-    return events
+    cached, lookup = await response_cache.lookup(request, db, ["events"])
+    if cached:
+        return cached
+    result = await db.execute(crud.event_summaries_query(
+        status=status,
+        event_type=event_type,
+        date_from=date_from,
+        date_to=date_to,
+        q=q,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+    ))
+    events = [
+        dict(schemas.Event.model_validate(event), photo_count=photo_count, cover_photo=cover)
+        for event, photo_count, cover in result.all()
+    ]
+    return response_cache.store(request, lookup, List[schemas.EventSummary], events)
 
 @router.post("/", response_model=schemas.Event)
 def create_event(
@@ -43,18 +81,41 @@ def create_event(
     return db_obj
 
 @router.get("/{id}", response_model=schemas.Event)
-def read_event(
+async def read_event(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     id: int,
 ) -> Any:
     """
     Get event by ID.
     """
-    event = db.query(models.Event).filter(models.Event.id == id).first()
+    cached, lookup = await response_cache.lookup(request, db, [f"event:{id}"])
+    if cached:
+        return cached
+    event = await db.get(models.Event, id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    return response_cache.store(request, lookup, schemas.Event, event)
+
+@router.get("/{id}/stats", response_model=schemas.EventStats)
+async def read_event_stats(
+    *,
+    db: AsyncSession = Depends(get_async_read_db),
+    id: int,
+) -> Any:
+    """
+    Get an event's photo count, total bytes, downloads and face searches.
+
+    The counters are maintained on write, so this is a single primary-key lookup.
+    """
+    stats = await db.get(models.EventStats, id)
+    if stats:
+        return stats
+    # Events with no photos yet have no stats row
+    if not await db.get(models.Event, id):
+        raise HTTPException(status_code=404, detail="Event not found")
+    return schemas.EventStats(event_id=id)
 
 @router.put("/{id}", response_model=schemas.Event)
 def update_event(
@@ -79,21 +140,38 @@ def update_event(
     db.refresh(event)
     return event
 
-@router.delete("/{id}", response_model=schemas.Event)
+@router.delete("/{id}", response_model=schemas.EventCleanup, status_code=202)
 def delete_event(
     *,
     db: Session = Depends(get_db),
     id: int,
+    background_tasks: BackgroundTasks,
 ) -> Any:
     """
-    Delete an event.
+    Delete an event with all its photos.
+
+    The rows are gone when this returns; stored files are removed in the background.
+    Poll `/{id}/cleanup` for progress.
     """
-    event = db.query(models.Event).filter(models.Event.id == id).first()
-    if not event:
+    if not db.query(models.Event.id).filter(models.Event.id == id).first():
         raise HTTPException(status_code=404, detail="Event not found")
-    db.delete(event)
-    db.commit()
-    return event
+    job = event_cleanup.delete_event(db, id)
+    if not settings.JOB_QUEUE_ENABLED:
+        background_tasks.add_task(event_cleanup.clean_storage, job)
+    return job
+
+@router.get("/{id}/cleanup", response_model=schemas.EventCleanup)
+def read_event_cleanup(
+    *,
+    id: int,
+) -> Any:
+    """
+    Progress of removing a deleted event's stored files (tracked by the worker that deleted it).
+    """
+    job = event_cleanup.get_job(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Cleanup job not found")
+    return job
 
 @router.post("/{id}/photos", response_model=schemas.Photo)
 def create_event_photo(
@@ -108,31 +186,414 @@ def create_event_photo(
     event = db.query(models.Event).filter(models.Event.id == id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    
+    if photo_in.storage_key and not is_event_key(id, photo_in.storage_key):
+        raise HTTPException(status_code=422, detail=f"storage_key must be under {event_prefix(id)}")
+
+    try:
+        stored = dedup.check_object(db, id, photo_in.storage_key, photo_in.content_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    content_hash = stored.content_hash
+    # Re-adding a file the event already has returns the existing photo
+    duplicate = dedup.get_duplicate(db, id, content_hash)
+    if duplicate:
+        return duplicate
+
     db_photo = models.Photo(
         title=photo_in.title,
         url=photo_in.url,
+        storage_key=photo_in.storage_key,
+        content_hash=content_hash,
+        size_bytes=stored.size_bytes,
         event_id=id
     )
     db.add(db_photo)
-    db.commit()
+    event_stats.increment(db, id, photo_count=1, total_bytes=stored.size_bytes or 0, photo_revision=1)
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same file was added concurrently
+        db.rollback()
+        duplicate = dedup.get_duplicate(db, id, content_hash)
+        if not duplicate:
+            raise
+        return duplicate
     db.refresh(db_photo)
+    derivatives.schedule([(id, db_photo.id, db_photo.storage_key)])
     return db_photo
 
-@router.get("/{id}/photos", response_model=List[schemas.Photo])
-def read_event_photos(
+@router.post("/{id}/photos:batch", response_model=schemas.PhotoBatchResult)
+def create_event_photos_batch(
     *,
     db: Session = Depends(get_db),
     id: int,
+    items: List[Any] = Body(...),
+) -> Any:
+    """
+    Add many photos to an event in one transaction.
+
+    Invalid items are reported by index in `errors`; the valid ones are still inserted.
+    Items whose stored file the event already has are reported in `duplicates`
+    with the existing photo's id.
+    """
+    if len(items) > settings.PHOTO_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.PHOTO_BATCH_MAX_ITEMS} items",
+        )
+    event = db.query(models.Event).filter(models.Event.id == id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    errors: List[schemas.PhotoBatchError] = []
+    valid: List[Any] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(schemas.PhotoBatchError(
+                index=index,
+                errors=[{"loc": [], "msg": "Item must be an object", "type": "dict_type"}],
+            ))
+            continue
+        try:
+            photo_in = schemas.PhotoCreate.model_validate({**item, "event_id": id})
+        except ValidationError as e:
+            errors.append(schemas.PhotoBatchError(
+                index=index,
+                errors=[{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]} for err in e.errors()],
+            ))
+            continue
+        if photo_in.storage_key and not is_event_key(id, photo_in.storage_key):
+            errors.append(schemas.PhotoBatchError(index=index, errors=[{
+                "loc": ["storage_key"], "msg": f"storage_key must be under {event_prefix(id)}", "type": "value_error",
+            }]))
+            continue
+        valid.append((index, photo_in))
+
+    # Hashes come from completed uploads; client-supplied ones are only checked
+    checked = dedup.check_objects(db, id, [(p.storage_key, p.content_hash) for _, p in valid])
+    hashed: List[Any] = []
+    for (index, photo_in), stored in zip(valid, checked):
+        if stored.error:
+            errors.append(schemas.PhotoBatchError(
+                index=index,
+                errors=[{"loc": [stored.error_field], "msg": stored.error, "type": "value_error"}],
+            ))
+            continue
+        hashed.append((index, photo_in, stored))
+    errors.sort(key=lambda e: e.index)
+
+    # Items repeating an earlier item of this batch are linked to its photo
+    rows: List[Dict[str, Any]] = []
+    row_indexes: List[int] = []
+    repeats: List[Any] = []
+    first_index_for_hash: Dict[str, int] = {}
+    for index, photo_in, stored in hashed:
+        content_hash = stored.content_hash
+        if content_hash in first_index_for_hash:
+            repeats.append((index, content_hash))
+            continue
+        if content_hash:
+            first_index_for_hash[content_hash] = index
+        rows.append({
+            "title": photo_in.title,
+            "url": photo_in.url,
+            "storage_key": photo_in.storage_key,
+            "content_hash": content_hash,
+            "size_bytes": stored.size_bytes,
+            "event_id": id,
+        })
+        row_indexes.append(index)
+
+    # Items whose hash the event already has, even from a concurrent request, are
+    # skipped by ON CONFLICT DO NOTHING and linked to the existing photo
+    inserted = crud.insert_new_photos(
+        db, [row for row in rows if row["content_hash"]], chunk_size=settings.PHOTO_BATCH_CHUNK_SIZE
+    )
+    unhashed_ids = iter(crud.bulk_create_photos(
+        db, [row for row in rows if not row["content_hash"]], chunk_size=settings.PHOTO_BATCH_CHUNK_SIZE
+    ))
+    existing = dedup.find_existing(db, id, (row["content_hash"] for row in rows if row["content_hash"]
+                                            and row["content_hash"] not in inserted))
+    photo_for_hash = {**existing, **inserted}
+    created_ids: List[int] = []
+    created_rows: List[Dict[str, Any]] = []
+    duplicates: List[schemas.PhotoBatchDuplicate] = []
+    for index, row in zip(row_indexes, rows):
+        content_hash = row["content_hash"]
+        if content_hash and content_hash not in inserted:
+            duplicates.append(schemas.PhotoBatchDuplicate(index=index, photo_id=existing[content_hash]))
+            continue
+        created_ids.append(inserted[content_hash] if content_hash else next(unhashed_ids))
+        created_rows.append(row)
+    if created_ids:
+        event_stats.increment(
+            db, id,
+            photo_count=len(created_ids),
+            total_bytes=sum(row["size_bytes"] or 0 for row in created_rows),
+            photo_revision=1,
+        )
+    db.commit()
+    for index, content_hash in repeats:
+        duplicates.append(schemas.PhotoBatchDuplicate(index=index, photo_id=photo_for_hash[content_hash]))
+    duplicates.sort(key=lambda d: d.index)
+    derivatives.schedule(
+        (id, photo_id, row["storage_key"]) for photo_id, row in zip(created_ids, created_rows)
+    )
+    return {"created_ids": created_ids, "errors": errors, "duplicates": duplicates}
+
+@router.get("/{id}/photos", response_model=List[schemas.Photo])
+async def read_event_photos(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    id: int,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    collapse_bursts: bool = False,
+    burst_threshold: int = Query(6, ge=0, le=32),
 ) -> Any:
     """
     Get all photos for a specific event.
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next
+    page by keyset instead of `skip`, which stays fast at any depth.
+    With `collapse_bursts`, near-identical frames (perceptual hashes within
+    `burst_threshold` bits) are returned as a single representative photo.
+    """
+    # Opening a gallery loads its first page; later pages are the same visit
+    first_page = cursor is None and skip == 0
+    cached, lookup = await response_cache.lookup(request, db, [f"photos:{id}"])
+    if cached:
+        if first_page:
+            analytics.record(id, "view")
+        return cached
+
+    last_id = None
+    if cursor:
+        cursor_event_id, last_id = decode_cursor(cursor)
+        if cursor_event_id != id:
+            raise HTTPException(status_code=400, detail="Cursor does not belong to this event")
+
+    if collapse_bursts:
+        # NumPy-backed modules are imported on first use to keep worker startup cheap
+        from app.services import phash
+
+        representatives = await db.run_sync(phash.event_representatives, id, burst_threshold)
+        start = bisect.bisect_right(representatives, last_id) if last_id is not None else skip
+        page_ids = representatives[start:start + limit]
+        photos = []
+        if page_ids:
+            result = await db.execute(
+                select(models.Photo).where(models.Photo.id.in_(page_ids)).order_by(models.Photo.id)
+            )
+            photos = result.scalars().all()
+    else:
+        query = select(models.Photo).where(models.Photo.event_id == id)
+        query = query.order_by(models.Photo.id)
+        if last_id is not None:
+            query = query.where(models.Photo.id > last_id)
+        else:
+            query = query.offset(skip)
+        photos = (await db.execute(query.limit(limit))).scalars().all()
+    # Only an empty page needs telling apart from a missing event
+    if not photos and not await db.get(models.Event, id):
+        raise HTTPException(status_code=404, detail="Event not found")
+    if first_page:
+        analytics.record(id, "view")
+    headers = {}
+    if photos and len(photos) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(id, photos[-1].id)
+    return response_cache.store(request, lookup, List[schemas.Photo], photos, headers)
+
+def _stream_event_photos(session_factory: sessionmaker, event_id: int, format: str) -> Iterator[str]:
+    # The request-scoped session may be closed before the body is fully sent, so the
+    # generator owns its own session. Selecting plain columns (not ORM entities) keeps
+    # the identity map empty and memory flat for any gallery size.
+    db = session_factory()
+    try:
+        stmt = (
+            select(*models.Photo.__table__.columns)
+            .where(models.Photo.event_id == event_id)
+            .order_by(models.Photo.id)
+            .execution_options(yield_per=settings.PHOTO_EXPORT_YIELD_PER)
+        )
+        if format == "json":
+            yield "["
+        first = True
+        for row in db.execute(stmt):
+            line = schemas.Photo.model_validate(dict(row._mapping)).model_dump_json()
+            if format == "json":
+                yield line if first else "," + line
+            else:
+                yield line + "\n"
+            first = False
+        if format == "json":
+            yield "]"
+    finally:
+        db.close()
+
+@router.get("/{id}/photos:export")
+def export_event_photos(
+    *,
+    request: Request,
+    db: Session = Depends(get_read_db),
+    id: int,
+    format: Literal["ndjson", "json"] = "ndjson",
+) -> Any:
+    """
+    Stream every photo of an event as NDJSON (default) or a chunked JSON array.
     """
     event = db.query(models.Event).filter(models.Event.id == id).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
-    
-    photos = db.query(models.Photo).filter(models.Photo.event_id == id).offset(skip).limit(limit).all()
-    return photos
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(
+        _stream_event_photos(read_session_factory(request), id, format), media_type=media_type
+    )
+
+def _download_job_out(job: downloads.DownloadJob) -> Dict[str, Any]:
+    out = vars(job).copy()
+    if job.status == "ready":
+        out["download_url"] = f"{settings.API_V1_STR}/events/{job.event_id}/download/{job.version}"
+    return out
+
+@router.post("/{id}/download", response_model=schemas.DownloadJob)
+def start_event_download(
+    *,
+    db: Session = Depends(get_db),
+    id: int,
+    background_tasks: BackgroundTasks,
+) -> Any:
+    """
+    Build (or reuse) the ZIP archive of all photos in an event.
+    """
+    event = db.query(models.Event).filter(models.Event.id == id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    version = downloads.photo_set_version(db, id)
+    job = downloads.get_job(id, version)
+    if job.status in ("missing", "failed"):
+        new_job = downloads.claim_job(id, version)
+        if new_job:
+            background_tasks.add_task(downloads.build_archive, new_job)
+            job = new_job
+        else:
+            job = downloads.get_job(id, version)
+    return _download_job_out(job)
+
+@router.get("/{id}/download", response_model=schemas.DownloadJob)
+def read_event_download(
+    *,
+    db: Session = Depends(get_db),
+    id: int,
+) -> Any:
+    """
+    Get the archive status for the event's current photo set.
+    """
+    event = db.query(models.Event).filter(models.Event.id == id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return _download_job_out(downloads.get_job(id, downloads.photo_set_version(db, id)))
+
+@router.get("/{id}/download/{version}")
+def download_event_archive(
+    *,
+    id: int,
+    version: str = Path(..., pattern="^[0-9a-f]{16}$"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+) -> Any:
+    """
+    Download a built archive. Supports `Range` requests so interrupted downloads can resume.
+    """
+    storage = get_storage()
+    key = downloads.archive_key(id, version)
+    if not storage.exists(key):
+        raise HTTPException(status_code=404, detail="Archive not found")
+
+    size = storage.size(key)
+    etag = f'"{version}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="event-{id}-photos.zip"',
+    }
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = downloads.parse_range(range_header, size)
+    except ValueError:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    # Resumed downloads (ranges past the first byte) are not counted again. The
+    # analytics flush adds the count to event_stats, off the request path.
+    if byte_range is None or byte_range[0] == 0:
+        analytics.record(id, "download")
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(storage.read_range(key), media_type="application/zip", headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.read_range(key, start, end),
+        status_code=206,
+        media_type="application/zip",
+        headers=headers,
+    )
+
+@router.post("/{id}/face-search", response_model=schemas.FaceSearchResult)
+def search_event_faces(
+    *,
+    db: Session = Depends(get_db),
+    id: int,
+    selfie: UploadFile = File(...),
+) -> Any:
+    """
+    Find the event photos containing the person in a guest selfie.
+
+    Only the selfie is analysed per request; event photos are matched against
+    embeddings computed when they were indexed.
+    """
+    from app.services import face_index, faces
+
+    event = db.query(models.Event).filter(models.Event.id == id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    data = selfie.file.read(settings.FACE_SELFIE_MAX_BYTES + 1)
+    if len(data) > settings.FACE_SELFIE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Selfie too large")
+    try:
+        image = faces.decode_image(data)
+        if image is None:
+            raise HTTPException(status_code=422, detail="Selfie is not a valid image")
+        selfie_faces = faces.encode_faces(image)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not selfie_faces:
+        raise HTTPException(status_code=422, detail="No face found in selfie")
+
+    # Group selfies can contain bystanders; the largest face is the guest
+    face = max(selfie_faces, key=lambda f: f["width"] * f["height"])
+    index = face_index.get_event_index(db, id)
+    matches = index.search(
+        face["embedding"],
+        threshold=settings.FACE_MATCH_THRESHOLD,
+        top_k=settings.FACE_SEARCH_TOP_K,
+        nprobe=settings.FACE_IVF_NPROBE,
+    )
+    analytics.record(id, "face_search")
+    return {
+        "matches": [{"photo_id": photo_id, "score": score} for photo_id, score in matches],
+        "faces_indexed": len(index),
+    }
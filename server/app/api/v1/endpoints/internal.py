@@ -0,0 +1,79 @@
+import os
+from typing import Any
+
+from fastapi import APIRouter
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.db import query_analyzer, sql_profiler
+from app.db.session import async_engine, engine, replicas
+from app.services import analytics
+from app.services.user_cache import get_user_cache
+
+router = APIRouter()
+
+def _pool_stats(name: str, pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"pool": name, "class": type(pool).__name__}
+    return pool.metrics.snapshot(pool)
+
+@router.get("/db-pool")
+def read_db_pool_metrics() -> Any:
+    """
+    Connection pool metrics for the worker process that served the request.
+
+    Every uvicorn worker has its own pools, so poll repeatedly (or per worker) to see all of them.
+    """
+    return {
+        "pid": os.getpid(),
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+        "pools": [
+            _pool_stats("sync", engine.pool),
+            _pool_stats("async", async_engine.pool),
+        ] + [
+            _pool_stats(name, pool)
+            for replica in replicas.replicas
+            for name, pool in (
+                (f"{replica.name} sync", replica.engine.pool),
+                (f"{replica.name} async", replica.async_engine.pool),
+            )
+        ],
+        "replicas": [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag_seconds,
+                "last_error": replica.last_error,
+            }
+            for replica in replicas.replicas
+        ],
+    }
+
+@router.get("/user-cache")
+def read_user_cache_metrics() -> Any:
+    """
+    Hit/miss counters of the authenticated user cache in the worker that served the request.
+    """
+    cache = get_user_cache()
+    return {"pid": os.getpid(), "enabled": cache is not None, **(cache.stats() if cache else {})}
+
+@router.get("/query-report")
+def read_query_report() -> Any:
+    """
+    Statements run per endpoint and the sequential scans found in their plans (QUERY_ANALYZER_ENABLED only).
+    """
+    return {"pid": os.getpid(), "enabled": settings.QUERY_ANALYZER_ENABLED, "endpoints": query_analyzer.report()}
+
+@router.get("/sql-profile")
+def read_sql_profile() -> Any:
+    """
+    Recent requests over the SQL profiling thresholds, with their repeated statements (SQL_PROFILING_ENABLED only).
+    """
+    return {"pid": os.getpid(), "enabled": settings.SQL_PROFILING_ENABLED, "requests": sql_profiler.report()}
+
+@router.get("/analytics")
+def read_analytics_buffer() -> Any:
+    """
+    Analytics buffer counters (recorded, dropped, flushed) of the worker that served the request.
+    """
+    return {"pid": os.getpid(), "enabled": settings.ANALYTICS_ENABLED, **analytics.buffer.stats()}
@@ -0,0 +1,83 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.db.session import get_db
+from app.services import jobs
+
+router = APIRouter()
+
+@router.get("/", response_model=List[schemas.Job])
+def read_jobs(
+    *,
+    db: Session = Depends(get_db),
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+) -> Any:
+    """
+    Most recent jobs, optionally filtered by status and kind.
+    """
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if kind:
+        query = query.filter(models.Job.kind == kind)
+    return query.order_by(models.Job.id.desc()).limit(limit).all()
+
+@router.get("/counts", response_model=List[schemas.JobCount])
+def read_job_counts(
+    *,
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Number of jobs per kind and status (finished jobs are kept for JOB_RETENTION_DAYS).
+    """
+    rows = (
+        db.query(models.Job.kind, models.Job.status, func.count(models.Job.id))
+        .group_by(models.Job.kind, models.Job.status)
+        .order_by(models.Job.kind, models.Job.status)
+        .all()
+    )
+    return [{"kind": kind, "status": status, "count": count} for kind, status, count in rows]
+
+@router.get("/{id}", response_model=schemas.Job)
+def read_job(
+    *,
+    db: Session = Depends(get_db),
+    id: int,
+) -> Any:
+    """
+    Get a job by ID.
+    """
+    job = db.get(models.Job, id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{id}/retry", response_model=schemas.Job)
+def retry_job(
+    *,
+    db: Session = Depends(get_db),
+    id: int,
+) -> Any:
+    """
+    Queue a failed job again with a fresh set of attempts.
+    """
+    job = db.get(models.Job, id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    try:
+        jobs.retry(db, job)
+    except IntegrityError:
+        # Another job with the same dedupe key was queued since this one failed
+        db.rollback()
+        raise HTTPException(status_code=409, detail="An equivalent job is already queued or running")
+    db.refresh(job)
+    return job
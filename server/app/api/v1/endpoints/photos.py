@@ -1,34 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app import models, schemas
-from app.db.session import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.db.session import get_async_read_db, get_db
+from app.services import dedup, derivatives, event_stats
+from app.storage import event_prefix, is_event_key
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Photo)
 def create_photo(photo: schemas.PhotoCreate, db: Session = Depends(get_db)):
     # Note: In a real app, you might want to separate this logic into a CRUD service (app/crud/crud_photo.py)
+    if photo.storage_key and not is_event_key(photo.event_id, photo.storage_key):
+        raise HTTPException(status_code=422, detail=f"storage_key must be under {event_prefix(photo.event_id)}")
+    try:
+        stored = dedup.check_object(db, photo.event_id, photo.storage_key, photo.content_hash)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    content_hash = stored.content_hash
+    duplicate = dedup.get_duplicate(db, photo.event_id, content_hash)
+    if duplicate:
+        return duplicate
     db_photo = models.Photo(
         title=photo.title, 
         url=photo.url,
+        storage_key=photo.storage_key,
+        content_hash=content_hash,
+        size_bytes=stored.size_bytes,
         event_id=photo.event_id
     )
     db.add(db_photo)
-    db.commit()
+    if photo.event_id:
+        event_stats.increment(
+            db, photo.event_id, photo_count=1, total_bytes=stored.size_bytes or 0, photo_revision=1
+        )
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same file was added concurrently
+        db.rollback()
+        duplicate = dedup.get_duplicate(db, photo.event_id, content_hash)
+        if not duplicate:
+            raise
+        return duplicate
     db.refresh(db_photo)
+    derivatives.schedule([(db_photo.event_id, db_photo.id, db_photo.storage_key)])
     return db_photo
 
 @router.get("/", response_model=List[schemas.Photo])
-def read_photos(
+async def read_photos(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     event_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    query = db.query(models.Photo)
+    # Keyset paging walks (event_id, id) so deep pages cost the same as the first one;
+    # `skip` is kept for older clients.
+    query = select(models.Photo)
     if event_id:
-        query = query.filter(models.Photo.event_id == event_id)
-    photos = query.offset(skip).limit(limit).all()
+        query = query.where(models.Photo.event_id == event_id)
+    query = query.order_by(models.Photo.id)
+    if cursor:
+        cursor_event_id, last_id = decode_cursor(cursor)
+        if cursor_event_id != (event_id or None):
+            raise HTTPException(status_code=400, detail="Cursor does not match event_id filter")
+        query = query.where(models.Photo.id > last_id)
+    else:
+        query = query.offset(skip)
+    photos = (await db.execute(query.limit(limit))).scalars().all()
+    if photos and len(photos) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(event_id or None, photos[-1].id)
     return photos
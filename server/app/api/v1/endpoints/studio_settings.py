@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 
 from app import models, schemas
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 
 router = APIRouter()
 
+def _email_taken(error: IntegrityError) -> bool:
+    # Postgres names the violated index, SQLite the column; other violations are real errors
+    message = str(error.orig)
+    return "ix_studio_settings_email" in message or "studio_settings.email" in message
+
 @router.post("/", response_model=schemas.StudioSettings)
 def create_studio_settings(
     settings: schemas.StudioSettingsCreate, 
@@ -31,14 +37,14 @@ def create_studio_settings(
 def get_all_studio_settings(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all studio settings (for admin purposes)"""
     settings = db.query(models.StudioSettings).offset(skip).limit(limit).all()
     return settings
 
 @router.get("/current/me", response_model=schemas.StudioSettings)
-def get_current_user_settings(db: Session = Depends(get_db)):
+def get_current_user_settings(db: Session = Depends(get_read_db)):
     """Get current user's studio settings (placeholder - will need auth)"""
     # For now, return the first settings record
     # In production, this would use the authenticated user's ID
@@ -53,7 +59,7 @@ def get_current_user_settings(db: Session = Depends(get_db)):
     return settings
 
 @router.get("/{settings_id}", response_model=schemas.StudioSettings)
-def get_studio_settings(settings_id: int, db: Session = Depends(get_db)):
+def get_studio_settings(settings_id: int, db: Session = Depends(get_read_db)):
     """Get specific studio settings by ID"""
     settings = db.query(models.StudioSettings).filter(
         models.StudioSettings.id == settings_id
@@ -78,20 +84,19 @@ def update_studio_settings(
     if not db_settings:
         raise HTTPException(status_code=404, detail="Studio settings not found")
     
-    # Check if email is being updated and if it already exists
-    if settings_update.email and settings_update.email != db_settings.email:
-        existing = db.query(models.StudioSettings).filter(
-            models.StudioSettings.email == settings_update.email
-        ).first()
-        if existing:
-            raise HTTPException(status_code=400, detail="Email already in use")
-    
     # Update only provided fields
     update_data = settings_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_settings, field, value)
     
-    db.commit()
+    # The unique index on email rejects a taken address, so no lookup is needed first
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not _email_taken(e):
+            raise
+        raise HTTPException(status_code=400, detail="Email already in use")
     db.refresh(db_settings)
     return db_settings
 
@@ -4,6 +4,7 @@ from typing import List
 
 from app import models, schemas
 from app.db.session import get_db
+from app.services import platform_settings
 
 router = APIRouter()
 
@@ -26,12 +27,14 @@ def create_super_admin_settings(
     db.add(db_settings)
     db.commit()
     db.refresh(db_settings)
+    platform_settings.update(db_settings)
     return db_settings
 
 @router.get("/", response_model=schemas.SuperAdminSettings)
-def get_super_admin_settings(db: Session = Depends(get_db)):
+def get_super_admin_settings():
     """Get super admin settings (singleton)"""
-    settings = db.query(models.SuperAdminSettings).first()
+    # Served from the process-local snapshot, not the database
+    settings = platform_settings.get()
     
     if not settings:
         raise HTTPException(
@@ -59,9 +62,12 @@ def update_super_admin_settings(
     update_data = settings_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_settings, field, value)
+    # Tells the other workers' pollers to reload (see platform_settings)
+    db_settings.version = models.SuperAdminSettings.version + 1
     
     db.commit()
     db.refresh(db_settings)
+    platform_settings.update(db_settings)
     return db_settings
 
 @router.delete("/")
@@ -77,6 +83,7 @@ def delete_super_admin_settings(db: Session = Depends(get_db)):
     
     db.delete(db_settings)
     db.commit()
+    platform_settings.update(None)
     return {"message": "Super admin settings deleted successfully"}
 
 @router.post("/initialize", response_model=schemas.SuperAdminSettings)
@@ -112,4 +119,5 @@ def initialize_super_admin_settings(db: Session = Depends(get_db)):
     db.add(default_settings)
     db.commit()
     db.refresh(default_settings)
+    platform_settings.update(default_settings)
     return default_settings
@@ -0,0 +1,251 @@
+import os
+import posixpath
+import re
+import tempfile
+import uuid
+from typing import Any, BinaryIO, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.services import dedup, derivatives, event_stats
+from app.storage import event_prefix, get_storage
+
+router = APIRouter()
+
+# S3 caps multipart uploads at 10,000 parts
+MAX_PARTS = 10000
+
+# Body chunks are collected up to this size before each write to the spool file
+SPOOL_WRITE_SIZE = 1024 * 1024
+
+def _safe_filename(filename: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", posixpath.basename(filename.replace("\\", "/")))
+    return name.lstrip(".") or "upload"
+
+def _get_upload(db: Session, upload_id: str) -> models.UploadSession:
+    upload = db.query(models.UploadSession).filter(models.UploadSession.id == upload_id).first()
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+def _get_active_upload(db: Session, upload_id: str) -> models.UploadSession:
+    upload = _get_upload(db, upload_id)
+    if upload.status != "uploading":
+        raise HTTPException(status_code=409, detail=f"Upload is {upload.status}")
+    return upload
+
+def _active_upload_location(upload_id: str) -> Tuple[str, str]:
+    db = SessionLocal()
+    try:
+        upload = _get_active_upload(db, upload_id)
+        return upload.storage_key, upload.multipart_id
+    finally:
+        db.close()
+
+def _part_tempfile() -> Tuple[BinaryIO, str]:
+    os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".part", dir=settings.UPLOAD_TMP_DIR)
+    return os.fdopen(fd, "wb"), path
+
+def _remove_if_exists(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+def _upload_out(upload: models.UploadSession, parts=()) -> schemas.UploadSession:
+    return schemas.UploadSession.model_validate(upload).model_copy(update={
+        "part_size": settings.UPLOAD_PART_SIZE,
+        "parts": [schemas.UploadPart(number=p.number, size=p.size) for p in parts],
+    })
+
+@router.post("/", response_model=schemas.UploadSession)
+def create_upload(
+    *,
+    db: Session = Depends(get_db),
+    upload_in: schemas.UploadCreate,
+) -> Any:
+    """
+    Start a resumable upload. Send the file as numbered parts of `part_size` bytes, then complete it.
+    """
+    event = db.query(models.Event).filter(models.Event.id == upload_in.event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    upload_id = uuid.uuid4().hex
+    storage_key = f"{event_prefix(upload_in.event_id)}originals/{upload_id}/{_safe_filename(upload_in.filename)}"
+    upload = models.UploadSession(
+        id=upload_id,
+        event_id=upload_in.event_id,
+        filename=upload_in.filename,
+        title=upload_in.title,
+        content_type=upload_in.content_type,
+        total_size=upload_in.total_size,
+        storage_key=storage_key,
+        status="uploading",
+        # Duplicates are only detected on completion, from the bytes actually uploaded
+        multipart_id=get_storage().create_multipart(storage_key),
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return _upload_out(upload)
+
+@router.get("/{upload_id}", response_model=schemas.UploadSession)
+def read_upload(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: str,
+) -> Any:
+    """
+    Get an upload and the parts received so far, to resume after a dropped connection.
+    """
+    upload = _get_upload(db, upload_id)
+    parts = []
+    if upload.status == "uploading":
+        parts = get_storage().list_parts(upload.storage_key, upload.multipart_id)
+    return _upload_out(upload, parts)
+
+@router.put("/{upload_id}/parts/{number}", response_model=schemas.UploadPart)
+async def upload_part(
+    *,
+    upload_id: str,
+    number: int = Path(..., ge=1, le=MAX_PARTS),
+    request: Request,
+) -> Any:
+    """
+    Upload one part as the raw request body. Re-sending a part number replaces it.
+    """
+    # A part can take minutes to arrive, so no pooled connection is held while it does
+    storage_key, multipart_id = await run_in_threadpool(_active_upload_location, upload_id)
+
+    # Spool the body to disk as it arrives so a worker never holds a whole part in memory;
+    # file I/O runs on the threadpool so a slow disk does not stall the event loop
+    f, tmp_path = await run_in_threadpool(_part_tempfile)
+    try:
+        size = 0
+        buffered = bytearray()
+        try:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.UPLOAD_MAX_PART_SIZE:
+                    raise HTTPException(status_code=413, detail="Part too large")
+                buffered += chunk
+                if len(buffered) >= SPOOL_WRITE_SIZE:
+                    await run_in_threadpool(f.write, bytes(buffered))
+                    buffered.clear()
+            if buffered:
+                await run_in_threadpool(f.write, bytes(buffered))
+        finally:
+            await run_in_threadpool(f.close)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty part")
+        part = await run_in_threadpool(get_storage().upload_part, storage_key, multipart_id, number, tmp_path)
+    finally:
+        await run_in_threadpool(_remove_if_exists, tmp_path)
+    return {"number": part.number, "size": part.size}
+
+@router.get("/{upload_id}/parts/{number}/url", response_model=schemas.UploadPartUrl)
+def presign_upload_part(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: str,
+    number: int = Path(..., ge=1, le=MAX_PARTS),
+) -> Any:
+    """
+    Get a pre-signed URL to PUT a part straight to object storage, bypassing the API.
+    """
+    upload = _get_active_upload(db, upload_id)
+    url = get_storage().presign_part(
+        upload.storage_key, upload.multipart_id, number, settings.UPLOAD_PRESIGN_EXPIRES_SECONDS
+    )
+    if not url:
+        raise HTTPException(status_code=400, detail="Storage backend does not support direct uploads")
+    return {"number": number, "url": url}
+
+@router.post("/{upload_id}/complete", response_model=schemas.Photo)
+def complete_upload(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: str,
+) -> Any:
+    """
+    Assemble the uploaded parts and create the photo.
+
+    If the event already has a photo with identical bytes, the new copy is discarded, the
+    upload is marked `duplicate` and the existing photo is returned.
+    """
+    upload = _get_active_upload(db, upload_id)
+    storage = get_storage()
+    parts = storage.list_parts(upload.storage_key, upload.multipart_id)
+    if not parts:
+        raise HTTPException(status_code=400, detail="No parts uploaded")
+    if [p.number for p in parts] != list(range(1, len(parts) + 1)):
+        raise HTTPException(status_code=400, detail="Missing parts")
+    if upload.total_size is not None and sum(p.size for p in parts) != upload.total_size:
+        raise HTTPException(status_code=400, detail="Uploaded size does not match total_size")
+
+    storage.complete_multipart(upload.storage_key, upload.multipart_id, parts)
+    # Recorded on the session so create calls naming this key need not read it again
+    content_hash = dedup.hash_object(upload.storage_key)
+    upload.content_hash = content_hash
+    upload.total_size = sum(p.size for p in parts)
+
+    duplicate = dedup.get_duplicate(db, upload.event_id, upload.content_hash)
+    if not duplicate:
+        db_photo = models.Photo(
+            title=upload.title or posixpath.basename(upload.filename.replace("\\", "/")),
+            url=storage.url(upload.storage_key),
+            storage_key=upload.storage_key,
+            content_hash=upload.content_hash,
+            event_id=upload.event_id,
+            size_bytes=sum(p.size for p in parts),
+        )
+        db.add(db_photo)
+        try:
+            db.flush()
+        except IntegrityError:
+            # The same file finished uploading concurrently
+            db.rollback()
+            upload = _get_upload(db, upload_id)
+            upload.content_hash = content_hash
+            upload.total_size = sum(p.size for p in parts)
+            duplicate = dedup.get_duplicate(db, upload.event_id, content_hash)
+            if not duplicate:
+                raise
+    if duplicate:
+        storage.delete(upload.storage_key)
+        upload.status = "duplicate"
+        upload.photo_id = duplicate.id
+        db.commit()
+        return duplicate
+
+    upload.status = "completed"
+    upload.photo_id = db_photo.id
+    event_stats.increment(
+        db, db_photo.event_id, photo_count=1, total_bytes=db_photo.size_bytes, photo_revision=1
+    )
+    db.commit()
+    db.refresh(db_photo)
+    derivatives.schedule([(db_photo.event_id, db_photo.id, db_photo.storage_key)])
+    return db_photo
+
+@router.delete("/{upload_id}", response_model=schemas.UploadSession)
+def abort_upload(
+    *,
+    db: Session = Depends(get_db),
+    upload_id: str,
+) -> Any:
+    """
+    Abort an upload and discard its parts.
+    """
+    upload = _get_active_upload(db, upload_id)
+    get_storage().abort_multipart(upload.storage_key, upload.multipart_id)
+    upload.status = "aborted"
+    db.commit()
+    db.refresh(upload)
+    return _upload_out(upload)
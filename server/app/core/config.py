@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,7 +11,20 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+
+    # Password hashing. Changing the cost rehashes each user's password at their next login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Hashing threads per worker (None = one per CPU) and how many more requests may
+    # wait for one before getting a 429
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_QUEUE: int = 32
     
+    # Authenticated user cache, per worker unless USER_CACHE_REDIS_URL is set.
+    # 0 disables it.
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_REDIS_URL: Optional[str] = None
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:5173"]
 
@@ -20,10 +35,145 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str = "app_db"
     
+    # Connection pool, per engine and per uvicorn worker: a worker can hold up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections on each of the sync and async engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    # 0 disables the server-side statement timeout
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Behind PgBouncer in transaction mode: no client-side pooling and no prepared
+    # statements. Set statement_timeout on the database role instead.
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Read replicas (sync driver URLs; the async URL is derived). Empty sends every
+    # read to the primary. A replica lagging more than DB_REPLICA_MAX_LAG_SECONDS or
+    # failing its health check is skipped until it recovers.
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 2.0
+    # After a client writes, its reads go to the primary for this long so it sees its own changes
+    DB_READ_YOUR_WRITES_SECONDS: int = 10
+
+    # Prometheus metrics at /api/v1/metrics. With several uvicorn workers, point
+    # METRICS_MULTIPROC_DIR at a directory that is emptied before each start
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+
+    # Opt-in SQL profiling: Server-Timing header on every response, and a warning
+    # (plus /internal/sql-profile entry) for requests over any of these thresholds
+    SQL_PROFILING_ENABLED: bool = False
+    SQL_PROFILING_SLOW_REQUEST_MS: float = 500.0
+    SQL_PROFILING_MAX_QUERIES: int = 20
+    # Running one statement this many times in a request suggests an N+1 loop
+    SQL_PROFILING_REPEAT_THRESHOLD: int = 5
+
+    # Development only: EXPLAIN each new statement and warn about sequential scans on
+    # tables with at least QUERY_ANALYZER_MIN_ROWS rows (report at /internal/query-report)
+    QUERY_ANALYZER_ENABLED: bool = False
+    QUERY_ANALYZER_MIN_ROWS: int = 10000
+
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+
+    # ETag response cache for event and photo reads, checked against versions read
+    # from events/event_stats. A worker reuses a version it read for up to
+    # RESPONSE_CACHE_VERSION_TTL_SECONDS; its own writes drop it at once. Bounded by
+    # entry count and total size; bodies above RESPONSE_CACHE_MAX_ENTRY_BYTES are not cached.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_VERSION_TTL_SECONDS: float = 2.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+
+    # How often each worker re-reads SuperAdminSettings to see changes made through
+    # another worker (0 disables polling)
+    SUPER_ADMIN_SETTINGS_POLL_SECONDS: float = 5.0
+
+    # Gallery analytics: hits are buffered per worker (oldest dropped beyond
+    # ANALYTICS_BUFFER_SIZE) and written to hourly rollups in batches. The
+    # download and face search counters in event_stats are written the same way.
+    ANALYTICS_ENABLED: bool = True
+    ANALYTICS_BUFFER_SIZE: int = 100000
+    ANALYTICS_FLUSH_BATCH: int = 5000
+    ANALYTICS_FLUSH_INTERVAL_SECONDS: float = 10.0
+    # Photo views a client may report per minute to each worker; more get a 429
+    ANALYTICS_CLIENT_HITS_PER_MINUTE: int = 120
+
+    # Background jobs. With JOB_QUEUE_ENABLED, derivatives, face indexing, archives and
+    # storage cleanup are queued in the jobs table and run by `python worker.py`
+    # processes instead of inside the API workers.
+    JOB_QUEUE_ENABLED: bool = False
+    JOB_WORKER_CONCURRENCY: int = 4
+    # Per-kind caps on jobs running at once in one worker, e.g. {"archive": 1}
+    JOB_KIND_CONCURRENCY: dict[str, int] = {}
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    # Retries wait base * 2^(attempt - 1) seconds (with jitter), capped at max
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_HEARTBEAT_SECONDS: float = 15.0
+    # A running job without a heartbeat for this long is requeued (its worker died)
+    JOB_LEASE_SECONDS: float = 120.0
+    # Finished jobs are deleted after this many days
+    JOB_RETENTION_DAYS: int = 7
+
+    # Bulk photo ingest
+    PHOTO_BATCH_MAX_ITEMS: int = 10000
+    PHOTO_BATCH_CHUNK_SIZE: int = 1000
+
+    # Rows fetched per server-side cursor round trip when streaming exports
+    PHOTO_EXPORT_YIELD_PER: int = 1000
+
+    # Object storage: "local" or "s3" (any S3-compatible service, needs boto3)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = "storage"
+    # Base URL objects are served from (web server / CDN in front of the storage)
+    STORAGE_PUBLIC_URL: str = "/media"
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    # Scratch directory for archives while they are being built
+    DOWNLOAD_TMP_DIR: str = "storage/tmp"
+
+    # Resumable uploads
+    UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_MAX_PART_SIZE: int = 64 * 1024 * 1024
+    UPLOAD_PRESIGN_EXPIRES_SECONDS: int = 3600
+    UPLOAD_TMP_DIR: str = "storage/tmp"
+
+    # Thumbnail / preview / web derivatives
+    DERIVATIVES_ENABLED: bool = True
+    # Processes decoding images; defaults to the number of CPUs
+    DERIVATIVE_WORKERS: Optional[int] = None
+    DERIVATIVE_JPEG_QUALITY: int = 85
+    # Photos rendered per pool task or job; their perceptual hashes are computed together
+    DERIVATIVE_BATCH_SIZE: int = 16
+
+    # Face search. Needs opencv-python-headless and onnxruntime, a YuNet face
+    # detector and an ArcFace-style 112x112 embedding model (both ONNX files).
+    FACE_INDEX_ENABLED: bool = False
+    FACE_DETECTOR_MODEL: str = ""
+    FACE_EMBEDDING_MODEL: str = ""
+    FACE_MIN_DETECTION_SCORE: float = 0.8
+    # Cosine similarity a face must reach to count as a match
+    FACE_MATCH_THRESHOLD: float = 0.45
+    FACE_SEARCH_TOP_K: int = 500
+    # Events with more faces than this are searched through an IVF index instead of brute force
+    FACE_IVF_MIN_FACES: int = 50000
+    FACE_IVF_NPROBE: int = 8
+    # Quiet period after newly indexed faces before the event's IVF index is retrained
+    FACE_INDEX_REFRESH_DELAY_SECONDS: int = 60
+    FACE_SELFIE_MAX_BYTES: int = 10 * 1024 * 1024
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,109 @@
+"""
+Prometheus metrics: request throughput, latency, in-flight requests and database
+work per request, labelled by method and endpoint (module.function of the handler,
+so path parameters do not multiply the series).
+
+Each uvicorn worker is a separate process with its own counters. With
+METRICS_MULTIPROC_DIR set, every worker writes its samples to files in that
+directory and a scrape of /metrics sums all of them, whichever worker answers.
+The directory must be emptied before the server starts.
+
+Latency is measured until the response starts. The body of a streaming response
+(exports, archive downloads) is not included.
+"""
+import os
+import time
+from typing import Optional, Tuple
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.db import query_stats
+
+if settings.METRICS_MULTIPROC_DIR:
+    # Read by prometheus_client when it is imported, so it must be set first
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.METRICS_MULTIPROC_DIR)
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+REQUESTS = Counter(
+    "http_requests_total", "Requests handled", ["method", "endpoint", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds", "Time until the response starts", ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", ["method"], multiprocess_mode="livesum"
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database statements per request", ["method", "endpoint"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in database statements per request", ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def multiprocess_mode() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def endpoint_name(scope: dict) -> Optional[str]:
+    """'module.function' of the handler the request was routed to, or None if no route matched."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+    return f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+
+
+async def track_requests(request: Request, call_next):
+    """Middleware: record the request in the metrics above."""
+    method = request.method
+    IN_PROGRESS.labels(method).inc()
+    token = query_stats.start()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = query_stats.stop(token)
+        IN_PROGRESS.labels(method).dec()
+        # Unmatched paths share one label so scanners cannot create unbounded series
+        endpoint = endpoint_name(request.scope) or "unmatched"
+        REQUESTS.labels(method, endpoint, str(status)).inc()
+        LATENCY.labels(method, endpoint).observe(elapsed)
+        DB_QUERIES.labels(method, endpoint).observe(stats.count)
+        DB_SECONDS.labels(method, endpoint).observe(stats.seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    """The exposition text and its content type, summed over all workers in multiprocess mode."""
+    if multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges (in-flight requests) when it exits."""
+    if multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
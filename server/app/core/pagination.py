@@ -0,0 +1,24 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(event_id: Optional[int], last_id: int) -> str:
+    """Encode the (event_id, id) position of the last row on a page as an opaque token."""
+    raw = json.dumps([event_id, last_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[int], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        event_id, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        if event_id is not None:
+            event_id = int(event_id)
+        return event_id, int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
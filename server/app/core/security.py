@@ -1,12 +1,39 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost are flagged by needs_update and replaced at next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
+
+
+class PasswordHasherBusy(Exception):
+    """Every hashing worker is busy and the wait queue is full."""
+
+
+# bcrypt releases the GIL, so a thread pool runs hashes on separate cores. The
+# pool is kept apart from the request threadpool so a login burst cannot take
+# all of its threads, and admission is capped so excess logins fail fast.
+_hash_workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+_hash_pool = ThreadPoolExecutor(max_workers=_hash_workers, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(_hash_workers + settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def _run_hasher(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        # The event loop keeps serving other requests while the hash runs
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+    finally:
+        _hash_slots.release()
 
 
 def create_access_token(
@@ -37,9 +64,16 @@ def create_refresh_token(
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hasher(pwd_context.verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses outdated settings, return a new hash to store.
+    """
+    return await _run_hasher(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await _run_hasher(pwd_context.hash, password)
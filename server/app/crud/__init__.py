@@ -0,0 +1,2 @@
+from .crud_event import EVENT_SORT_COLUMNS, event_summaries_query
+from .crud_photo import bulk_create_photos, insert_new_photos
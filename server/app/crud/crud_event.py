@@ -0,0 +1,75 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import aliased
+
+from app import models
+
+# Sort keys accepted by the event listing; a leading "-" sorts descending
+EVENT_SORT_COLUMNS = {
+    "id": models.Event.id,
+    "name": models.Event.name,
+    "start_date": models.Event.start_date,
+    "created_at": models.Event.created_at,
+    "updated_at": models.Event.updated_at,
+}
+
+
+def event_summaries_query(
+    *,
+    status: Optional[str] = None,
+    event_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    q: Optional[str] = None,
+    sort: str = "id",
+    skip: int = 0,
+    limit: int = 100,
+) -> Select:
+    """
+    One page of events with their photo count and cover photo (the first photo added),
+    as (Event, photo_count, cover Photo or None) rows.
+
+    The page of events is selected first and only its photos are aggregated, so the
+    cost does not grow with the number of events outside the page.
+    """
+    column = EVENT_SORT_COLUMNS[sort.lstrip("-")]
+    if sort.startswith("-"):
+        order_by = (column.desc().nulls_last(), models.Event.id.desc())
+    else:
+        order_by = (column.asc().nulls_last(), models.Event.id.asc())
+
+    page = select(models.Event.id)
+    if status is not None:
+        page = page.where(models.Event.status == status)
+    if event_type is not None:
+        page = page.where(models.Event.event_type == event_type)
+    if date_from is not None:
+        page = page.where(models.Event.start_date >= date_from)
+    if date_to is not None:
+        page = page.where(models.Event.start_date <= date_to)
+    if q:
+        page = page.where(
+            models.Event.name.icontains(q, autoescape=True) | models.Event.location.icontains(q, autoescape=True)
+        )
+    page = page.order_by(*order_by).offset(skip).limit(limit).subquery()
+
+    stats = (
+        select(
+            models.Photo.event_id,
+            func.count(models.Photo.id).label("photo_count"),
+            func.min(models.Photo.id).label("cover_photo_id"),
+        )
+        .where(models.Photo.event_id.in_(select(page.c.id)))
+        .group_by(models.Photo.event_id)
+        .subquery()
+    )
+    cover = aliased(models.Photo)
+    return (
+        select(models.Event, func.coalesce(stats.c.photo_count, 0), cover)
+        .join(page, page.c.id == models.Event.id)
+        .outerjoin(stats, stats.c.event_id == models.Event.id)
+        .outerjoin(cover, cover.id == stats.c.cover_photo_id)
+        .order_by(*order_by)
+    )
@@ -0,0 +1,45 @@
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.upsert import insert_for
+
+
+def bulk_create_photos(
+    db: Session, rows: List[Dict[str, Any]], chunk_size: int = 1000
+) -> List[int]:
+    """
+    Insert photo rows as chunked multi-row INSERT ... RETURNING statements.
+
+    Runs inside the caller's transaction; the caller commits. Returned ids are in
+    the same order as `rows`.
+    """
+    ids: List[int] = []
+    stmt = insert(models.Photo).returning(models.Photo.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        ids.extend(db.scalars(stmt, chunk).all())
+    return ids
+
+
+def insert_new_photos(
+    db: Session, rows: List[Dict[str, Any]], chunk_size: int = 1000
+) -> Dict[str, int]:
+    """
+    Insert photo rows that carry a content_hash with INSERT ... ON CONFLICT DO
+    NOTHING RETURNING, skipping rows whose (event_id, content_hash) already
+    exists, including ones committed concurrently.
+
+    Runs inside the caller's transaction; the caller commits. Returns
+    {content_hash: id} of the inserted rows.
+    """
+    table = models.Photo.__table__
+    stmt = insert_for(db)(table).on_conflict_do_nothing(
+        index_elements=[table.c.event_id, table.c.content_hash]
+    ).returning(table.c.content_hash, table.c.id)
+    inserted: Dict[str, int] = {}
+    for start in range(0, len(rows), chunk_size):
+        inserted.update(db.execute(stmt, rows[start:start + chunk_size]).tuples().all())
+    return inserted
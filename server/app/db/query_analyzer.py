@@ -0,0 +1,140 @@
+"""
+Development-mode query analyzer.
+
+With QUERY_ANALYZER_ENABLED, every statement an endpoint runs on Postgres is
+recorded under that endpoint's route. The first time a statement is seen, it is
+run through EXPLAIN on a second cursor of the same connection. Sequential scans
+on tables with at least QUERY_ANALYZER_MIN_ROWS rows (pg_class estimate) are
+logged as warnings. The per-endpoint report is served at /internal/query-report.
+
+EXPLAIN without ANALYZE only plans the statement, so analyzing UPDATE and DELETE
+is safe. It still adds a round trip per new statement: keep this off in production.
+"""
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import endpoint_name
+
+logger = logging.getLogger(__name__)
+
+EXPLAINED_VERBS = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+_request_scope: ContextVar[Optional[dict]] = ContextVar("query_analyzer_scope", default=None)
+_lock = threading.Lock()
+# statement -> {"seq_scans": [...]} (None while being explained)
+_plans: Dict[str, Optional[Dict[str, Any]]] = {}
+# endpoint -> statement -> times executed
+_report: Dict[str, Dict[str, int]] = {}
+_table_rows: Dict[str, float] = {}
+
+
+async def track_endpoint(request: Request, call_next):
+    """Middleware: attribute statements run while handling the request to its route."""
+    token = _request_scope.set(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        _request_scope.reset(token)
+
+
+def _endpoint() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return "(outside a request)"
+    return f"{scope['method']} {endpoint_name(scope) or scope['path']}"
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Seq Scan nodes of an EXPLAIN (FORMAT JSON) plan tree."""
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan":
+            found.append({"table": node.get("Relation Name"), "filter": node.get("Filter")})
+        stack.extend(node.get("Plans", []))
+    return found
+
+
+def _table_size(cursor, table: str) -> float:
+    with _lock:
+        rows = _table_rows.get(table)
+    if rows is None:
+        # Inlined rather than bound: the sync and async drivers use different paramstyles
+        cursor.execute("SELECT reltuples FROM pg_class WHERE relname = '%s'" % table.replace("'", "''"))
+        row = cursor.fetchone()
+        rows = float(row[0]) if row else 0.0
+        # The query runs outside the lock; two threads racing here write the same estimate
+        with _lock:
+            _table_rows[table] = rows
+    return rows
+
+
+def _explain(dbapi_connection, statement: str, parameters: Any) -> Dict[str, Any]:
+    cursor = dbapi_connection.cursor()
+    # A failing EXPLAIN must not abort the request's transaction
+    cursor.execute("SAVEPOINT query_analyzer")
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        large = [
+            scan for scan in seq_scans(result[0]["Plan"])
+            if scan["table"] and _table_size(cursor, scan["table"]) >= settings.QUERY_ANALYZER_MIN_ROWS
+        ]
+        cursor.execute("RELEASE SAVEPOINT query_analyzer")
+        return {"seq_scans": large}
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT query_analyzer")
+        raise
+    finally:
+        cursor.close()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if executemany or statement.lstrip().split(None, 1)[0].upper() not in EXPLAINED_VERBS:
+        return
+    endpoint = _endpoint()
+    with _lock:
+        counts = _report.setdefault(endpoint, {})
+        counts[statement] = counts.get(statement, 0) + 1
+        if statement in _plans:
+            return
+        _plans[statement] = None
+    try:
+        plan = _explain(conn.connection.dbapi_connection, statement, parameters)
+    except Exception as e:
+        plan = {"seq_scans": [], "error": str(e)}
+    _plans[statement] = plan
+    for scan in plan["seq_scans"]:
+        logger.warning(
+            "Sequential scan on %s (filter %s) in %s: %s", scan["table"], scan["filter"], endpoint, statement
+        )
+
+
+def install(engine: Engine) -> None:
+    """Analyze statements run on `engine` (for an AsyncEngine, pass its sync_engine)."""
+    if engine.dialect.name != "postgresql":
+        logger.info("Query analyzer only supports Postgres; not installed on %s", engine.dialect.name)
+        return
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report() -> Dict[str, Any]:
+    with _lock:
+        return {
+            endpoint: [
+                {"statement": statement, "count": count, **(_plans.get(statement) or {})}
+                for statement, count in sorted(counts.items(), key=lambda item: -item[1])
+            ]
+            for endpoint, counts in sorted(_report.items())
+        }
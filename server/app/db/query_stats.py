@@ -0,0 +1,86 @@
+"""
+Per-request count and duration of database statements, collected from engine events.
+
+A request opens a collector with `start()`. Every statement executed while it is
+open, on any instrumented engine, adds to it. That includes statements run from a
+sync handler's threadpool thread, because the context is copied into the thread
+along with the collector. Middleware that calls `start()` inside another's
+collector shares it.
+
+A profiling collector (SQL profiling) also groups statements by fingerprint. The
+fingerprint is the SQL with literals and expanded IN lists collapsed, so the
+queries of an N+1 loop show up as one statement run N times.
+"""
+import re
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+_PARAM = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+|'(?:[^']|'')*'|-?\d+(?:\.\d+)?)"
+_IN_LIST = re.compile(rf"\bIN \(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|(?<![$\w])-?\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    statement = _SPACE.sub(" ", statement).strip()
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _LITERAL.sub("?", statement)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    # fingerprint -> [times run, seconds]; only collected when profiling
+    statements: Optional[Dict[str, List[float]]] = None
+
+
+def start(profile: bool = False) -> Token:
+    stats = _current.get() or QueryStats()
+    if profile and stats.statements is None:
+        stats.statements = {}
+    return _current.set(stats)
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def stop(token: Token) -> QueryStats:
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_query_stats_started", None)
+    if stats is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.count += 1
+    stats.seconds += elapsed
+    if stats.statements is not None:
+        entry = stats.statements.setdefault(fingerprint(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+
+
+def install(engine: Engine) -> None:
+    """Collect statements run on `engine` (for an AsyncEngine, pass its sync_engine)."""
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
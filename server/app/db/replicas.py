@@ -0,0 +1,110 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Async driver used for each sync driver when deriving a replica's async URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine, async_engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        # Assume healthy until the first check says otherwise
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def check(self, max_lag_seconds: float) -> None:
+        try:
+            with self.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    # NULL on a primary or on a standby that has replayed nothing yet
+                    lag = conn.execute(text(
+                        "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                    )).scalar()
+                else:
+                    lag = 0.0
+            self.lag_seconds = float(lag)
+            self.healthy = self.lag_seconds <= max_lag_seconds
+            self.last_error = None
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)
+        if not self.healthy:
+            logger.warning("Replica %s unavailable (lag=%s, error=%s)", self.name, self.lag_seconds, self.last_error)
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas that are reachable and within the lag limit.
+
+    Health is checked by a daemon thread every `check_interval` seconds, so picking
+    a replica never waits on the network.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        make_engine: Callable[[str], Engine],
+        make_async_engine: Callable[[str], AsyncEngine],
+        max_lag_seconds: float,
+        check_interval: float,
+    ):
+        self.replicas = [
+            Replica(f"replica-{i}", make_engine(url), make_async_engine(async_url(url)))
+            for i, url in enumerate(urls)
+        ]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def _run_checks(self) -> None:
+        while True:
+            for replica in self.replicas:
+                replica.check(self.max_lag_seconds)
+            time.sleep(self.check_interval)
+
+    def pick(self) -> Optional[Replica]:
+        """A healthy replica, or None to fall back to the primary."""
+        if not self.replicas:
+            return None
+        with self._lock:
+            if self._checker is None:
+                self._checker = threading.Thread(target=self._run_checks, name="replica-health", daemon=True)
+                self._checker.start()
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica.healthy:
+                    return replica
+        return None
@@ -1,13 +1,113 @@
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolMetrics
+from app.db.replicas import ReplicaSet
+
+def _pool_kwargs(poolclass) -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer does the pooling; holding idle connections here would only pin its slots
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": poolclass,
+        "pool_pre_ping": True,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+def _sync_connect_args() -> dict:
+    if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER_MODE:
+        return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return {}
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+def _async_connect_args() -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # Prepared statements do not survive transaction-mode connection switching
+        return {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {}
+
+engine = create_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    connect_args=_sync_connect_args(),
+    **_pool_kwargs(InstrumentedQueuePool),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for hot read paths: `async def` handlers wait on Postgres without
+# holding a threadpool thread
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    connect_args=_async_connect_args(),
+    **_pool_kwargs(InstrumentedAsyncQueuePool),
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+engine.pool.metrics = PoolMetrics("sync")
+async_engine.pool.metrics = PoolMetrics("async")
+
+def _replica_engine(url: str):
+    replica_engine = create_engine(url, connect_args=_sync_connect_args(), **_pool_kwargs(InstrumentedQueuePool))
+    replica_engine.pool.metrics = PoolMetrics(f"replica-sync {replica_engine.url.host or replica_engine.url.database}")
+    return replica_engine
+
+def _replica_async_engine(url: str):
+    replica_engine = create_async_engine(
+        url, connect_args=_async_connect_args(), **_pool_kwargs(InstrumentedAsyncQueuePool)
+    )
+    replica_engine.pool.metrics = PoolMetrics(f"replica-async {replica_engine.url.host or replica_engine.url.database}")
+    return replica_engine
+
+replicas = ReplicaSet(
+    settings.DB_REPLICA_URLS,
+    make_engine=_replica_engine,
+    make_async_engine=_replica_async_engine,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+# Set on responses to writes; holds the client's reads on the primary until it expires
+PRIMARY_COOKIE = "db_primary_until"
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def read_session_factory(request: Request) -> sessionmaker:
+    """Session factory for a read-only request: a healthy replica, else the primary."""
+    replica = None if _pinned_to_primary(request) else replicas.pick()
+    return replica.session_factory if replica else SessionLocal
+
+def get_read_db(request: Request):
+    """Like get_db, for handlers that only read. May be served by a replica."""
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    replica = None if _pinned_to_primary(request) else replicas.pick()
+    async with (replica.async_session_factory if replica else AsyncSessionLocal)() as db:
+        yield db
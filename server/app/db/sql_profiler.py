@@ -0,0 +1,85 @@
+"""
+Opt-in per-request SQL profiling (SQL_PROFILING_ENABLED).
+
+Each request gets its statement count, database time and statements grouped by
+fingerprint (see query_stats.py), available to handlers as
+`request.state.query_stats`. The response carries a Server-Timing header with
+database and total time, which browser devtools show in the request's Timing tab.
+
+A request is flagged, logged as a warning and kept for /internal/sql-profile
+when it takes at least SQL_PROFILING_SLOW_REQUEST_MS, runs at least
+SQL_PROFILING_MAX_QUERIES statements, or repeats one statement
+SQL_PROFILING_REPEAT_THRESHOLD times (the usual sign of an N+1 loop).
+"""
+import collections
+import logging
+import time
+from typing import Any, Deque, Dict, List
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.metrics import endpoint_name
+from app.db import query_stats
+
+logger = logging.getLogger(__name__)
+
+_flagged: Deque[Dict[str, Any]] = collections.deque(maxlen=100)
+
+
+def repeated(stats: query_stats.QueryStats) -> List[Dict[str, Any]]:
+    """Statements run at least SQL_PROFILING_REPEAT_THRESHOLD times, most frequent first."""
+    return sorted(
+        (
+            {"statement": statement, "count": int(count), "seconds": round(seconds, 6)}
+            for statement, (count, seconds) in (stats.statements or {}).items()
+            if count >= settings.SQL_PROFILING_REPEAT_THRESHOLD
+        ),
+        key=lambda r: -r["count"],
+    )
+
+
+async def profile_requests(request: Request, call_next):
+    """Middleware: profile the request's statements and add the Server-Timing header."""
+    token = query_stats.start(profile=True)
+    stats = query_stats.current()
+    request.state.query_stats = stats
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        query_stats.stop(token)
+    total_ms = (time.perf_counter() - started) * 1000
+    db_ms = stats.seconds * 1000
+    response.headers["Server-Timing"] = (
+        f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+    )
+
+    repeats = repeated(stats)
+    if (
+        total_ms >= settings.SQL_PROFILING_SLOW_REQUEST_MS
+        or stats.count >= settings.SQL_PROFILING_MAX_QUERIES
+        or repeats
+    ):
+        endpoint = endpoint_name(request.scope) or request.url.path
+        _flagged.append({
+            "method": request.method,
+            "endpoint": endpoint,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": stats.count,
+            "repeated": repeats,
+        })
+        logger.warning(
+            "%s %s took %.0f ms with %d queries (%.0f ms in the database)%s",
+            request.method, endpoint, total_ms, stats.count, db_ms,
+            "".join(f"\n  {r['count']}x {r['statement']}" for r in repeats),
+        )
+    return response
+
+
+def report() -> List[Dict[str, Any]]:
+    """The most recently flagged requests, newest first."""
+    return list(reversed(_flagged))
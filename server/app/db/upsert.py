@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Session
+
+
+def insert_for(db: Session):
+    """The dialect's `insert` construct, which supports ON CONFLICT upserts (Postgres and SQLite)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upserts are not supported on {dialect}")
+    return insert
@@ -1,22 +1,99 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.core import metrics
 from app.core.config import settings
+from app.core.security import PasswordHasherBusy
 from app.api.v1.api import api_router
-from app.db.base import Base
-from app.db.session import engine
-from app import models  # Import all models to register them
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db import query_analyzer, query_stats, sql_profiler
+from app.db.session import PRIMARY_COOKIE, async_engine, engine, replicas
+from app.services import analytics, platform_settings
+
+# The schema is managed by Alembic only (`alembic upgrade head`); nothing here
+# talks to the database at import, so a worker boots even while Postgres is down.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    platform_settings.start()
+    analytics.start()
+    yield
+    analytics.stop()
+    platform_settings.stop()
+    metrics.mark_process_dead()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+
+# Reachable in maintenance mode so admins can still sign in and switch it off
+MAINTENANCE_EXEMPT_PATHS = tuple(
+    f"{settings.API_V1_STR}{path}" for path in ("/auth", "/super-admin-settings", "/health", "/metrics", "/internal")
+)
+
+@app.middleware("http")
+async def maintenance_mode(request: Request, call_next):
+    """Reject requests with 503 while maintenance_mode is on. Reads the in-memory snapshot only."""
+    snapshot = platform_settings.current()
+    if (
+        snapshot is not None
+        and snapshot.maintenance_mode
+        and request.method != "OPTIONS"
+        and not request.url.path.startswith(MAINTENANCE_EXEMPT_PATHS)
+    ):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"{snapshot.platform_name} is down for maintenance"},
+            headers={"Retry-After": "60"},
+        )
+    return await call_next(request)
+
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    """Send a client's reads to the primary for a while after it writes (read-your-writes)."""
+    response = await call_next(request)
+    if replicas and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            PRIMARY_COOKIE, str(time.time() + window), max_age=window, httponly=True, samesite="lax"
+        )
+    return response
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many sign-in attempts in progress, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+if settings.QUERY_ANALYZER_ENABLED:
+    query_analyzer.install(engine)
+    query_analyzer.install(async_engine.sync_engine)
+    app.middleware("http")(query_analyzer.track_endpoint)
+
+if settings.METRICS_ENABLED or settings.SQL_PROFILING_ENABLED:
+    for instrumented in [engine, async_engine.sync_engine] + [
+        e for replica in replicas.replicas for e in (replica.engine, replica.async_engine.sync_engine)
+    ]:
+        query_stats.install(instrumented)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+if settings.SQL_PROFILING_ENABLED:
+    app.middleware("http")(sql_profiler.profile_requests)
 
-app = FastAPI(title=settings.PROJECT_NAME)
+if settings.METRICS_ENABLED:
+    # Registered last of the http middleware, so it is the outermost and times the others too
+    app.middleware("http")(metrics.track_requests)
 
+# Added last so it wraps the middleware above and their early responses still get CORS headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
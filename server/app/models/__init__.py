@@ -4,3 +4,9 @@ from .studio_settings import StudioSettings
 from .super_admin_settings import SuperAdminSettings
 from .event import Event
 from .user import User
+from .upload_session import UploadSession
+from .photo_face import PhotoFace
+from .event_stats import EventStats
+from .analytics import AnalyticsHourly
+from .job import Job
+from .storage_cleanup import StorageCleanup
@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from app.db.base import Base
+
+class AnalyticsHourly(Base):
+    """Hourly rollup of gallery analytics; raw hits are only ever counted in memory (see services/analytics.py)."""
+    __tablename__ = "analytics_hourly"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    # Start of the UTC hour
+    hour = Column(DateTime, primary_key=True, index=True)
+    # 'view', 'photo_view', 'download' or 'face_search'
+    kind = Column(String, primary_key=True)
+    count = Column(BigInteger, default=0, nullable=False)
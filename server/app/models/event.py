@@ -8,7 +8,7 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    start_date = Column(Date, nullable=True)
+    start_date = Column(Date, nullable=True, index=True)
     end_date = Column(Date, nullable=True)
     event_type = Column(String, nullable=True) # Wedding, Corporate, etc.
     location = Column(String, nullable=True)
@@ -16,10 +16,11 @@ class Event(Base):
     template_id = Column(String, nullable=True)
     
     # Status of the event: 'draft', 'published', 'unpublished', 'expired'
-    status = Column(String, default="unpublished")
+    status = Column(String, default="unpublished", index=True)
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
-    # Relationships
-    photos = relationship("Photo", back_populates="event", cascade="all, delete-orphan")
+    # Relationships. Deleting an event is left to ON DELETE CASCADE in the database
+    # instead of loading and deleting every photo through the session.
+    photos = relationship("Photo", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
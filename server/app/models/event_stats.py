@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer
+from app.db.base import Base
+import datetime
+
+class EventStats(Base):
+    """Per-event counters, kept up to date by the write paths (see services/event_stats.py)."""
+    __tablename__ = "event_stats"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    photo_count = Column(BigInteger, default=0, nullable=False)
+    total_bytes = Column(BigInteger, default=0, nullable=False)
+    download_count = Column(BigInteger, default=0, nullable=False)
+    face_search_count = Column(BigInteger, default=0, nullable=False)
+    # Bumped by every change to the event's photos; the version cached photo pages are checked against
+    photo_revision = Column(BigInteger, default=0, nullable=False, server_default="0")
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -0,0 +1,52 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, text
+from app.db.base import Base
+import datetime
+
+class Job(Base):
+    """A unit of background work, claimed by worker processes (see services/jobs.py)."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Name of the task to run, e.g. 'derivatives'
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    # 'queued', 'running', 'succeeded', 'failed'
+    status = Column(String, default="queued", nullable=False)
+    # Higher runs first
+    priority = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    # Not claimed before this time; pushed back on each retry
+    run_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    # At most one queued or running job per key, e.g. 'archive:12:<version>'
+    dedupe_key = Column(String, nullable=True, index=True)
+
+    # Worker holding the job and its last heartbeat; a stale heartbeat means the worker died
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    processed = Column(Integer, default=0, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    result = Column(JSON, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True, index=True)
+
+    __table_args__ = (
+        # Backs the claim query: WHERE status = 'queued' ORDER BY priority DESC, run_at, id
+        Index(
+            "ix_jobs_queued", text("priority DESC"), "run_at", "id",
+            postgresql_where=text("status = 'queued'"), sqlite_where=text("status = 'queued'"),
+        ),
+        Index(
+            "ix_jobs_running_locked_at", "locked_at",
+            postgresql_where=text("status = 'running'"), sqlite_where=text("status = 'running'"),
+        ),
+        Index(
+            "uq_jobs_dedupe_key_active", "dedupe_key", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
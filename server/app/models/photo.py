@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -6,9 +6,29 @@ class Photo(Base):
     __tablename__ = "photos"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
+    title = Column(String)
     url = Column(String)
-    event_id = Column(Integer, ForeignKey("events.id"))
+    # Object key in the configured storage backend, when the original is stored by us
+    storage_key = Column(String, nullable=True)
+    # Downscaled JPEG derivatives, filled in by the derivative workers after ingest
+    thumbnail_key = Column(String, nullable=True)
+    preview_key = Column(String, nullable=True)
+    web_key = Column(String, nullable=True)
+    # Size of the original in bytes, when known (uploads and rendered originals)
+    size_bytes = Column(BigInteger, nullable=True)
+    # SHA-256 of the original's bytes, used to skip re-uploads of the same file
+    content_hash = Column(String(64), nullable=True)
+    # 64-bit perceptual dHash (stored signed) for grouping near-identical burst frames
+    phash = Column(BigInteger, nullable=True)
+    # Set once the face indexer has processed the photo (even if it found no faces)
+    faces_indexed = Column(Boolean, default=False, nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"))
     
     # Relationship
     event = relationship("Event", back_populates="photos")
+
+    __table_args__ = (
+        # Backs keyset pagination of event galleries: WHERE event_id = ? AND id > ? ORDER BY id
+        Index("ix_photos_event_id_id", "event_id", "id"),
+        Index("uq_photos_event_id_content_hash", "event_id", "content_hash", unique=True),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, LargeBinary
+from app.db.base import Base
+
+class PhotoFace(Base):
+    __tablename__ = "photo_faces"
+
+    id = Column(Integer, primary_key=True, index=True)
+    photo_id = Column(Integer, ForeignKey("photos.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Denormalized so an event's index loads without joining photos
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Bounding box in pixels of the image the face was detected in
+    x = Column(Integer, nullable=False)
+    y = Column(Integer, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+
+    # L2-normalized float32 embedding
+    embedding = Column(LargeBinary, nullable=False)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Index, Integer, String
+from app.db.base import Base
+
+class StorageCleanup(Base):
+    """A stored object of a deleted event, waiting to be removed (see services/event_cleanup.py)."""
+    __tablename__ = "storage_cleanup"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: the event is already gone
+    event_id = Column(Integer, nullable=False)
+    key = Column(String, nullable=False)
+    # Set for an unfinished multipart upload, which is aborted instead of deleted
+    multipart_id = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("ix_storage_cleanup_event_id_id", "event_id", "id"),
+    )
@@ -36,3 +36,6 @@ class SuperAdminSettings(Base):
     
     # Notifications
     email_notifications_enabled = Column(Boolean, default=True)
+
+    # Incremented by every update; workers poll it instead of the whole row
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from app.db.base import Base
+import datetime
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    # Opaque id handed to the client; also names the object under the event's prefix
+    id = Column(String, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    total_size = Column(BigInteger, nullable=True)
+
+    storage_key = Column(String, nullable=False)
+    # Multipart upload id issued by the storage backend
+    multipart_id = Column(String, nullable=True)
+    # SHA-256 of the assembled file, computed by the server when the upload completes
+    content_hash = Column(String(64), nullable=True)
+
+    # 'uploading', 'completed', 'duplicate', 'aborted'
+    status = Column(String, default="uploading", nullable=False)
+    photo_id = Column(Integer, ForeignKey("photos.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
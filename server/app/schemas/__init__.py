@@ -1,6 +1,12 @@
-from .photo import Photo, PhotoCreate, PhotoUpdate
+from .photo import Photo, PhotoCreate, PhotoUpdate, PhotoBatchDuplicate, PhotoBatchError, PhotoBatchResult
 from .studio_settings import StudioSettings, StudioSettingsCreate, StudioSettingsUpdate
 from .super_admin_settings import SuperAdminSettings, SuperAdminSettingsCreate, SuperAdminSettingsUpdate
-from .event import Event, EventCreate, EventUpdate
+from .event import Event, EventCreate, EventSummary, EventUpdate
 from .token import Token, TokenPayload
 from .user import User, UserCreate, UserInDB, UserUpdate, UserLogin
+from .download import DownloadJob, EventCleanup
+from .upload import UploadCreate, UploadPart, UploadPartUrl, UploadSession
+from .face_search import FaceMatch, FaceSearchResult
+from .event_stats import EventStats
+from .analytics import AnalyticsCounts, AnalyticsHit, AnalyticsPoint, AnalyticsReport
+from .job import Job, JobCount
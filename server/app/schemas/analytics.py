@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Literal
+from datetime import datetime
+
+class AnalyticsHit(BaseModel):
+    # Gallery views, downloads and face searches are recorded by the server itself
+    kind: Literal["photo_view"] = "photo_view"
+
+class AnalyticsCounts(BaseModel):
+    view: int = 0
+    photo_view: int = 0
+    download: int = 0
+    face_search: int = 0
+
+class AnalyticsPoint(AnalyticsCounts):
+    bucket: datetime
+
+class AnalyticsReport(BaseModel):
+    interval: str
+    since: datetime
+    until: datetime
+    totals: AnalyticsCounts
+    points: List[AnalyticsPoint]
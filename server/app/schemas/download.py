@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class DownloadJob(BaseModel):
+    event_id: int
+    version: str
+    status: str
+    processed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+class EventCleanup(BaseModel):
+    event_id: int
+    status: str
+    processed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
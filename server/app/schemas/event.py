@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Optional
 from datetime import date, datetime
 
+from .photo import Photo
+
 class EventBase(BaseModel):
     name: str
     start_date: Optional[date] = None
@@ -25,3 +27,7 @@ class Event(EventBase):
 
     class Config:
         from_attributes = True
+
+class EventSummary(Event):
+    photo_count: int = 0
+    cover_photo: Optional[Photo] = None
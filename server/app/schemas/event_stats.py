@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class EventStats(BaseModel):
+    event_id: int
+    photo_count: int = 0
+    total_bytes: int = 0
+    download_count: int = 0
+    face_search_count: int = 0
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
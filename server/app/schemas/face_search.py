@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List
+
+class FaceMatch(BaseModel):
+    photo_id: int
+    score: float
+
+class FaceSearchResult(BaseModel):
+    matches: List[FaceMatch]
+    faces_indexed: int
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+class Job(BaseModel):
+    # The payload is left out: cleanup jobs carry every storage key of an event
+    id: int
+    kind: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    dedupe_key: Optional[str] = None
+    locked_by: Optional[str] = None
+    processed: int = 0
+    total: int = 0
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobCount(BaseModel):
+    kind: str
+    status: str
+    count: int
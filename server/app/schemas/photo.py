@@ -1,10 +1,17 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, computed_field
+from typing import Any, Dict, List, Optional
+
+from app.storage import get_storage
+
+def _url(key: Optional[str]) -> Optional[str]:
+    return get_storage().url(key) if key else None
 
 class PhotoBase(BaseModel):
     title: str
     url: str
     event_id: int
+    storage_key: Optional[str] = None
+    content_hash: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
 
 class PhotoCreate(PhotoBase):
     pass
@@ -16,6 +23,38 @@ class PhotoUpdate(PhotoBase):
 
 class Photo(PhotoBase):
     id: int
+    thumbnail_key: Optional[str] = None
+    preview_key: Optional[str] = None
+    web_key: Optional[str] = None
+
+    # Derivative URLs, so clients need not know the storage layout or public URL
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return _url(self.thumbnail_key)
+
+    @computed_field
+    @property
+    def preview_url(self) -> Optional[str]:
+        return _url(self.preview_key)
+
+    @computed_field
+    @property
+    def web_url(self) -> Optional[str]:
+        return _url(self.web_key)
 
     class Config:
         from_attributes = True # updated for Pydantic V2 (was orm_mode=True in V1)
+
+class PhotoBatchError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+class PhotoBatchDuplicate(BaseModel):
+    index: int
+    photo_id: int
+
+class PhotoBatchResult(BaseModel):
+    created_ids: List[int]
+    errors: List[PhotoBatchError] = []
+    duplicates: List[PhotoBatchDuplicate] = []
@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class UploadCreate(BaseModel):
+    event_id: int
+    filename: str
+    title: Optional[str] = None
+    content_type: Optional[str] = None
+    total_size: Optional[int] = None
+
+class UploadPart(BaseModel):
+    number: int
+    size: int
+
+class UploadPartUrl(BaseModel):
+    number: int
+    url: str
+
+class UploadSession(BaseModel):
+    id: str
+    event_id: int
+    filename: str
+    title: Optional[str] = None
+    content_type: Optional[str] = None
+    total_size: Optional[int] = None
+    storage_key: str
+    content_hash: Optional[str] = None
+    status: str
+    photo_id: Optional[int] = None
+    part_size: Optional[int] = None
+    parts: List[UploadPart] = []
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,229 @@
+"""
+Gallery analytics: views, photo views, downloads and face searches per event and hour.
+
+Gallery views and downloads are recorded by the handlers that serve them. Photo
+views only happen in the browser, so clients report them to a beacon endpoint
+that checks the event exists and limits each client with a `ClientLimiter`.
+
+Recording a hit only appends to an in-process ring buffer. A background thread
+drains the buffer when it holds ANALYTICS_FLUSH_BATCH hits or every
+ANALYTICS_FLUSH_INTERVAL_SECONDS. Hits are summed in memory by (event, hour,
+kind) and written as one upsert into analytics_hourly, so a burst of gallery
+views costs a handful of rows instead of one insert each.
+
+Downloads and face searches are also event_stats counters. Those are added in
+the same flush rather than by the request, so popular downloads do not queue on
+their event's stats row. The counters are only maintained while ANALYTICS_ENABLED is on.
+
+When the buffer is full, the oldest hits are dropped and counted; a failed flush
+keeps its sums for the next attempt. Readers see hits up to one flush interval late.
+"""
+import collections
+import datetime
+import logging
+import threading
+import time
+from typing import Counter, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import insert_for
+from app.services import event_stats
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("view", "photo_view", "download", "face_search")
+
+# Hit kinds that are also summed into event_stats counters
+STATS_COUNTERS = {"download": "download_count", "face_search": "face_search_count"}
+
+# (event_id, hour, kind)
+Key = Tuple[int, datetime.datetime, str]
+
+
+def hour_of(at: datetime.datetime) -> datetime.datetime:
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+class AnalyticsBuffer:
+    def __init__(self, capacity: int) -> None:
+        self._hits: Deque[Key] = collections.deque(maxlen=capacity)
+        # Sums from flushes that failed, retried with the next one
+        self._pending: Counter[Key] = collections.Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed_flushes = 0
+
+    def record(self, event_id: int, kind: str, at: Optional[datetime.datetime] = None) -> None:
+        key = (event_id, hour_of(at or datetime.datetime.utcnow()), kind)
+        with self._lock:
+            if len(self._hits) == self._hits.maxlen:
+                self.dropped += 1
+            self._hits.append(key)
+            self.recorded += 1
+            full = len(self._hits) >= settings.ANALYTICS_FLUSH_BATCH
+        if full:
+            self._wake.set()
+
+    def _drain(self) -> Counter[Key]:
+        with self._lock:
+            hits = list(self._hits)
+            self._hits.clear()
+            counts = self._pending + collections.Counter(hits)
+            self._pending.clear()
+        return counts
+
+    def flush(self) -> int:
+        """Write everything buffered so far. Returns the number of hits written."""
+        with self._flush_lock:
+            counts = self._drain()
+            if not counts:
+                return 0
+            db = SessionLocal()
+            try:
+                written = _write(db, counts)
+            except Exception:
+                with self._lock:
+                    self._pending.update(counts)
+                    self.failed_flushes += 1
+                raise
+            finally:
+                db.close()
+            self.flushed += written
+            return written
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(settings.ANALYTICS_FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing analytics failed")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="analytics-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write what is left."""
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing analytics at shutdown failed")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "buffered": len(self._hits),
+                "capacity": self._hits.maxlen,
+                "pending_rows": len(self._pending),
+                "recorded": self.recorded,
+                "dropped": self.dropped,
+                "flushed": self.flushed,
+                "failed_flushes": self.failed_flushes,
+            }
+
+
+class ClientLimiter:
+    """At most `limit` hits per client in each fixed window of `window` seconds."""
+
+    def __init__(self, limit: int, window: float = 60.0) -> None:
+        self.limit = limit
+        self.window = window
+        self._counts: Dict[str, int] = {}
+        self._window_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self, client: str) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                # Dropping all counts at once keeps memory bounded by one window's clients
+                self._counts.clear()
+                self._window_start = now
+            count = self._counts.get(client, 0)
+            if count >= self.limit:
+                return False
+            self._counts[client] = count + 1
+            return True
+
+
+def _write(db: Session, counts: Counter[Key]) -> int:
+    # Hits for events deleted since (or ids that never existed) would violate the FK
+    event_ids = {event_id for event_id, _, _ in counts}
+    existing = set(db.execute(select(models.Event.id).where(models.Event.id.in_(event_ids))).scalars())
+    rows = [
+        {"event_id": event_id, "hour": hour, "kind": kind, "count": count}
+        for (event_id, hour, kind), count in counts.items()
+        if event_id in existing
+    ]
+    if rows:
+        table = models.AnalyticsHourly.__table__
+        stmt = insert_for(db)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.event_id, table.c.hour, table.c.kind],
+            set_={"count": table.c.count + stmt.excluded["count"]},
+        )
+        # Sorted so concurrent flushes from several workers lock rows in the same order
+        db.execute(stmt, sorted(rows, key=lambda r: (r["event_id"], r["hour"], r["kind"])))
+        deltas: Dict[int, Counter[str]] = collections.defaultdict(collections.Counter)
+        for row in rows:
+            if row["kind"] in STATS_COUNTERS:
+                deltas[row["event_id"]][STATS_COUNTERS[row["kind"]]] += row["count"]
+        for event_id in sorted(deltas):
+            event_stats.increment(db, event_id, **deltas[event_id])
+        db.commit()
+    return sum(row["count"] for row in rows)
+
+
+buffer = AnalyticsBuffer(settings.ANALYTICS_BUFFER_SIZE)
+client_limiter = ClientLimiter(settings.ANALYTICS_CLIENT_HITS_PER_MINUTE)
+
+
+def record(event_id: int, kind: str) -> None:
+    if settings.ANALYTICS_ENABLED:
+        buffer.record(event_id, kind)
+
+
+def start() -> None:
+    if settings.ANALYTICS_ENABLED:
+        buffer.start()
+
+
+def stop() -> None:
+    if settings.ANALYTICS_ENABLED:
+        buffer.stop()
+
+
+def series(
+    rows: List[Tuple[datetime.datetime, str, int]], interval: str
+) -> List[Dict[str, object]]:
+    """
+    Turn (hour, kind, count) rollup rows into one point per hour or day with a
+    count per kind. Buckets without hits are omitted.
+    """
+    points: Dict[datetime.datetime, Dict[str, object]] = {}
+    for hour, kind, count in rows:
+        bucket = hour if interval == "hour" else hour.replace(hour=0)
+        point = points.setdefault(bucket, {"bucket": bucket, **{k: 0 for k in KINDS}})
+        if kind in KINDS:
+            point[kind] += count
+    return [points[bucket] for bucket in sorted(points)]
@@ -0,0 +1,128 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.storage import get_storage
+
+LOOKUP_CHUNK_SIZE = 1000
+# Object sizes fetched at once for a batch; each is one metadata request
+SIZE_WORKERS = 8
+
+
+def hash_object(key: str) -> str:
+    """SHA-256 of a stored object, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in get_storage().read_range(key):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class StoredObject:
+    """What a photo create call stores about the object its storage_key names."""
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+    # Why the item was rejected, and the field at fault
+    error: Optional[str] = None
+    error_field: Optional[str] = None
+
+
+def uploaded_objects(db: Session, event_id: int, storage_keys: Iterable[str]) -> Dict[str, Tuple[str, Optional[int]]]:
+    """
+    Map each key that holds a completed upload of the event to the content hash
+    and size recorded from its bytes when that upload completed.
+    """
+    keys = list(set(storage_keys))
+    found: Dict[str, Tuple[str, Optional[int]]] = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        rows = db.query(
+            models.UploadSession.storage_key, models.UploadSession.content_hash, models.UploadSession.total_size
+        ).filter(
+            models.UploadSession.event_id == event_id,
+            models.UploadSession.status == "completed",
+            models.UploadSession.storage_key.in_(keys[start:start + LOOKUP_CHUNK_SIZE]),
+        )
+        found.update((key, (content_hash, size)) for key, content_hash, size in rows)
+    return found
+
+
+def _object_size(storage_key: str) -> Optional[int]:
+    """Size of a stored object from its metadata (no read), or None if it does not exist."""
+    storage = get_storage()
+    try:
+        return storage.size(storage_key)
+    except Exception:
+        if not storage.exists(storage_key):
+            return None
+        raise
+
+
+def check_objects(
+    db: Session, event_id: int, items: List[Tuple[Optional[str], Optional[str]]]
+) -> List[StoredObject]:
+    """
+    The content hash and size to store for each (storage_key, claimed hash) pair.
+
+    Only hashes the server computed are used: those of completed uploads, looked
+    up by key. A client-supplied hash is at most checked against one, never
+    trusted, since a wrong one would make later uploads of other files resolve to
+    this photo. Objects are not read here; photos whose key is not a completed
+    upload get no hash and are not deduplicated. Their size comes from the
+    object's metadata, fetched for all of them in parallel.
+    """
+    uploaded = uploaded_objects(db, event_id, (key for key, _ in items if key))
+    others = list({key for key, _ in items if key and key not in uploaded})
+    sizes: Dict[str, Optional[int]] = {}
+    if others:
+        with ThreadPoolExecutor(max_workers=SIZE_WORKERS, thread_name_prefix="object-size") as pool:
+            sizes = dict(zip(others, pool.map(_object_size, others)))
+    results: List[StoredObject] = []
+    for storage_key, claimed in items:
+        if not storage_key:
+            results.append(StoredObject())
+        elif storage_key in uploaded:
+            content_hash, size_bytes = uploaded[storage_key]
+            if claimed and claimed != content_hash:
+                results.append(StoredObject(
+                    error="content_hash does not match the uploaded file", error_field="content_hash"
+                ))
+            else:
+                results.append(StoredObject(content_hash=content_hash, size_bytes=size_bytes))
+        elif sizes[storage_key] is None:
+            results.append(StoredObject(error="Stored object not found", error_field="storage_key"))
+        else:
+            results.append(StoredObject(size_bytes=sizes[storage_key]))
+    return results
+
+
+def check_object(db: Session, event_id: int, storage_key: Optional[str], claimed: Optional[str]) -> StoredObject:
+    """`check_objects` of one photo. Raises ValueError if it is rejected."""
+    stored = check_objects(db, event_id, [(storage_key, claimed)])[0]
+    if stored.error:
+        raise ValueError(stored.error)
+    return stored
+
+
+def find_existing(db: Session, event_id: int, hashes: Iterable[str]) -> Dict[str, int]:
+    """Map each content hash already present in the event to the id of its photo."""
+    hashes = list(set(hashes))
+    found: Dict[str, int] = {}
+    for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+        rows = db.query(models.Photo.content_hash, models.Photo.id).filter(
+            models.Photo.event_id == event_id,
+            models.Photo.content_hash.in_(hashes[start:start + LOOKUP_CHUNK_SIZE]),
+        )
+        found.update(dict(rows.all()))
+    return found
+
+
+def get_duplicate(db: Session, event_id: int, content_hash: Optional[str]) -> Optional[models.Photo]:
+    if not content_hash:
+        return None
+    return db.query(models.Photo).filter(
+        models.Photo.event_id == event_id, models.Photo.content_hash == content_hash
+    ).first()
@@ -0,0 +1,225 @@
+"""
+Thumbnail, preview and web-size derivatives of stored originals.
+
+Decoding runs in a process pool so JPEG work uses every core instead of the
+request worker's GIL. The worker processes only touch storage; the resulting
+keys are written back to the database from the parent process. Photos are
+rendered DERIVATIVE_BATCH_SIZE at a time, so a bulk upload costs one pool task
+and one vectorised hashing call per batch. With JOB_QUEUE_ENABLED, each batch is
+a 'derivatives' job and the pool runs in the job worker instead of the API process.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import event_stats, jobs
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Long-edge pixel sizes, largest first: each derivative is resized from the previous one
+SIZES = (
+    ("web", 2048),
+    ("preview", 1024),
+    ("thumbnail", 320),
+)
+
+# (event_id, photo_id, column values or None, error or None)
+Rendered = Tuple[int, int, Optional[Dict[str, Any]], Optional[str]]
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def derivative_key(event_id: int, photo_id: int, name: str) -> str:
+    return f"events/{event_id}/derivatives/{photo_id}/{name}.jpg"
+
+
+def _render(event_id: int, photo_id: int, storage_key: str) -> Tuple[Dict[str, Any], Any]:
+    """Render and store every size of one photo; returns its column values and its dHash input."""
+    from PIL import Image, ImageOps
+
+    from app.services import phash
+
+    storage = get_storage()
+    keys = {}
+    with tempfile.TemporaryFile() as src:
+        for chunk in storage.read_range(storage_key):
+            src.write(chunk)
+        keys["size_bytes"] = src.tell()
+        src.seek(0)
+        with Image.open(src) as original:
+            # For JPEGs, draft() lets libjpeg decode at 1/2, 1/4 or 1/8 scale directly,
+            # which is several times faster than decoding full size and resizing
+            original.draft("RGB", (SIZES[0][1], SIZES[0][1]))
+            image = ImageOps.exif_transpose(original).convert("RGB")
+        hash_input = phash.hash_input(image)
+        for name, size in SIZES:
+            image.thumbnail((size, size), Image.LANCZOS)
+            fd, tmp_path = tempfile.mkstemp(suffix=".jpg")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    image.save(
+                        out, "JPEG", quality=settings.DERIVATIVE_JPEG_QUALITY, optimize=True, progressive=True
+                    )
+                key = derivative_key(event_id, photo_id, name)
+                storage.put_file(key, tmp_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            keys[f"{name}_key"] = key
+    return keys, hash_input
+
+
+def render_batch(photos: List[Tuple[int, int, str]]) -> List[Rendered]:
+    """
+    Render and store every size of a batch of (event_id, photo_id, storage_key)
+    photos. Runs inside a pool process.
+
+    Returns (event_id, photo_id, keys, error) per photo. `keys` are the Photo
+    column values to set (derivative keys, perceptual hash, size of the original);
+    the batch's hashes are computed in one vectorised call. A photo that fails
+    has keys None and the error message, without failing the rest.
+    """
+    import numpy as np
+
+    from app.services import phash
+
+    results: List[Rendered] = []
+    rendered = []
+    for event_id, photo_id, storage_key in photos:
+        try:
+            keys, hash_input = _render(event_id, photo_id, storage_key)
+        except Exception as e:
+            results.append((event_id, photo_id, None, f"{type(e).__name__}: {e}"))
+            continue
+        rendered.append((event_id, photo_id, keys, hash_input))
+    if rendered:
+        hashes = phash.dhash_pixels(np.stack([hash_input for _, _, _, hash_input in rendered]))
+        for (event_id, photo_id, keys, _), value in zip(rendered, hashes):
+            keys["phash"] = phash.to_db(value)
+            results.append((event_id, photo_id, keys, None))
+    return results
+
+
+def batches(photos: List[Tuple[int, int, str]], size: Optional[int] = None) -> Iterable[List[Tuple[int, int, str]]]:
+    size = size or settings.DERIVATIVE_BATCH_SIZE
+    for i in range(0, len(photos), size):
+        yield photos[i:i + size]
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: forking a threaded server process can deadlock the child
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.DERIVATIVE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def save_derivative_keys(photo_id: int, keys: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        photo = (
+            db.query(models.Photo.event_id, models.Photo.size_bytes)
+            .filter(models.Photo.id == photo_id)
+            .with_for_update()
+            .first()
+        )
+        if photo is None:
+            return
+        # Photos created without a known size are added to the event's total once
+        size_bytes = keys.pop("size_bytes", None)
+        if photo.size_bytes is None and size_bytes is not None:
+            keys["size_bytes"] = size_bytes
+            if photo.event_id:
+                event_stats.increment(db, photo.event_id, total_bytes=size_bytes, photo_revision=1)
+        elif photo.event_id:
+            # The derivative URLs change the event's photo pages
+            event_stats.increment(db, photo.event_id, photo_revision=1)
+        db.query(models.Photo).filter(models.Photo.id == photo_id).update(keys)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _save(event_id: int, photo_id: int, keys: Dict[str, Any]) -> None:
+    save_derivative_keys(photo_id, keys)
+    from app.services import faces
+
+    faces.schedule(event_id, photo_id, keys.get("web_key"))
+
+
+def _save_batch(results: List[Rendered]) -> List[int]:
+    """Save the rendered photos of a batch; returns the ids of the ones that failed."""
+    failed = []
+    for event_id, photo_id, keys, error in results:
+        if keys is None:
+            logger.error("Generating derivatives for photo %s failed: %s", photo_id, error)
+            failed.append(photo_id)
+            continue
+        try:
+            _save(event_id, photo_id, keys)
+        except Exception:
+            logger.exception("Saving derivatives for photo %s failed", photo_id)
+            failed.append(photo_id)
+    return failed
+
+
+def _on_done(future: Future) -> None:
+    try:
+        results = future.result()
+    except Exception:
+        logger.exception("Generating a batch of derivatives failed")
+        return
+    _save_batch(results)
+
+
+def run_job(job: jobs.JobContext) -> Dict[str, Any]:
+    """Job task: render a batch of photos' derivatives on the pool and save them."""
+    photos = [tuple(photo) for photo in job.payload["photos"]]
+    # A retried batch only redoes the photos that failed last time
+    db = SessionLocal()
+    try:
+        done = set(db.execute(select(models.Photo.id).where(
+            models.Photo.id.in_([photo_id for _, photo_id, _ in photos]),
+            models.Photo.thumbnail_key.isnot(None),
+            models.Photo.phash.isnot(None),
+        )).scalars())
+    finally:
+        db.close()
+    photos = [photo for photo in photos if photo[1] not in done]
+    failed = _save_batch(get_pool().submit(render_batch, photos).result()) if photos else []
+    if failed:
+        raise RuntimeError(f"Rendering failed for photo(s) {', '.join(map(str, failed))}")
+    return {"rendered": len(photos)}
+
+
+def schedule(photos: Iterable[Tuple[int, int, Optional[str]]]) -> None:
+    """
+    Queue derivative generation for (event_id, photo_id, storage_key) triples,
+    DERIVATIVE_BATCH_SIZE photos per pool task (or job).
+
+    Photos without a storage_key have no original we can read and are skipped.
+    """
+    if not settings.DERIVATIVES_ENABLED:
+        return
+    photos = [photo for photo in photos if photo[2]]
+    if settings.JOB_QUEUE_ENABLED:
+        db = SessionLocal()
+        try:
+            jobs.enqueue_many(db, "derivatives", ({"photos": batch} for batch in batches(photos)))
+        finally:
+            db.close()
+        return
+    for batch in batches(photos):
+        get_pool().submit(render_batch, batch).add_done_callback(_on_done)
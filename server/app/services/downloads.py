@@ -0,0 +1,250 @@
+"""
+"Download all" archives for event galleries.
+
+An archive is identified by the event id and a version hash of the event's photo
+set, so it is built once and served from storage until photos are added, removed
+or replaced. Once a build is stored, archives of other versions are deleted, so
+the event keeps at most the one matching its current photos. Builds run as
+background tasks of the API process, or as 'archive' jobs on the job queue with
+JOB_QUEUE_ENABLED. In-process jobs are forgotten FINISHED_JOB_TTL_SECONDS after
+they finish.
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import jobs
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+FINISHED_JOB_TTL_SECONDS = 3600
+
+
+@dataclass
+class DownloadJob:
+    event_id: int
+    version: str
+    status: str = "pending"  # pending, building, ready, failed
+    processed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    # time.monotonic() when the build succeeded or failed
+    finished_at: Optional[float] = field(default=None, repr=False)
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.monotonic()
+
+
+_jobs: Dict[Tuple[int, str], DownloadJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _prune_jobs() -> None:
+    # Called with _jobs_lock held
+    expired = time.monotonic() - FINISHED_JOB_TTL_SECONDS
+    for key in [key for key, job in _jobs.items() if job.finished_at is not None and job.finished_at < expired]:
+        del _jobs[key]
+
+
+def archive_prefix(event_id: int) -> str:
+    return f"archives/event-{event_id}/"
+
+
+def archive_key(event_id: int, version: str) -> str:
+    return f"{archive_prefix(event_id)}{version}.zip"
+
+
+def photo_set_version(db: Session, event_id: int) -> str:
+    """Hash of the (id, storage_key) pairs of every stored photo in the event."""
+    digest = hashlib.sha256()
+    rows = db.execute(
+        select(models.Photo.id, models.Photo.storage_key)
+        .where(models.Photo.event_id == event_id, models.Photo.storage_key.isnot(None))
+        .order_by(models.Photo.id)
+    )
+    for photo_id, storage_key in rows:
+        digest.update(f"{photo_id}:{storage_key}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _dedupe_key(event_id: int, version: str) -> str:
+    return f"archive:{event_id}:{version}"
+
+
+# Job queue status -> DownloadJob status
+_QUEUE_STATUSES = {"queued": "pending", "running": "building", "succeeded": "ready", "failed": "failed"}
+
+
+def _queued_job(event_id: int, version: str) -> Optional[DownloadJob]:
+    db = SessionLocal()
+    try:
+        queued = jobs.latest(db, _dedupe_key(event_id, version))
+    finally:
+        db.close()
+    if queued is None:
+        return None
+    return DownloadJob(
+        event_id=event_id,
+        version=version,
+        status=_QUEUE_STATUSES[queued.status],
+        processed=queued.processed,
+        total=queued.total,
+        error=queued.last_error if queued.status == "failed" else None,
+    )
+
+
+def get_job(event_id: int, version: str) -> DownloadJob:
+    """Current state of the archive for this version, whether or not a job ran in this process."""
+    with _jobs_lock:
+        job = _jobs.get((event_id, version))
+    if settings.JOB_QUEUE_ENABLED:
+        job = _queued_job(event_id, version) or job
+    if job and job.status != "ready":
+        return job
+    if get_storage().exists(archive_key(event_id, version)):
+        return job or DownloadJob(event_id=event_id, version=version, status="ready")
+    return DownloadJob(event_id=event_id, version=version, status="missing")
+
+
+def claim_job(event_id: int, version: str) -> Optional[DownloadJob]:
+    """
+    Register a new build job to run in this process, or return None if one is already
+    pending or building. With the job queue, the build is queued and None is returned.
+    """
+    if settings.JOB_QUEUE_ENABLED:
+        db = SessionLocal()
+        try:
+            jobs.enqueue(
+                db, "archive", {"event_id": event_id, "version": version},
+                priority=5, dedupe_key=_dedupe_key(event_id, version),
+            )
+        finally:
+            db.close()
+        return None
+    with _jobs_lock:
+        _prune_jobs()
+        job = _jobs.get((event_id, version))
+        if job and job.status in ("pending", "building"):
+            return None
+        job = DownloadJob(event_id=event_id, version=version)
+        _jobs[(event_id, version)] = job
+        return job
+
+
+def write_archive(job: DownloadJob, progress: Optional[Callable[[DownloadJob], None]] = None) -> None:
+    """
+    Write the event's stored photos into a ZIP in the scratch directory, then move it to storage.
+
+    Photos are copied chunk by chunk, so neither the sources nor the archive are held in memory.
+    Entries are stored uncompressed: JPEG/RAW data does not shrink and deflate only costs CPU.
+    `progress` is called after each photo.
+    """
+    storage = get_storage()
+    db = SessionLocal()
+    tmp_path = None
+    try:
+        job.status = "building"
+        job.total = db.query(models.Photo).filter(
+            models.Photo.event_id == job.event_id, models.Photo.storage_key.isnot(None)
+        ).count()
+        os.makedirs(settings.DOWNLOAD_TMP_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".zip", dir=settings.DOWNLOAD_TMP_DIR)
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as zf:
+            stmt = (
+                select(models.Photo.id, models.Photo.storage_key)
+                .where(models.Photo.event_id == job.event_id, models.Photo.storage_key.isnot(None))
+                .order_by(models.Photo.id)
+                .execution_options(yield_per=settings.PHOTO_EXPORT_YIELD_PER)
+            )
+            for photo_id, storage_key in db.execute(stmt):
+                name = f"{photo_id}-{posixpath.basename(storage_key)}"
+                with zf.open(name, "w", force_zip64=True) as entry:
+                    for chunk in storage.read_range(storage_key, chunk_size=COPY_CHUNK_SIZE):
+                        entry.write(chunk)
+                job.processed += 1
+                if progress:
+                    progress(job)
+        storage.put_file(archive_key(job.event_id, job.version), tmp_path)
+        tmp_path = None
+        remove_superseded(db, job.event_id)
+        job.finish("ready")
+    finally:
+        db.close()
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def remove_superseded(db: Session, event_id: int) -> None:
+    """
+    Delete the event's archives of every version but the current one. Checked
+    against the photo set after storing, so a build that finished late cannot
+    delete a newer version's archive; it removes itself instead.
+    """
+    storage = get_storage()
+    current = archive_key(event_id, photo_set_version(db, event_id))
+    superseded = [key for key in storage.list_keys(archive_prefix(event_id)) if key != current]
+    if superseded:
+        storage.delete_many(superseded)
+
+
+def build_archive(job: DownloadJob) -> None:
+    """Background task: write the archive, recording a failure on the job."""
+    try:
+        write_archive(job)
+    except Exception as e:
+        logger.exception("Building archive for event %s failed", job.event_id)
+        job.finish("failed", str(e))
+
+
+def run_job(queued: jobs.JobContext) -> None:
+    """Job task: build the archive of one photo set version."""
+    job = DownloadJob(event_id=queued.payload["event_id"], version=queued.payload["version"])
+    write_archive(job, progress=lambda j: queued.set_progress(j.processed, j.total))
+    queued.set_progress(job.processed, job.total, force=True)
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range` header into an inclusive (start, end) pair.
+
+    Returns None when there is no usable header (serve the whole body) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
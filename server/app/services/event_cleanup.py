@@ -0,0 +1,195 @@
+"""
+Deleting events, including very large ones.
+
+The database side is one DELETE of the event row: photos, faces, upload
+sessions, stats and analytics go with it through ON DELETE CASCADE, so nothing
+is loaded into the session. In the same transaction, the keys of the stored
+objects are copied into the storage_cleanup table with INSERT ... SELECT. This
+covers originals, derivatives and unfinished multipart uploads, but only keys
+under the event's own prefix: rows created before keys were checked may name
+another event's objects, and those must survive. A background
+job then removes them in batches and its progress can be polled. Objects under
+the event's prefix that the database does not reference, such as download
+archives and the face index, are found by listing. With JOB_QUEUE_ENABLED the
+job is an 'event_cleanup' job carrying only the event id, queued in the same
+transaction as the delete so the files cannot be forgotten. Otherwise the job is
+tracked in process and forgotten FINISHED_JOB_TTL_SECONDS after it finishes.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import and_, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import jobs, response_cache
+from app.services.downloads import archive_prefix
+from app.storage import event_prefix, get_storage
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 1000
+
+FINISHED_JOB_TTL_SECONDS = 3600
+
+
+@dataclass
+class CleanupJob:
+    event_id: int
+    status: str = "pending"  # pending, running, done, failed
+    processed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    # time.monotonic() when the cleanup succeeded or failed
+    finished_at: Optional[float] = field(default=None, repr=False)
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.monotonic()
+
+
+_jobs: Dict[int, CleanupJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def _prune_jobs() -> None:
+    # Called with _jobs_lock held
+    expired = time.monotonic() - FINISHED_JOB_TTL_SECONDS
+    for key in [key for key, job in _jobs.items() if job.finished_at is not None and job.finished_at < expired]:
+        del _jobs[key]
+
+
+def _dedupe_key(event_id: int) -> str:
+    return f"event_cleanup:{event_id}"
+
+
+# Job queue status -> CleanupJob status
+_QUEUE_STATUSES = {"queued": "pending", "running": "running", "succeeded": "done", "failed": "failed"}
+
+
+def _owned(column, event_id: int):
+    # The SQL side of is_event_key: under the prefix, with no segment leading out of it
+    return and_(column.startswith(event_prefix(event_id), autoescape=True), ~column.contains("/../"))
+
+
+def _stage_objects(db: Session, event_id: int) -> int:
+    """Copy the keys of the event's own stored objects into storage_cleanup; returns how many."""
+    table = models.StorageCleanup.__table__
+    photo = models.Photo
+    keys = union_all(*(
+        select(photo.event_id, column).where(photo.event_id == event_id, _owned(column, event_id))
+        for column in (photo.storage_key, photo.thumbnail_key, photo.preview_key, photo.web_key)
+    ))
+    upload = models.UploadSession
+    uploads = select(upload.event_id, upload.storage_key, upload.multipart_id).where(
+        upload.event_id == event_id, upload.status == "uploading", _owned(upload.storage_key, event_id)
+    )
+    staged = db.execute(insert(table).from_select(["event_id", "key"], keys)).rowcount
+    staged += db.execute(insert(table).from_select(["event_id", "key", "multipart_id"], uploads)).rowcount
+    return staged
+
+
+def delete_event(db: Session, event_id: int) -> CleanupJob:
+    """
+    Delete the event and everything referencing it in one statement and commit.
+    Returns the storage cleanup job to run afterwards with `clean_storage`, or
+    the queued job's state when the job queue runs it.
+    """
+    job = CleanupJob(event_id=event_id)
+    job.total = _stage_objects(db, event_id)
+    db.query(models.Event).filter(models.Event.id == event_id).delete(synchronize_session=False)
+    response_cache.changed(db, f"event:{event_id}", f"photos:{event_id}", "events")
+    if settings.JOB_QUEUE_ENABLED:
+        queued = jobs.enqueue(
+            db, "event_cleanup", {"event_id": event_id},
+            priority=-10, dedupe_key=_dedupe_key(event_id), commit=False,
+        )
+        queued.total = job.total
+        db.commit()
+        return job
+    db.commit()
+    with _jobs_lock:
+        _prune_jobs()
+        _jobs[event_id] = job
+    return job
+
+
+def get_job(event_id: int) -> Optional[CleanupJob]:
+    """The cleanup job of a deleted event, if it was deleted through this process or queued."""
+    if settings.JOB_QUEUE_ENABLED:
+        db = SessionLocal()
+        try:
+            queued = jobs.latest(db, _dedupe_key(event_id))
+        finally:
+            db.close()
+        if queued is not None:
+            return CleanupJob(
+                event_id=event_id,
+                status=_QUEUE_STATUSES[queued.status],
+                processed=queued.processed,
+                total=queued.total,
+                error=queued.last_error if queued.status == "failed" else None,
+            )
+    with _jobs_lock:
+        return _jobs.get(event_id)
+
+
+def remove_objects(job: CleanupJob, progress: Optional[Callable[[CleanupJob], None]] = None) -> None:
+    """
+    Remove the deleted event's staged objects in batches, calling `progress` after
+    each batch. Staged rows are dropped once their objects are gone, so a rerun
+    after a failure picks up where it stopped.
+    """
+    storage = get_storage()
+    staged = models.StorageCleanup
+    job.status = "running"
+    db = SessionLocal()
+    try:
+        while True:
+            batch = db.query(staged.id, staged.key, staged.multipart_id).filter(
+                staged.event_id == job.event_id
+            ).order_by(staged.id).limit(DELETE_BATCH_SIZE).all()
+            if not batch:
+                break
+            for row in batch:
+                if row.multipart_id:
+                    storage.abort_multipart(row.key, row.multipart_id)
+            storage.delete_many([row.key for row in batch if not row.multipart_id])
+            db.query(staged).filter(staged.id.in_([row.id for row in batch])).delete(synchronize_session=False)
+            db.commit()
+            job.processed += len(batch)
+            job.total = max(job.total, job.processed)
+            if progress:
+                progress(job)
+    finally:
+        db.close()
+    # Archives, the face index and anything else left under the event's prefixes
+    for prefix in (archive_prefix(job.event_id), event_prefix(job.event_id)):
+        leftovers = list(storage.list_keys(prefix))
+        job.total += len(leftovers)
+        for i in range(0, len(leftovers), DELETE_BATCH_SIZE):
+            storage.delete_many(leftovers[i:i + DELETE_BATCH_SIZE])
+        job.processed += len(leftovers)
+    job.finish("done")
+
+
+def run_job(queued: jobs.JobContext) -> None:
+    """Job task: remove a deleted event's objects."""
+    job = CleanupJob(event_id=queued.payload["event_id"])
+    remove_objects(job, progress=lambda j: queued.set_progress(j.processed))
+    queued.set_progress(job.processed, job.total, force=True)
+
+
+def clean_storage(job: CleanupJob) -> None:
+    """Background task: remove the objects, recording a failure on the job."""
+    try:
+        remove_objects(job)
+    except Exception as e:
+        logger.exception("Cleaning up storage of deleted event %s failed", job.event_id)
+        job.finish("failed", str(e))
@@ -0,0 +1,83 @@
+"""
+Per-event counters in the event_stats table.
+
+Write paths call `increment` inside their own transaction, so a counter is
+committed together with the rows it counts and reading it is a primary-key
+lookup. Download and face search counts arrive in batches from the analytics
+flush (see analytics.py) instead.
+
+Nothing decrements photo_count or total_bytes: no endpoint removes single
+photos, and deleting an event drops its stats row. Anything that deletes photos
+some other way must decrement in the same transaction, or run `reconcile`
+(reconcile_event_stats.py) afterwards. `reconcile` recounts photos and bytes
+from the photos table and is the only correction path. Downloads and face
+searches have no source table and are left as they are.
+
+photo_revision is not a count but a version: writes that add or change photos
+pass photo_revision=1, which also tells the response cache (see
+response_cache.py) that the event's photo pages changed.
+"""
+import datetime
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db.upsert import insert_for
+from app.services import response_cache
+
+COUNTERS = ("photo_count", "total_bytes", "download_count", "face_search_count", "photo_revision")
+
+
+def increment(db: Session, event_id: int, **deltas: int) -> None:
+    """
+    Add `deltas` (e.g. photo_count=1, total_bytes=size) to an event's counters,
+    creating its row if needed. Does not commit.
+    """
+    table = models.EventStats.__table__
+    stmt = insert_for(db)(table).values(
+        event_id=event_id,
+        updated_at=datetime.datetime.utcnow(),
+        **{counter: deltas.get(counter, 0) for counter in COUNTERS},
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.event_id],
+        set_={
+            **{counter: table.c[counter] + stmt.excluded[counter] for counter in deltas},
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    if deltas.get("photo_revision"):
+        response_cache.changed(db, f"photos:{event_id}", "events")
+
+
+def reconcile(db: Session, event_id: Optional[int] = None) -> int:
+    """
+    Recount photo_count and total_bytes from photos, one event per transaction.
+    Returns how many events had drifted.
+
+    Each event's stats row is locked before its photos are counted. A concurrent
+    insert either committed before the lock (and is counted) or increments the
+    row after this transaction commits, so the repair cannot itself introduce drift.
+    """
+    query = select(models.Event.id).order_by(models.Event.id)
+    if event_id is not None:
+        query = query.where(models.Event.id == event_id)
+    repaired = 0
+    for (eid,) in db.execute(query).all():
+        increment(db, eid)
+        stats = db.query(models.EventStats).filter(models.EventStats.event_id == eid).with_for_update().one()
+        photo_count, total_bytes = db.query(
+            func.count(models.Photo.id), func.coalesce(func.sum(models.Photo.size_bytes), 0)
+        ).filter(models.Photo.event_id == eid).one()
+        if (stats.photo_count, stats.total_bytes) != (photo_count, total_bytes):
+            stats.photo_count = photo_count
+            stats.total_bytes = total_bytes
+            # Listings show the photo count
+            stats.photo_revision += 1
+            response_cache.changed(db, "events")
+            repaired += 1
+        db.commit()
+    return repaired
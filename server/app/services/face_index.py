@@ -0,0 +1,281 @@
+"""
+Per-event in-memory vector index over stored face embeddings.
+
+Small events are searched by brute force (one matrix-vector product). Large
+events get an IVF index: embeddings are bucketed by their nearest k-means
+centroid and a query only scans the `nprobe` closest buckets.
+
+Training the IVF index is too slow for a search request, so it happens off the
+request path: after faces are indexed, `schedule_refresh` rebuilds the event's
+index (debounced, through the job queue when enabled) and stores it next to the
+event's files. Searches only load that stored index; while it is missing or
+behind the event's faces they fall back to brute force.
+"""
+import datetime
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import jobs
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+KMEANS_ITERATIONS = 10
+
+
+# A brute-force fallback for an event that should have an IVF index looks for
+# the stored index again after this long
+STALE_RECHECK_SECONDS = 30
+
+
+class FaceIndex:
+    def __init__(
+        self,
+        photo_ids: np.ndarray,
+        embeddings: np.ndarray,
+        ivf_min_faces: Optional[int] = None,
+        centroids: Optional[np.ndarray] = None,
+        assignment: Optional[np.ndarray] = None,
+    ):
+        self.photo_ids = photo_ids
+        self.embeddings = embeddings
+        self.centroids: Optional[np.ndarray] = None
+        self.assignment: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+        if centroids is not None:
+            self._set_ivf(centroids, assignment)
+        elif ivf_min_faces is not None and len(embeddings) >= ivf_min_faces:
+            self._train_ivf(int(np.sqrt(len(embeddings))))
+
+    def __len__(self) -> int:
+        return len(self.photo_ids)
+
+    def _train_ivf(self, nlist: int) -> None:
+        rng = np.random.default_rng(0)
+        centroids = self.embeddings[rng.choice(len(self.embeddings), nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(self.embeddings @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = self.embeddings[assignment == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / np.linalg.norm(centroid)
+        self._set_ivf(centroids, np.argmax(self.embeddings @ centroids.T, axis=1))
+
+    def _set_ivf(self, centroids: np.ndarray, assignment: np.ndarray) -> None:
+        self.centroids = centroids
+        self.assignment = assignment
+        self.lists = [np.flatnonzero(assignment == c) for c in range(len(centroids))]
+
+    def search(self, query: np.ndarray, threshold: float, top_k: int, nprobe: int = 8) -> List[Tuple[int, float]]:
+        """
+        Photos with a face whose cosine similarity to `query` is at least `threshold`,
+        best first, as (photo_id, score). A photo's score is its best-matching face.
+        """
+        if not len(self):
+            return []
+        if self.centroids is None:
+            candidates = None
+            scores = self.embeddings @ query
+        else:
+            probe = np.argsort(self.centroids @ query)[::-1][:nprobe]
+            candidates = np.concatenate([self.lists[c] for c in probe])
+            scores = self.embeddings[candidates] @ query
+        hits = np.flatnonzero(scores >= threshold)
+        rows = hits if candidates is None else candidates[hits]
+        best: Dict[int, float] = {}
+        for row, score in zip(rows, scores[hits]):
+            photo_id = int(self.photo_ids[row])
+            if score > best.get(photo_id, -1.0):
+                best[photo_id] = float(score)
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+Signature = Tuple[int, Optional[int]]
+
+
+@dataclass
+class _Cached:
+    signature: Signature
+    index: FaceIndex
+    # False for a brute-force stand-in while the stored IVF index is missing or stale
+    complete: bool
+    loaded_at: float
+
+
+_MAX_CACHED_EVENTS = 16
+_cache: "OrderedDict[int, _Cached]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def index_key(event_id: int) -> str:
+    return f"events/{event_id}/faces/index.npz"
+
+
+def _signature(db: Session, event_id: int) -> Signature:
+    # Faces are only ever added with new ids or deleted, so (count, max id) changes with any change
+    return tuple(db.query(func.count(models.PhotoFace.id), func.max(models.PhotoFace.id)).filter(
+        models.PhotoFace.event_id == event_id
+    ).one())
+
+
+def _load_embeddings(db: Session, event_id: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Ordered by id so rows line up with the assignment stored with the IVF index
+    rows = db.query(models.PhotoFace.photo_id, models.PhotoFace.embedding).filter(
+        models.PhotoFace.event_id == event_id
+    ).order_by(models.PhotoFace.id).all()
+    photo_ids = np.array([photo_id for photo_id, _ in rows], dtype=np.int64)
+    if rows:
+        embeddings = np.stack([np.frombuffer(embedding, dtype=np.float32) for _, embedding in rows])
+    else:
+        embeddings = np.empty((0, 0), dtype=np.float32)
+    return photo_ids, embeddings
+
+
+def _needs_ivf(signature: Signature) -> bool:
+    return signature[0] >= settings.FACE_IVF_MIN_FACES
+
+
+def _load_stored(event_id: int, signature: Signature, photo_ids: np.ndarray, embeddings: np.ndarray) -> Optional[FaceIndex]:
+    storage = get_storage()
+    key = index_key(event_id)
+    if not storage.exists(key):
+        return None
+    with storage.open(key) as f:
+        stored = np.load(io.BytesIO(f.read()))
+    if tuple(stored["signature"]) != signature:
+        return None
+    return FaceIndex(photo_ids, embeddings, centroids=stored["centroids"], assignment=stored["assignment"])
+
+
+def _store(event_id: int, signature: Signature, index: FaceIndex) -> None:
+    fd, path = tempfile.mkstemp(suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, signature=np.array(signature, dtype=np.int64), centroids=index.centroids, assignment=index.assignment)
+        get_storage().put_file(index_key(event_id), path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _remember(event_id: int, cached: _Cached) -> None:
+    with _cache_lock:
+        _cache[event_id] = cached
+        _cache.move_to_end(event_id)
+        while len(_cache) > _MAX_CACHED_EVENTS:
+            _cache.popitem(last=False)
+
+
+def get_event_index(db: Session, event_id: int) -> FaceIndex:
+    """
+    The event's face index, cached until faces are added or removed. Never trains:
+    large events use the index stored by `refresh`, or brute force until it catches up.
+    """
+    signature = _signature(db, event_id)
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(event_id)
+        if cached and cached.signature == signature:
+            _cache.move_to_end(event_id)
+            if cached.complete or now - cached.loaded_at < STALE_RECHECK_SECONDS:
+                return cached.index
+
+    if cached and cached.signature == signature:
+        photo_ids, embeddings = cached.index.photo_ids, cached.index.embeddings
+    else:
+        photo_ids, embeddings = _load_embeddings(db, event_id)
+    index = None
+    if _needs_ivf(signature):
+        try:
+            index = _load_stored(event_id, signature, photo_ids, embeddings)
+        except Exception:
+            logger.exception("Loading the face index of event %s failed", event_id)
+    complete = index is not None or not _needs_ivf(signature)
+    if index is None:
+        index = FaceIndex(photo_ids, embeddings)
+    _remember(event_id, _Cached(signature, index, complete, now))
+    return index
+
+
+def refresh(db: Session, event_id: int) -> Signature:
+    """
+    Train and store the event's IVF index if it is large enough to need one.
+    Returns the signature of the faces it covers.
+    """
+    signature = _signature(db, event_id)
+    if not _needs_ivf(signature):
+        return signature
+    photo_ids, embeddings = _load_embeddings(db, event_id)
+    index = FaceIndex(photo_ids, embeddings, ivf_min_faces=settings.FACE_IVF_MIN_FACES)
+    _store(event_id, signature, index)
+    _remember(event_id, _Cached(signature, index, True, time.monotonic()))
+    return signature
+
+
+def run_job(job: jobs.JobContext) -> None:
+    """Job task: rebuild an event's stored face index."""
+    event_id = job.payload["event_id"]
+    db = SessionLocal()
+    try:
+        # Faces indexed while this job runs cannot queue another one, so catch up here
+        for _ in range(3):
+            if refresh(db, event_id) == _signature(db, event_id):
+                break
+    finally:
+        db.close()
+
+
+_pending: Set[int] = set()
+_pending_lock = threading.Lock()
+
+
+def _refresh_later(event_id: int) -> None:
+    with _pending_lock:
+        _pending.discard(event_id)
+    db = SessionLocal()
+    try:
+        refresh(db, event_id)
+    except Exception:
+        logger.exception("Rebuilding the face index of event %s failed", event_id)
+    finally:
+        db.close()
+
+
+def schedule_refresh(event_id: int) -> None:
+    """
+    Rebuild the event's index FACE_INDEX_REFRESH_DELAY_SECONDS from now, unless a
+    rebuild is already pending, so a bulk upload retrains it a few times rather than per photo.
+    """
+    delay = settings.FACE_INDEX_REFRESH_DELAY_SECONDS
+    if settings.JOB_QUEUE_ENABLED:
+        db = SessionLocal()
+        try:
+            jobs.enqueue(
+                db, "face_index", {"event_id": event_id}, dedupe_key=f"face_index:{event_id}",
+                run_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=delay),
+            )
+        finally:
+            db.close()
+        return
+    with _pending_lock:
+        if event_id in _pending:
+            return
+        _pending.add(event_id)
+    timer = threading.Timer(delay, _refresh_later, args=(event_id,))
+    timer.daemon = True
+    timer.start()
@@ -0,0 +1,160 @@
+"""
+Face detection and embedding for selfie search.
+
+Photos are indexed offline: the face indexer runs in the derivative process pool
+on each photo's web-size derivative and stores one L2-normalized embedding per
+detected face. A search only embeds the selfie and compares it with the event's
+stored embeddings (see face_index.py).
+
+opencv-python-headless and onnxruntime are imported lazily, so the API runs
+without them while FACE_INDEX_ENABLED is off.
+"""
+import logging
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import jobs
+from app.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_INPUT_SIZE = 112
+# Landmark positions (eyes, nose, mouth corners) of the canonical 112x112 ArcFace crop
+ARCFACE_TEMPLATE = np.array(
+    [
+        [38.2946, 51.6963],
+        [73.5318, 51.5014],
+        [56.0252, 71.7366],
+        [41.5493, 92.3655],
+        [70.7299, 92.2041],
+    ],
+    dtype=np.float32,
+)
+
+_models = None
+
+
+def _load_models():
+    """Load the detector and embedding model once per process."""
+    global _models
+    if _models is None:
+        try:
+            import cv2
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("Face search requires opencv-python-headless and onnxruntime")
+        if not settings.FACE_DETECTOR_MODEL or not settings.FACE_EMBEDDING_MODEL:
+            raise RuntimeError("FACE_DETECTOR_MODEL and FACE_EMBEDDING_MODEL must point to ONNX model files")
+        detector = cv2.FaceDetectorYN.create(
+            settings.FACE_DETECTOR_MODEL, "", (320, 320), settings.FACE_MIN_DETECTION_SCORE
+        )
+        embedder = onnxruntime.InferenceSession(
+            settings.FACE_EMBEDDING_MODEL, providers=["CPUExecutionProvider"]
+        )
+        _models = (cv2, detector, embedder)
+    return _models
+
+
+def decode_image(data: bytes) -> Optional[np.ndarray]:
+    cv2, _, _ = _load_models()
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def encode_faces(image: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Detect every face in a BGR image and embed them in one batched model run.
+
+    Returns dicts with the bounding box, detection score and normalized float32 embedding.
+    """
+    cv2, detector, embedder = _load_models()
+    height, width = image.shape[:2]
+    detector.setInputSize((width, height))
+    _, detections = detector.detect(image)
+    if detections is None:
+        return []
+
+    crops = []
+    for detection in detections:
+        landmarks = detection[4:14].reshape(5, 2).astype(np.float32)
+        matrix, _ = cv2.estimateAffinePartial2D(landmarks, ARCFACE_TEMPLATE, method=cv2.LMEDS)
+        crops.append(cv2.warpAffine(image, matrix, (EMBEDDING_INPUT_SIZE, EMBEDDING_INPUT_SIZE)))
+    batch = np.stack(crops)[..., ::-1].astype(np.float32)  # BGR -> RGB
+    batch = ((batch - 127.5) / 127.5).transpose(0, 3, 1, 2)
+    embeddings = embedder.run(None, {embedder.get_inputs()[0].name: batch})[0].astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    faces = []
+    for detection, embedding in zip(detections, embeddings):
+        x, y, w, h = (int(v) for v in detection[:4])
+        faces.append({
+            "x": x, "y": y, "width": w, "height": h,
+            "score": float(detection[14]),
+            "embedding": embedding,
+        })
+    return faces
+
+
+def index_photo(storage_key: str) -> List[Dict[str, Any]]:
+    """Detect and embed the faces of one stored image. Runs inside a pool process."""
+    data = b"".join(get_storage().read_range(storage_key))
+    image = decode_image(data)
+    if image is None:
+        raise ValueError(f"Could not decode image {storage_key}")
+    faces = encode_faces(image)
+    for face in faces:
+        face["embedding"] = face["embedding"].tobytes()
+    return faces
+
+
+def save_faces(event_id: int, photo_id: int, faces: List[Dict[str, Any]]) -> None:
+    db = SessionLocal()
+    try:
+        db.query(models.PhotoFace).filter(models.PhotoFace.photo_id == photo_id).delete()
+        db.add_all(models.PhotoFace(event_id=event_id, photo_id=photo_id, **face) for face in faces)
+        db.query(models.Photo).filter(models.Photo.id == photo_id).update({"faces_indexed": True})
+        db.commit()
+    finally:
+        db.close()
+
+
+def _on_done(event_id: int, photo_id: int, future: Future) -> None:
+    from app.services import face_index
+
+    try:
+        save_faces(event_id, photo_id, future.result())
+        face_index.schedule_refresh(event_id)
+    except Exception:
+        logger.exception("Indexing faces for photo %s failed", photo_id)
+
+
+def run_job(job: jobs.JobContext) -> Dict[str, Any]:
+    """Job task: index one photo's faces on the derivative pool."""
+    from app.services import face_index
+    from app.services.derivatives import get_pool
+
+    found = get_pool().submit(index_photo, job.payload["web_key"]).result()
+    save_faces(job.payload["event_id"], job.payload["photo_id"], found)
+    face_index.schedule_refresh(job.payload["event_id"])
+    return {"faces": len(found)}
+
+
+def schedule(event_id: int, photo_id: int, web_key: Optional[str]) -> None:
+    """Queue face indexing of a photo's web-size derivative on the derivative pool (or the job queue)."""
+    if not settings.FACE_INDEX_ENABLED or not web_key:
+        return
+    if settings.JOB_QUEUE_ENABLED:
+        db = SessionLocal()
+        try:
+            jobs.enqueue(db, "faces", {"event_id": event_id, "photo_id": photo_id, "web_key": web_key})
+        finally:
+            db.close()
+        return
+    from app.services.derivatives import get_pool
+
+    future = get_pool().submit(index_photo, web_key)
+    future.add_done_callback(lambda f: _on_done(event_id, photo_id, f))
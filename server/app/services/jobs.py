@@ -0,0 +1,342 @@
+"""
+Postgres-backed background job queue.
+
+Jobs are rows in the jobs table; no broker is involved. Workers (`python worker.py`)
+claim the highest-priority due job with SELECT ... FOR UPDATE SKIP LOCKED, so
+any number of them can poll the same table without handing out a job twice or
+waiting on each other's locks. A claimed job is marked running under the
+worker's id. The worker then refreshes locked_at as a heartbeat. If the
+heartbeat goes stale for JOB_LEASE_SECONDS, the worker is presumed dead and
+the job goes back to the queue.
+
+A job that raises is retried with exponential backoff until it has used
+max_attempts, and is then left failed with its last error. Because the queue
+lives in the database, jobs can be enqueued in the same transaction as the
+rows they are about (pass commit=False).
+"""
+import datetime
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.upsert import insert_for
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Progress is written at most this often per job
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+def _values(kind: str, payload: Dict[str, Any], priority: int, max_attempts: Optional[int],
+            dedupe_key: Optional[str], run_at: Optional[datetime.datetime]) -> Dict[str, Any]:
+    now = datetime.datetime.utcnow()
+    return {
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "priority": priority,
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "run_at": run_at or now,
+        "dedupe_key": dedupe_key,
+        "processed": 0,
+        "total": 0,
+        "created_at": now,
+    }
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    *,
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+    dedupe_key: Optional[str] = None,
+    run_at: Optional[datetime.datetime] = None,
+    commit: bool = True,
+) -> models.Job:
+    """
+    Queue a job and return it. If `dedupe_key` is given and a job with that key is
+    already queued or running, that job is returned instead of adding another.
+    """
+    table = models.Job.__table__
+    stmt = insert_for(db)(table).values(**_values(kind, payload, priority, max_attempts, dedupe_key, run_at))
+    if dedupe_key is not None:
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=[table.c.dedupe_key], index_where=table.c.status.in_(ACTIVE_STATUSES)
+        )
+    job_id = db.execute(stmt.returning(table.c.id)).scalar()
+    if job_id is None:
+        job = db.query(models.Job).filter(
+            models.Job.dedupe_key == dedupe_key, models.Job.status.in_(ACTIVE_STATUSES)
+        ).first()
+    else:
+        job = db.get(models.Job, job_id)
+    if commit:
+        db.commit()
+        db.refresh(job)
+    return job
+
+
+def enqueue_many(
+    db: Session, kind: str, payloads: Iterable[Dict[str, Any]], *, priority: int = 0, commit: bool = True
+) -> None:
+    """Queue one job per payload in a single INSERT."""
+    rows = [_values(kind, payload, priority, None, None, None) for payload in payloads]
+    if rows:
+        db.execute(models.Job.__table__.insert(), rows)
+        if commit:
+            db.commit()
+
+
+def latest(db: Session, dedupe_key: str) -> Optional[models.Job]:
+    """The most recent job enqueued under `dedupe_key`, whatever its status."""
+    return db.query(models.Job).filter(models.Job.dedupe_key == dedupe_key).order_by(models.Job.id.desc()).first()
+
+
+def retry(db: Session, job: models.Job) -> None:
+    """Put a failed job back in the queue with a fresh set of attempts."""
+    job.status = "queued"
+    job.attempts = 0
+    job.run_at = datetime.datetime.utcnow()
+    job.finished_at = None
+    db.commit()
+
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before the next attempt, after `attempts` failed ones."""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    # Jitter keeps jobs that failed together (e.g. storage was down) from retrying in lockstep
+    return delay * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class JobContext:
+    """What a task function gets: the job's identity, its payload and a way to report progress."""
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempt: int
+    _last_progress: float = field(default=0.0, repr=False)
+
+    def set_progress(self, processed: int, total: Optional[int] = None, force: bool = False) -> None:
+        now = datetime.datetime.utcnow().timestamp()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_progress = now
+        values = {"processed": processed}
+        if total is not None:
+            values["total"] = total
+        db = SessionLocal()
+        try:
+            db.query(models.Job).filter(models.Job.id == self.id).update(values)
+            db.commit()
+        finally:
+            db.close()
+
+
+Task = Callable[[JobContext], Optional[Dict[str, Any]]]
+
+
+def claim(db: Session, worker_id: str, kinds: List[str]) -> Optional[JobContext]:
+    """Lock the next due job of one of `kinds`, mark it running and commit; None if there is none."""
+    now = datetime.datetime.utcnow()
+    job = (
+        db.query(models.Job)
+        .filter(models.Job.status == "queued", models.Job.run_at <= now, models.Job.kind.in_(kinds))
+        .order_by(models.Job.priority.desc(), models.Job.run_at, models.Job.id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+    job.status = "running"
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    job.started_at = now
+    context = JobContext(id=job.id, kind=job.kind, payload=job.payload, attempt=job.attempts)
+    db.commit()
+    return context
+
+
+def _finish(db: Session, worker_id: str, job_id: int, values: Dict[str, Any]) -> None:
+    # Guarded by locked_by: if the lease was lost and another worker took over, its result wins
+    db.query(models.Job).filter(
+        models.Job.id == job_id, models.Job.status == "running", models.Job.locked_by == worker_id
+    ).update({**values, "locked_by": None, "locked_at": None})
+    db.commit()
+
+
+def succeed(db: Session, worker_id: str, job_id: int, result: Optional[Dict[str, Any]]) -> None:
+    _finish(db, worker_id, job_id, {
+        "status": "succeeded",
+        "result": result,
+        "last_error": None,
+        "finished_at": datetime.datetime.utcnow(),
+    })
+
+
+def fail(db: Session, worker_id: str, job_id: int, error: str) -> None:
+    """Schedule a retry after a backoff, or mark the job failed if it is out of attempts."""
+    job = db.get(models.Job, job_id)
+    now = datetime.datetime.utcnow()
+    if job.attempts < job.max_attempts:
+        values = {"status": "queued", "run_at": now + datetime.timedelta(seconds=backoff(job.attempts))}
+    else:
+        values = {"status": "failed", "finished_at": now}
+    _finish(db, worker_id, job_id, {**values, "last_error": error})
+
+
+def heartbeat(db: Session, worker_id: str, job_ids: List[int]) -> None:
+    if job_ids:
+        db.query(models.Job).filter(
+            models.Job.id.in_(job_ids), models.Job.locked_by == worker_id
+        ).update({"locked_at": datetime.datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+
+
+def reap(db: Session) -> int:
+    """
+    Requeue running jobs whose worker stopped heartbeating, and delete finished
+    jobs past retention. Safe to run from every worker at once.
+    """
+    now = datetime.datetime.utcnow()
+    stale = now - datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    running = db.query(models.Job).filter(models.Job.status == "running", models.Job.locked_at < stale)
+    requeued = running.filter(models.Job.attempts < models.Job.max_attempts).update(
+        {"status": "queued", "run_at": now, "locked_by": None, "locked_at": None,
+         "last_error": "Worker stopped responding"},
+        synchronize_session=False,
+    )
+    running.update(
+        {"status": "failed", "finished_at": now, "locked_by": None, "locked_at": None,
+         "last_error": "Worker stopped responding"},
+        synchronize_session=False,
+    )
+    db.query(models.Job).filter(
+        models.Job.finished_at < now - datetime.timedelta(days=settings.JOB_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return requeued
+
+
+class Worker:
+    """
+    Runs jobs of the given task kinds on a thread pool of `concurrency` threads,
+    with at most `kind_limits[kind]` jobs of one kind at a time.
+
+    CPU-heavy tasks hand their work to the derivative process pool, so threads
+    here mostly wait on I/O.
+    """
+
+    def __init__(
+        self,
+        tasks: Dict[str, Task],
+        concurrency: int = 1,
+        kind_limits: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.tasks = tasks
+        self.concurrency = concurrency
+        self.kind_limits = kind_limits or {}
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Event()
+        self._stop = threading.Event()
+
+    def _claimable_kinds(self) -> List[str]:
+        with self._lock:
+            if len(self._running) >= self.concurrency:
+                return []
+            counts: Dict[str, int] = {}
+            for kind in self._running.values():
+                counts[kind] = counts.get(kind, 0) + 1
+        return [
+            kind for kind in self.tasks
+            if counts.get(kind, 0) < self.kind_limits.get(kind, self.concurrency)
+        ]
+
+    def _run(self, context: JobContext) -> None:
+        db = SessionLocal()
+        try:
+            try:
+                result = self.tasks[context.kind](context)
+            except Exception:
+                logger.exception("Job %s (%s) failed on attempt %s", context.id, context.kind, context.attempt)
+                fail(db, self.id, context.id, traceback.format_exc(limit=5))
+            else:
+                succeed(db, self.id, context.id, result)
+        except Exception:
+            # The lease runs out and another worker retries the job
+            logger.exception("Recording the outcome of job %s failed", context.id)
+        finally:
+            db.close()
+            with self._lock:
+                self._running.pop(context.id, None)
+            self._slot_freed.set()
+
+    def _maintain(self) -> None:
+        while not self._stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                with self._lock:
+                    job_ids = list(self._running)
+                heartbeat(db, self.id, job_ids)
+                requeued = reap(db)
+                if requeued:
+                    logger.warning("Requeued %s job(s) from unresponsive workers", requeued)
+            except Exception:
+                logger.exception("Job heartbeat failed")
+            finally:
+                db.close()
+
+    def stop(self, *args: Any) -> None:
+        """Stop claiming jobs; `run` returns once the running ones have finished."""
+        self._stop.set()
+        self._slot_freed.set()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        maintainer = threading.Thread(target=self._maintain, name="job-heartbeat", daemon=True)
+        maintainer.start()
+        logger.info("Worker %s running %s", self.id, ", ".join(self.tasks))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as pool:
+            while not self._stop.is_set():
+                kinds = self._claimable_kinds()
+                context = None
+                if kinds:
+                    db = SessionLocal()
+                    try:
+                        context = claim(db, self.id, kinds)
+                    except Exception:
+                        logger.exception("Claiming a job failed")
+                    finally:
+                        db.close()
+                if context is None:
+                    # Idle or at capacity: wait for a poll interval or a finished job
+                    self._slot_freed.wait(settings.JOB_POLL_SECONDS)
+                    self._slot_freed.clear()
+                    continue
+                with self._lock:
+                    self._running[context.id] = context.kind
+                pool.submit(self._run, context)
@@ -0,0 +1,162 @@
+"""
+Perceptual hashing and near-duplicate ("burst") clustering.
+
+Each photo gets a 64-bit difference hash (dHash). Frames from the same burst
+differ by only a few bits, so an event's photos are grouped by Hamming distance
+with a BK-tree and galleries can show one representative per group.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+
+HASH_SIZE = 8
+_SIGN_BIT = 1 << 63
+_MASK = (1 << 64) - 1
+
+
+def hash_input(image) -> np.ndarray:
+    """Shrink a PIL image to the 9x8 grey pixels its dHash is computed from."""
+    from PIL import Image
+
+    return np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+
+
+def dhash_pixels(pixels: np.ndarray) -> List[int]:
+    """
+    dHash of a stack of `hash_input` arrays in one vectorised pass: compare each
+    pixel with its right-hand neighbour. Returns unsigned 64-bit ints.
+    """
+    if not len(pixels):
+        return []
+    bits = pixels[:, :, 1:] > pixels[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(pixels), -1), axis=1)
+    return [int(v) for v in packed.view(">u8").ravel()]
+
+
+def dhash_batch(images: Sequence) -> List[int]:
+    """dHash of many PIL images at once."""
+    if not images:
+        return []
+    return dhash_pixels(np.stack([hash_input(image) for image in images]))
+
+
+def to_db(value: int) -> int:
+    """Unsigned 64-bit hash -> signed BIGINT."""
+    return value - (1 << 64) if value & _SIGN_BIT else value
+
+
+def from_db(value: int) -> int:
+    return value & _MASK
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree over 64-bit hashes keyed by Hamming distance."""
+
+    def __init__(self):
+        self.root: Optional[list] = None  # [hash, item, {distance: child}]
+
+    def add(self, value: int, item: int) -> None:
+        if self.root is None:
+            self.root = [value, item, {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, item, {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[int]:
+        """Items within `radius` bits of `value`."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.append(node[1])
+            for d, child in node[2].items():
+                if distance - radius <= d <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def cluster(photos: Iterable[Tuple[int, Optional[int]]], threshold: int) -> Dict[int, List[int]]:
+    """
+    Group (photo_id, phash) pairs into near-duplicate clusters.
+
+    Photos are visited in id order; the first unassigned photo of a group becomes its
+    representative. Photos without a hash are their own cluster. Returns
+    {representative_id: [member ids, representative first]}.
+    """
+    photos = sorted(photos)
+    tree = BKTree()
+    hashes = {}
+    for photo_id, phash in photos:
+        if phash is not None:
+            hashes[photo_id] = from_db(phash)
+            tree.add(hashes[photo_id], photo_id)
+
+    clusters: Dict[int, List[int]] = {}
+    assigned = set()
+    for photo_id, _ in photos:
+        if photo_id in assigned:
+            continue
+        members = [photo_id]
+        if photo_id in hashes:
+            members += sorted(
+                m for m in tree.search(hashes[photo_id], threshold)
+                if m != photo_id and m not in assigned
+            )
+        assigned.update(members)
+        clusters[photo_id] = members
+    return clusters
+
+
+_MAX_CACHED_EVENTS = 64
+_cache: "OrderedDict[Tuple[int, int], Tuple[Tuple[int, ...], List[int]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _version(db: Session, event_id: int) -> Tuple[int, ...]:
+    # Photos get new ids when added and a hash once, so these change whenever the clusters can
+    return tuple(db.query(
+        func.count(models.Photo.id), func.max(models.Photo.id), func.count(models.Photo.phash)
+    ).filter(models.Photo.event_id == event_id).one())
+
+
+def event_representatives(db: Session, event_id: int, threshold: int) -> List[int]:
+    """
+    Ids of one representative photo per burst in the event, in id order.
+
+    Clusters are cached per (event, threshold) and keyed by one aggregate over the
+    event's photos; the (id, phash) rows are only read when that version changes.
+    """
+    version = _version(db, event_id)
+    key = (event_id, threshold)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == version:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    rows = db.query(models.Photo.id, models.Photo.phash).filter(models.Photo.event_id == event_id).all()
+    representatives = sorted(cluster(rows, threshold))
+    with _cache_lock:
+        _cache[key] = (version, representatives)
+        _cache.move_to_end(key)
+        while len(_cache) > _MAX_CACHED_EVENTS:
+            _cache.popitem(last=False)
+    return representatives
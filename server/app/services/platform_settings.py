@@ -0,0 +1,105 @@
+"""
+Process-local snapshot of the SuperAdminSettings singleton.
+
+Platform-wide switches such as maintenance_mode are checked on every request,
+so they are read from memory instead of the database. The snapshot is loaded at
+startup and replaced immediately when this worker changes the settings. Other
+workers pick the change up from a background poll every
+SUPER_ADMIN_SETTINGS_POLL_SECONDS. The poll reads only the row's id and version
+and loads the row when they differ from the snapshot's.
+
+Every update increments the version, and a snapshot is never replaced by an
+older version of the same row. So a poll that read the row just before this
+worker saved a change cannot roll the snapshot back.
+"""
+import logging
+import threading
+from typing import Optional, Tuple
+
+from app import models, schemas
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_snapshot: Optional[schemas.SuperAdminSettings] = None
+# (id, version) of the row the snapshot was taken from
+_version: Optional[Tuple[int, int]] = None
+_loaded = False
+_lock = threading.Lock()
+_stop = threading.Event()
+_poller: Optional[threading.Thread] = None
+
+
+def update(row: Optional[models.SuperAdminSettings]) -> None:
+    """
+    Replace the snapshot with a freshly committed row, or None after a delete.
+    An older version of the row the snapshot already has is ignored.
+    """
+    global _snapshot, _version, _loaded
+    snapshot = schemas.SuperAdminSettings.model_validate(row) if row is not None else None
+    version = (row.id, row.version) if row is not None else None
+    with _lock:
+        if version and _version and version[0] == _version[0] and version[1] < _version[1]:
+            return
+        _snapshot = snapshot
+        _version = version
+        _loaded = True
+
+
+def load() -> Optional[schemas.SuperAdminSettings]:
+    db = SessionLocal()
+    try:
+        update(db.query(models.SuperAdminSettings).first())
+    finally:
+        db.close()
+    return _snapshot
+
+
+def current() -> Optional[schemas.SuperAdminSettings]:
+    """The snapshot without touching the database; None if not loaded yet or no settings exist."""
+    return _snapshot
+
+
+def get() -> Optional[schemas.SuperAdminSettings]:
+    """The snapshot, loading it first if this process has not yet."""
+    return _snapshot if _loaded else load()
+
+
+def refresh() -> None:
+    """Reload the snapshot if the row's id or version differs from the snapshot's."""
+    db = SessionLocal()
+    try:
+        version = db.query(models.SuperAdminSettings.id, models.SuperAdminSettings.version).first()
+        if (tuple(version) if version else None) != _version:
+            update(db.query(models.SuperAdminSettings).first())
+    finally:
+        db.close()
+
+
+def _poll() -> None:
+    while not _stop.wait(settings.SUPER_ADMIN_SETTINGS_POLL_SECONDS):
+        try:
+            refresh()
+        except Exception:
+            logger.exception("Refreshing super admin settings failed")
+
+
+def start() -> None:
+    """Load the snapshot and start polling for changes made by other workers."""
+    global _poller
+    try:
+        load()
+    except Exception:
+        # Do not keep the API from starting; the poller retries
+        logger.exception("Loading super admin settings failed")
+    if _poller is None and settings.SUPER_ADMIN_SETTINGS_POLL_SECONDS > 0:
+        _stop.clear()
+        _poller = threading.Thread(target=_poll, name="super-admin-settings", daemon=True)
+        _poller.start()
+
+
+def stop() -> None:
+    global _poller
+    _stop.set()
+    _poller = None
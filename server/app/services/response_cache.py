@@ -0,0 +1,279 @@
+"""
+Response cache with strong ETags for the public gallery reads.
+
+Each cached response depends on one or more scopes ("events", "event:<id>",
+"photos:<event id>"). A scope's version is read from rows the write paths
+already maintain:
+- events.updated_at for an event
+- event_stats.photo_revision for its photos, bumped by every photo insert and
+  derivative save but not by download or face search counts (read through the
+  event, so deleting it counts as a change)
+- the event count, latest update and photo revisions for the listing
+
+A response is stored with the versions read before it was computed. If any has
+changed since, the entry is stale. Each worker keeps the versions it read for
+RESPONSE_CACHE_VERSION_TTL_SECONDS, so a repeated request, 304 or not, needs no
+database access. Commits that change a scope in this worker drop its version at
+once (write paths mark the scope with `changed`, event rows are picked up from
+the session); other workers' changes are seen once the version expires.
+
+ETags are hashes of the response body, so two workers that computed the same
+body independently hand out the same ETag. While a scope's version is unchanged
+and the body is cached, a matching If-None-Match is answered with 304 and any
+other request with the cached body. Either way the request costs one
+primary-key lookup instead of the full query.
+
+Keys only include the query parameters the endpoint declares. Bodies larger than
+RESPONSE_CACHE_MAX_ENTRY_BYTES are not cached, and the least recently used
+entries are evicted beyond RESPONSE_CACHE_MAX_ENTRIES or RESPONSE_CACHE_MAX_BYTES.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+
+def _version_query(scope: str):
+    if scope == "events":
+        return select(
+            func.count(models.Event.id),
+            func.max(models.Event.updated_at),
+            select(func.sum(models.EventStats.photo_revision)).scalar_subquery(),
+        )
+    kind, _, event_id = scope.partition(":")
+    if kind == "event":
+        return select(models.Event.updated_at).where(models.Event.id == int(event_id))
+    if kind == "photos":
+        # Joined from the event so a deleted event without a stats row still changes version
+        return (
+            select(models.Event.id, models.EventStats.photo_revision)
+            .outerjoin(models.EventStats, models.EventStats.event_id == models.Event.id)
+            .where(models.Event.id == int(event_id))
+        )
+    raise ValueError(f"Unknown cache scope: {scope}")
+
+
+async def _read_version(db: AsyncSession, scope: str) -> str:
+    row = (await db.execute(_version_query(scope))).first()
+    return repr(tuple(row)) if row is not None else "none"
+
+
+async def versions(db: AsyncSession, scopes: Sequence[str]) -> Tuple[str, ...]:
+    """The current version of each scope: remembered by this worker, or read by `db`."""
+    cache = get_response_cache()
+    if cache is None:
+        return tuple([await _read_version(db, scope) for scope in scopes])
+    tokens = []
+    for scope in scopes:
+        token = cache.known_version(scope)
+        if token is None:
+            generation = cache.generation
+            token = await _read_version(db, scope)
+            cache.remember_version(scope, token, generation)
+        tokens.append(token)
+    return tuple(tokens)
+
+
+@dataclass
+class Entry:
+    tokens: Tuple[str, ...]
+    etag: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+@dataclass
+class Lookup:
+    """What a handler needs to store the response it computes after a miss."""
+    key: str
+    tokens: Tuple[str, ...]
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, max_bytes: int, max_entry_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._bytes = 0
+        # scope -> (version, time.monotonic() when read)
+        self._versions: Dict[str, Tuple[str, float]] = {}
+        # Bumped by every invalidation, so a version read before one is not remembered after it
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+
+    def known_version(self, scope: str) -> Optional[str]:
+        with self._lock:
+            known = self._versions.get(scope)
+            if known is None or time.monotonic() - known[1] > settings.RESPONSE_CACHE_VERSION_TTL_SECONDS:
+                return None
+            return known[0]
+
+    def remember_version(self, scope: str, token: str, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._versions[scope] = (token, time.monotonic())
+            # Versions of scopes nobody asked for in a while only take memory
+            if len(self._versions) > self.max_entries:
+                expired = time.monotonic() - settings.RESPONSE_CACHE_VERSION_TTL_SECONDS
+                self._versions = {s: v for s, v in self._versions.items() if v[1] >= expired}
+
+    def invalidate(self, scopes: Sequence[str]) -> None:
+        """Forget the versions of `scopes`, so the next request reads them again."""
+        with self._lock:
+            self.generation += 1
+            for scope in scopes:
+                self._versions.pop(scope, None)
+
+    def get(self, key: str, tokens: Tuple[str, ...]) -> Optional[Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.tokens != tokens:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, tokens: Tuple[str, ...], body: bytes, headers: Dict[str, str]) -> Entry:
+        entry = Entry(
+            tokens=tokens,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            body=body,
+            headers=headers,
+        )
+        if len(body) > self.max_entry_bytes:
+            return entry
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+
+@lru_cache
+def get_response_cache() -> Optional[ResponseCache]:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    return ResponseCache(
+        settings.RESPONSE_CACHE_MAX_ENTRIES,
+        settings.RESPONSE_CACHE_MAX_BYTES,
+        settings.RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    )
+
+
+def _key(request: Request) -> str:
+    # Undeclared parameters do not change the response, so they must not add entries
+    route = request.scope.get("route")
+    declared = {param.alias for param in route.dependant.query_params} if route is not None else None
+    params = sorted(
+        f"{k}={v}" for k, v in request.query_params.multi_items() if declared is None or k in declared
+    )
+    return f"{request.url.path}?{'&'.join(params)}"
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def _response(request: Request, entry: Entry) -> Response:
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+async def lookup(
+    request: Request, db: AsyncSession, scopes: Sequence[str]
+) -> Tuple[Optional[Response], Optional[Lookup]]:
+    """
+    The cached response for this request, or (None, lookup) on a miss.
+
+    Call with the session the handler reads from, before reading, and pass the lookup to `store`.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return None, None
+    key = _key(request)
+    tokens = await versions(db, scopes)
+    entry = cache.get(key, tokens)
+    if entry is None:
+        cache.misses += 1
+        return None, Lookup(key, tokens)
+    if _matches(request.headers.get("if-none-match"), entry.etag):
+        cache.not_modified += 1
+    else:
+        cache.hits += 1
+    return _response(request, entry), None
+
+
+@lru_cache
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def store(
+    request: Request,
+    lookup: Optional[Lookup],
+    response_type: Any,
+    value: Any,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serialize a freshly computed result as `response_type`, cache it and answer the request with it."""
+    adapter = _adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+    cache = get_response_cache()
+    if cache is None or lookup is None:
+        return Response(content=body, media_type="application/json", headers=headers)
+    return _response(request, cache.put(lookup.key, lookup.tokens, body, headers or {}))
+
+
+def changed(db: Session, *scopes: str) -> None:
+    """Mark `scopes` as changed by `db`'s transaction; their versions are dropped when it commits."""
+    db.info.setdefault("response_cache_scopes", set()).update(scopes)
+
+
+# Invalidate on commit, not on flush: dropping a version before the change is
+# visible would let a concurrent request remember the old one again.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_events(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.Event) and obj.id is not None:
+            changed(session, f"event:{obj.id}", "events")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_scopes(session: Session) -> None:
+    scopes = session.info.pop("response_cache_scopes", None)
+    cache = get_response_cache()
+    if scopes and cache:
+        cache.invalidate(list(scopes))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_scopes(session: Session) -> None:
+    session.info.pop("response_cache_scopes", None)
@@ -0,0 +1,188 @@
+"""
+Cache of authenticated users keyed by the JWT `sub`.
+
+get_current_user runs on every authenticated request; with the cache a
+dashboard's burst of API calls costs one user lookup instead of one per call.
+Entries expire after USER_CACHE_TTL_SECONDS and are dropped as soon as a change
+to the user is committed through the ORM.
+
+The default backend is an in-process LRU. Setting USER_CACHE_REDIS_URL shares
+the cache (and its invalidations) between workers; it needs the redis package.
+Its client blocks, so invalidations from AsyncSession commits, which run on the
+event loop, are handed to the loop's default executor.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# hashed_password is deliberately not cached: it is only needed by the login
+# endpoints, which always load the user themselves
+CACHED_COLUMNS = ("id", "email", "full_name", "is_active", "is_superuser", "role")
+
+
+class LocalBackend:
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return values
+
+    def set(self, key: str, values: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisBackend:
+    # The redis client is synchronous; async callers run it in the threadpool
+    blocking = True
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("USER_CACHE_REDIS_URL requires the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def __len__(self) -> int:
+        return 0
+
+    def _key(self, key: str) -> str:
+        return f"user-cache:{key}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(self._key(key))
+        return json.loads(data) if data else None
+
+    def set(self, key: str, values: Dict[str, Any]) -> None:
+        self.client.set(self._key(key), json.dumps(values), px=int(self.ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+
+class UserCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def get(self, sub: str) -> Optional[models.User]:
+        """The cached user as a detached instance, or None on a miss."""
+        values = await self._call(self.backend.get, sub)
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        user = models.User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    async def set(self, sub: str, user: models.User) -> None:
+        await self._call(self.backend.set, sub, {column: getattr(user, column) for column in CACHED_COLUMNS})
+
+    def _delete(self, key: str) -> None:
+        try:
+            self.backend.delete(key)
+        except Exception:
+            logger.exception("Invalidating cached user %s failed", key)
+
+    def invalidate(self, user_id: int) -> None:
+        self.invalidations += 1
+        if self.backend.blocking:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                # Called from an AsyncSession commit: do not block the event loop
+                loop.run_in_executor(None, self._delete, str(user_id))
+                return
+        self.backend.delete(str(user_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+@lru_cache
+def get_user_cache() -> Optional[UserCache]:
+    """The process's user cache, or None when USER_CACHE_TTL_SECONDS is 0."""
+    if settings.USER_CACHE_TTL_SECONDS <= 0:
+        return None
+    if settings.USER_CACHE_REDIS_URL:
+        return UserCache(RedisBackend(settings.USER_CACHE_REDIS_URL, settings.USER_CACHE_TTL_SECONDS))
+    return UserCache(LocalBackend(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS))
+
+
+# Invalidate on commit, not on flush: invalidating before the new row is visible
+# would let a concurrent request re-cache the old values.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop("changed_user_ids", None)
+    cache = get_user_cache()
+    if changed and cache:
+        for user_id in changed:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+from app.core.config import settings
+from .base import Part, Storage
+from .local import LocalStorage
+
+
+@lru_cache
+def get_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.STORAGE_LOCAL_ROOT, public_url=settings.STORAGE_PUBLIC_URL)
+    if settings.STORAGE_BACKEND == "s3":
+        from .s3 import S3Storage
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_url=settings.STORAGE_PUBLIC_URL,
+        )
+    raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+
+def event_prefix(event_id: int) -> str:
+    """Prefix of every object that belongs to an event (originals, derivatives, face index)."""
+    return f"events/{event_id}/"
+
+
+def is_event_key(event_id: int, key: str) -> bool:
+    """Whether `key` is under the event's prefix, without `.` or `..` segments that could leave it."""
+    return key.startswith(event_prefix(event_id)) and all(
+        segment not in ("", ".", "..") for segment in key.split("/")
+    )
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, List, Optional
+
+
+@dataclass
+class Part:
+    number: int
+    size: int
+    etag: str
+
+
+class Storage:
+    """
+    Minimal object-store interface. Keys are '/'-separated relative paths.
+    """
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """Open an object for sequential binary reading."""
+        raise NotImplementedError
+
+    def read_range(
+        self, key: str, start: int = 0, end: Optional[int] = None, chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of an object in chunks."""
+        raise NotImplementedError
+
+    def put_file(self, key: str, path: str) -> None:
+        """Store the local file at `path` under `key`. The local file is consumed."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def delete_many(self, keys: List[str]) -> None:
+        """Delete several objects; missing keys are ignored. Backends with batch deletes override this."""
+        for key in keys:
+            self.delete(key)
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        """Keys of all objects under `prefix`."""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public URL clients use to fetch the object."""
+        raise NotImplementedError
+
+    # Multipart uploads. Parts are numbered from 1 and may arrive in any order.
+
+    def create_multipart(self, key: str) -> str:
+        """Start a multipart upload for `key` and return its upload id."""
+        raise NotImplementedError
+
+    def upload_part(self, key: str, upload_id: str, number: int, path: str) -> Part:
+        """Store the local file at `path` as part `number`. The local file is consumed."""
+        raise NotImplementedError
+
+    def list_parts(self, key: str, upload_id: str) -> List[Part]:
+        raise NotImplementedError
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Part]) -> None:
+        """Join `parts` (in order) into the final object at `key`."""
+        raise NotImplementedError
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+    def presign_part(self, key: str, upload_id: str, number: int, expires_in: int) -> Optional[str]:
+        """URL the client can PUT a part to directly, or None if the backend has no such thing."""
+        return None
@@ -0,0 +1,105 @@
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Iterator, List, Optional
+
+from app.storage.base import Part, Storage
+
+MULTIPART_DIR = ".multipart"
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, public_url: str = ""):
+        self.root = os.path.abspath(root)
+        self.public_url = public_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Storage key escapes storage root: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def read_range(
+        self, key: str, start: int = 0, end: Optional[int] = None, chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        with self.open(key) as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def put_file(self, key: str, path: str) -> None:
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        base = self.path(prefix)
+        for dirpath, _, filenames in os.walk(base):
+            for name in sorted(filenames):
+                yield os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def _parts_dir(self, upload_id: str) -> str:
+        return self.path(f"{MULTIPART_DIR}/{upload_id}")
+
+    def create_multipart(self, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._parts_dir(upload_id))
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, number: int, path: str) -> Part:
+        parts_dir = self._parts_dir(upload_id)
+        if not os.path.isdir(parts_dir):
+            raise FileNotFoundError(f"Unknown multipart upload: {upload_id}")
+        size = os.path.getsize(path)
+        # The move is a rename on the same filesystem, so a retried part atomically replaces the old one
+        shutil.move(path, os.path.join(parts_dir, f"{number:05d}"))
+        return Part(number=number, size=size, etag=str(size))
+
+    def list_parts(self, key: str, upload_id: str) -> List[Part]:
+        parts_dir = self._parts_dir(upload_id)
+        parts = []
+        for name in sorted(os.listdir(parts_dir)):
+            if name.isdigit():
+                size = os.path.getsize(os.path.join(parts_dir, name))
+                parts.append(Part(number=int(name), size=size, etag=str(size)))
+        return parts
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Part]) -> None:
+        parts_dir = self._parts_dir(upload_id)
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_target = os.path.join(parts_dir, "assembled")
+        with open(tmp_target, "wb") as out:
+            for part in parts:
+                with open(os.path.join(parts_dir, f"{part.number:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+        os.replace(tmp_target, target)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._parts_dir(upload_id), ignore_errors=True)
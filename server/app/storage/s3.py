@@ -0,0 +1,129 @@
+import os
+from typing import BinaryIO, Iterator, List, Optional
+
+from app.storage.base import Part, Storage
+
+
+class S3Storage(Storage):
+    """
+    Storage on any S3-compatible service (AWS S3, MinIO, R2, ...).
+
+    boto3 is only imported when this backend is selected.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: str = "",
+    ):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("The S3 storage backend requires boto3 (pip install boto3)")
+        self._client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.bucket = bucket
+        self.public_url = (public_url or f"{endpoint_url or 'https://s3.amazonaws.com'}/{bucket}").rstrip("/")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except self._client_error as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+    def read_range(
+        self, key: str, start: int = 0, end: Optional[int] = None, chunk_size: int = 1024 * 1024
+    ) -> Iterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        body = self.client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def put_file(self, key: str, path: str) -> None:
+        self.client.upload_file(path, self.bucket, key)
+        os.remove(path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_many(self, keys: List[str]) -> None:
+        # DeleteObjects takes at most 1000 keys per request
+        for i in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True},
+            )
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def create_multipart(self, key: str) -> str:
+        return self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, number: int, path: str) -> Part:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            response = self.client.upload_part(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=f
+            )
+        os.remove(path)
+        return Part(number=number, size=size, etag=response["ETag"])
+
+    def list_parts(self, key: str, upload_id: str) -> List[Part]:
+        parts = []
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+            for p in page.get("Parts", []):
+                parts.append(Part(number=p["PartNumber"], size=p["Size"], etag=p["ETag"]))
+        return parts
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[Part]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": p.number, "ETag": p.etag} for p in parts]},
+        )
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except self._client_error as e:
+            # Already aborted or completed; aborting is retried by cleanup jobs
+            if e.response["Error"]["Code"] != "NoSuchUpload":
+                raise
+
+    def presign_part(self, key: str, upload_id: str, number: int, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": number},
+            ExpiresIn=expires_in,
+        )
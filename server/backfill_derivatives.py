@@ -0,0 +1,52 @@
+import argparse
+
+from sqlalchemy import or_
+
+from app import models
+from app.db.session import SessionLocal
+from app.services.derivatives import batches, get_pool, render_batch, save_derivative_keys
+
+BATCH_SIZE = 500
+
+def backfill(event_id=None):
+    print("Generating derivatives and perceptual hashes for photos missing them...")
+    db = SessionLocal()
+    pool = get_pool()
+    done = failed = 0
+    last_id = 0
+    try:
+        while True:
+            query = db.query(models.Photo.id, models.Photo.event_id, models.Photo.storage_key).filter(
+                models.Photo.storage_key.isnot(None),
+                or_(models.Photo.thumbnail_key.is_(None), models.Photo.phash.is_(None)),
+                models.Photo.id > last_id,
+            )
+            if event_id:
+                query = query.filter(models.Photo.event_id == event_id)
+            batch = query.order_by(models.Photo.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+            photos = [(photo.event_id, photo.id, photo.storage_key) for photo in batch]
+            futures = [pool.submit(render_batch, chunk) for chunk in batches(photos)]
+            for future in futures:
+                for _, photo_id, keys, error in future.result():
+                    try:
+                        if keys is None:
+                            raise RuntimeError(error)
+                        save_derivative_keys(photo_id, keys)
+                        done += 1
+                    except Exception as e:
+                        failed += 1
+                        print(f"ERROR: photo {photo_id}: {e}")
+            print(f"{done} done, {failed} failed")
+    finally:
+        db.close()
+        pool.shutdown()
+    print(f"SUCCESS: generated derivatives for {done} photo(s), {failed} failed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill thumbnail/preview/web derivatives")
+    parser.add_argument("--event-id", type=int, default=None, help="Only backfill this event")
+    args = parser.parse_args()
+    backfill(args.event_id)
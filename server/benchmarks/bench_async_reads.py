@@ -0,0 +1,73 @@
+"""
+Load benchmark: sync vs async read paths.
+
+Fires the same event-listing query through a sync `def` handler (threadpool +
+SessionLocal, how every endpoint used to work) and through the real async
+`/api/v1/events/` handler, at the same concurrency, and prints throughput and
+latency for each. Needs the configured Postgres with some events in it and
+httpx installed.
+
+    cd server && python -m benchmarks.bench_async_reads --concurrency 200 --requests 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.db.session import get_db
+from app.main import app
+
+
+@app.get("/__bench__/sync/events")
+def sync_read_events(db: Session = Depends(get_db)):
+    return [schemas.Event.model_validate(e) for e in db.query(models.Event).limit(100).all()]
+
+
+async def run(client: httpx.AsyncClient, path: str, concurrency: int, total: int):
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(concurrency: int, total: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in (
+            ("sync  (threadpool)", "/__bench__/sync/events"),
+            ("async (asyncpg)   ", "/api/v1/events/"),
+        ):
+            await run(client, path, concurrency, min(total, 200))  # warm up pools
+            result = await run(client, path, concurrency, total)
+            print(
+                f"{label}  {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests))
@@ -0,0 +1,75 @@
+"""
+Load benchmark: login throughput under concurrency.
+
+Registers a benchmark user (once) and fires concurrent logins at the real
+`/api/v1/auth/login` handler, printing throughput, latency and how many
+requests were turned away with 429 by the password hashing pool. Run it with
+different PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_QUEUE / PASSWORD_BCRYPT_ROUNDS
+to size the pool. Needs the configured Postgres and httpx installed.
+
+    cd server && python -m benchmarks.bench_login --concurrency 100 --requests 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "bench-login-password"
+
+
+async def run(client: httpx.AsyncClient, concurrency: int, total: int):
+    latencies = []
+    rejected = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal rejected
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            if response.status_code == 429:
+                rejected += 1
+                continue
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "rejected": rejected,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000 if latencies else 0.0,
+    }
+
+
+async def main(concurrency: int, total: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 400 when the user already exists from an earlier run
+        await client.post(
+            "/api/v1/auth/register", json={"email": EMAIL, "password": PASSWORD, "full_name": "Bench"}
+        )
+        result = await run(client, concurrency, total)
+        print(
+            f"bcrypt rounds {settings.PASSWORD_BCRYPT_ROUNDS}, "
+            f"workers {settings.PASSWORD_HASH_WORKERS or 'cpu'}, queue {settings.PASSWORD_HASH_MAX_QUEUE}: "
+            f"{result['rps']:7.1f} logins/s  p50 {result['p50_ms']:7.1f} ms  "
+            f"p99 {result['p99_ms']:7.1f} ms  429s {result['rejected']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests))
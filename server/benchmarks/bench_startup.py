@@ -0,0 +1,85 @@
+"""
+Startup benchmark: how long a fresh worker takes before it can serve.
+
+Each run starts a new interpreter (so nothing is cached in sys.modules) and
+measures three phases: importing `app.main`, running the lifespan startup, and
+answering the first request to /api/v1/health. It prints the median of each
+phase over all runs. With --importtime it also lists the slowest imports of one
+run, which is where to look when cold start regresses. Needs httpx installed.
+The database may be unreachable: startup must not depend on it.
+
+    cd server && python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = r"""
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/api/v1/health")).raise_for_status()
+        return started, time.perf_counter()
+
+started, served = asyncio.run(first_request())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (started - imported) * 1000,
+    "first_request_ms": (served - started) * 1000,
+}))
+"""
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(count: int) -> list:
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(runs: int, importtime: bool):
+    results = [run_once() for _ in range(runs)]
+    for phase in ("import_ms", "lifespan_ms", "first_request_ms"):
+        values = [r[phase] for r in results]
+        print(f"{phase:18} median {statistics.median(values):8.1f}  max {max(values):8.1f}")
+    total = [r["import_ms"] + r["lifespan_ms"] + r["first_request_ms"] for r in results]
+    print(f"{'total_ms':18} median {statistics.median(total):8.1f}  max {max(total):8.1f}")
+    if importtime:
+        print("\nslowest imports (cumulative us):")
+        for micros, module in slowest_imports(25):
+            print(f"{micros:10}  {module}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args()
+    main(args.runs, args.importtime)
@@ -0,0 +1,79 @@
+"""
+Test setup: the app runs against a throwaway SQLite database and local storage.
+
+Each test gets empty tables. SQLite only enforces foreign keys (and so ON DELETE
+CASCADE) when asked to on every connection, which the engines here do.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="photo-asset-tests-")
+os.environ.update(
+    STORAGE_BACKEND="local",
+    STORAGE_LOCAL_ROOT=os.path.join(_tmp, "storage"),
+    DERIVATIVES_ENABLED="false",
+    JOB_QUEUE_ENABLED="false",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.db.session as session
+from app.db.base import Base
+from app import models  # noqa: F401 - registers the tables
+
+# test_event_photos.py is a manual script against a running server
+collect_ignore = ["test_event_photos.py"]
+
+_url = os.path.join(_tmp, "test.db")
+session.engine = create_engine(f"sqlite:///{_url}", connect_args={"check_same_thread": False})
+session.SessionLocal.configure(bind=session.engine)
+session.async_engine = create_async_engine(f"sqlite+aiosqlite:///{_url}")
+session.AsyncSessionLocal.configure(bind=session.async_engine)
+
+
+def _foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+event.listen(session.engine, "connect", _foreign_keys)
+event.listen(session.async_engine.sync_engine, "connect", _foreign_keys)
+
+from app.main import app  # noqa: E402
+from app.services import analytics  # noqa: E402
+from app.services.response_cache import get_response_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def tables():
+    Base.metadata.drop_all(session.engine)
+    Base.metadata.create_all(session.engine)
+    get_response_cache.cache_clear()
+    yield
+    # Hits recorded by this test must not land in the next test's tables
+    analytics.buffer.flush()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    db = session.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def event_id(client) -> int:
+    response = client.post("/api/v1/events/", json={"name": "Test Event"})
+    assert response.status_code == 200
+    return response.json()["id"]
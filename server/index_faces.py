@@ -0,0 +1,60 @@
+import argparse
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import face_index
+from app.services.derivatives import get_pool
+from app.services.faces import index_photo, save_faces
+
+BATCH_SIZE = 200
+
+def index_faces(event_id=None):
+    print("Indexing faces for photos that have not been indexed...")
+    db = SessionLocal()
+    pool = get_pool()
+    done = failed = faces_found = 0
+    last_id = 0
+    event_ids = set()
+    try:
+        while True:
+            query = db.query(models.Photo.id, models.Photo.event_id, models.Photo.web_key).filter(
+                models.Photo.web_key.isnot(None),
+                models.Photo.faces_indexed.is_(False),
+                models.Photo.id > last_id,
+            )
+            if event_id:
+                query = query.filter(models.Photo.event_id == event_id)
+            batch = query.order_by(models.Photo.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+            futures = [(photo, pool.submit(index_photo, photo.web_key)) for photo in batch]
+            for photo, future in futures:
+                try:
+                    found = future.result()
+                    save_faces(photo.event_id, photo.id, found)
+                    faces_found += len(found)
+                    event_ids.add(photo.event_id)
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"ERROR: photo {photo.id}: {e}")
+            print(f"{done} done, {failed} failed, {faces_found} faces")
+        # Searches only load the trained index, so build it once per event now
+        for eid in sorted(event_ids):
+            print(f"Rebuilding face index of event {eid}...")
+            face_index.refresh(db, eid)
+    finally:
+        db.close()
+        pool.shutdown()
+    print(f"SUCCESS: indexed {done} photo(s), {faces_found} face(s), {failed} failed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index faces of photos for selfie search")
+    parser.add_argument("--event-id", type=int, default=None, help="Only index this event")
+    args = parser.parse_args()
+    if not settings.FACE_DETECTOR_MODEL or not settings.FACE_EMBEDDING_MODEL:
+        print("ERROR: set FACE_DETECTOR_MODEL and FACE_EMBEDDING_MODEL first")
+    else:
+        index_faces(args.event_id)
@@ -0,0 +1,19 @@
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.event_stats import reconcile
+
+def reconcile_event_stats(event_id=None):
+    print("Recounting event photo counts and sizes...")
+    db = SessionLocal()
+    try:
+        repaired = reconcile(db, event_id)
+    finally:
+        db.close()
+    print(f"SUCCESS: repaired {repaired} event(s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repair drift in the event_stats counters")
+    parser.add_argument("--event-id", type=int, default=None, help="Only reconcile this event")
+    args = parser.parse_args()
+    reconcile_event_stats(args.event_id)
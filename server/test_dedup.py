@@ -0,0 +1,134 @@
+import hashlib
+
+import pytest
+
+from app import models
+from app.storage import get_storage
+
+
+@pytest.fixture
+def upload(client):
+    def upload(event_id: int, data: bytes) -> dict:
+        session = client.post("/api/v1/uploads/", json={"event_id": event_id, "filename": "a.jpg"}).json()
+        assert session["status"] == "uploading"
+        assert client.put(f"/api/v1/uploads/{session['id']}/parts/1", content=data).status_code == 200
+        photo = client.post(f"/api/v1/uploads/{session['id']}/complete").json()
+        return {"upload_id": session["id"], "storage_key": session["storage_key"], "photo": photo}
+    return upload
+
+
+def _photo(storage_key=None, **fields):
+    return {"title": "Photo", "url": "https://example.com/p.jpg", "storage_key": storage_key, **fields}
+
+
+def test_completed_upload_is_hashed_by_the_server(event_id, upload):
+    uploaded = upload(event_id, b"aaa")
+    assert uploaded["photo"]["content_hash"] == hashlib.sha256(b"aaa").hexdigest()
+
+
+def test_same_bytes_uploaded_twice_resolve_to_the_first_photo(client, db, event_id, upload):
+    first = upload(event_id, b"aaa")
+    second = upload(event_id, b"aaa")
+
+    assert second["photo"]["id"] == first["photo"]["id"]
+    assert client.get(f"/api/v1/uploads/{second['upload_id']}").json()["status"] == "duplicate"
+    assert not get_storage().exists(second["storage_key"])
+    assert db.query(models.Photo).filter(models.Photo.event_id == event_id).count() == 1
+
+
+def test_claimed_hash_on_upload_creation_is_ignored(client, db, event_id, upload):
+    first = upload(event_id, b"aaa")
+
+    session = client.post("/api/v1/uploads/", json={
+        "event_id": event_id, "filename": "b.jpg", "content_hash": first["photo"]["content_hash"],
+    }).json()
+    assert (session["status"], session["photo_id"]) == ("uploading", None)
+
+
+def test_same_bytes_in_another_event_are_not_a_duplicate(client, event_id, upload):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+
+    assert upload(event_id, b"aaa")["photo"]["id"] != upload(other, b"aaa")["photo"]["id"]
+
+
+def test_registering_an_uploaded_key_again_returns_its_photo(client, event_id, upload):
+    uploaded = upload(event_id, b"aaa")
+
+    response = client.post(
+        f"/api/v1/events/{event_id}/photos", json={**_photo(uploaded["storage_key"]), "event_id": event_id}
+    )
+    assert response.json()["id"] == uploaded["photo"]["id"]
+
+
+def test_claimed_hash_must_match_the_upload(client, event_id, upload):
+    uploaded = upload(event_id, b"aaa")
+    wrong = hashlib.sha256(b"bbb").hexdigest()
+
+    response = client.post(
+        f"/api/v1/events/{event_id}/photos",
+        json={**_photo(uploaded["storage_key"], content_hash=wrong), "event_id": event_id},
+    )
+    assert response.status_code == 422
+
+
+def test_claimed_hash_without_an_upload_is_not_trusted(client, event_id, upload, tmp_path):
+    uploaded = upload(event_id, b"aaa")
+    path = tmp_path / "elsewhere.jpg"
+    path.write_bytes(b"aaa")
+    get_storage().put_file(f"events/{event_id}/elsewhere.jpg", str(path))
+
+    response = client.post(f"/api/v1/events/{event_id}/photos", json={
+        **_photo(f"events/{event_id}/elsewhere.jpg", content_hash=uploaded["photo"]["content_hash"]),
+        "event_id": event_id,
+    })
+    assert response.json()["id"] != uploaded["photo"]["id"]
+    assert response.json()["content_hash"] is None
+
+
+def test_missing_object_is_rejected(client, event_id):
+    response = client.post(
+        f"/api/v1/events/{event_id}/photos", json={**_photo(f"events/{event_id}/missing.jpg"), "event_id": event_id}
+    )
+    assert response.status_code == 422
+
+    response = client.post(f"/api/v1/events/{event_id}/photos:batch", json=[_photo(f"events/{event_id}/missing.jpg")])
+    assert response.json()["errors"][0]["errors"][0]["loc"] == ["storage_key"]
+
+
+def test_batch_reports_duplicates_and_hash_errors(client, db, event_id, upload):
+    a = upload(event_id, b"aaa")
+    b = upload(event_id, b"bbb")
+
+    response = client.post(f"/api/v1/events/{event_id}/photos:batch", json=[
+        _photo(a["storage_key"]),
+        _photo(),
+        _photo(b["storage_key"], content_hash=a["photo"]["content_hash"]),
+        _photo(b["storage_key"]),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+
+    assert len(body["created_ids"]) == 1
+    assert body["duplicates"] == [
+        {"index": 0, "photo_id": a["photo"]["id"]},
+        {"index": 3, "photo_id": b["photo"]["id"]},
+    ]
+    assert [error["index"] for error in body["errors"]] == [2]
+    assert body["errors"][0]["errors"][0]["loc"] == ["content_hash"]
+    assert db.query(models.Photo).filter(models.Photo.event_id == event_id).count() == 3
+
+
+def test_storage_key_must_belong_to_the_event(client, db, event_id, upload):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+    foreign = upload(other, b"aaa")["storage_key"]
+
+    for key in (foreign, foreign.replace(f"events/{other}/", f"events/{event_id}/../{other}/"), "archives/a.zip"):
+        response = client.post(f"/api/v1/events/{event_id}/photos", json={**_photo(key), "event_id": event_id})
+        assert response.status_code == 422
+        response = client.post("/api/v1/photos/", json={**_photo(key), "event_id": event_id})
+        assert response.status_code == 422
+
+    response = client.post(f"/api/v1/events/{event_id}/photos:batch", json=[_photo(foreign)])
+    assert response.json()["created_ids"] == []
+    assert response.json()["errors"][0]["errors"][0]["loc"] == ["storage_key"]
+    assert db.query(models.Photo).filter(models.Photo.event_id == event_id).count() == 0
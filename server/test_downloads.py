@@ -0,0 +1,43 @@
+from app.services import downloads
+from app.storage import get_storage
+
+
+def _add_stored_photo(client, tmp_path, event_id: int, name: str) -> None:
+    path = tmp_path / name
+    path.write_bytes(name.encode())
+    key = f"events/{event_id}/originals/{name}"
+    get_storage().put_file(key, str(path))
+    client.post(f"/api/v1/events/{event_id}/photos", json={"title": name, "url": "u", "storage_key": key, "event_id": event_id})
+
+
+def test_archive_is_built_and_served(client, event_id, tmp_path):
+    _add_stored_photo(client, tmp_path, event_id, "a.jpg")
+
+    client.post(f"/api/v1/events/{event_id}/download")
+    job = client.get(f"/api/v1/events/{event_id}/download").json()
+    assert (job["status"], job["processed"]) == ("ready", 1)
+
+    response = client.get(job["download_url"], headers={"Range": "bytes=0-1"})
+    assert response.status_code == 206
+    assert response.content == b"PK"
+
+
+def test_new_version_replaces_the_old_archive(client, event_id, tmp_path):
+    _add_stored_photo(client, tmp_path, event_id, "a.jpg")
+    client.post(f"/api/v1/events/{event_id}/download")
+    _add_stored_photo(client, tmp_path, event_id, "b.jpg")
+    client.post(f"/api/v1/events/{event_id}/download")
+
+    keys = list(get_storage().list_keys(downloads.archive_prefix(event_id)))
+    assert len(keys) == 1
+    assert client.get(f"/api/v1/events/{event_id}/download").json()["status"] == "ready"
+
+
+def test_finished_jobs_are_forgotten(client, event_id, tmp_path, monkeypatch):
+    _add_stored_photo(client, tmp_path, event_id, "a.jpg")
+    client.post(f"/api/v1/events/{event_id}/download")
+    assert downloads._jobs
+
+    monkeypatch.setattr(downloads, "FINISHED_JOB_TTL_SECONDS", -1)
+    downloads.claim_job(event_id + 1, "other")
+    assert list(downloads._jobs) == [(event_id + 1, "other")]
@@ -0,0 +1,83 @@
+import datetime
+
+from app import models
+from app.services.downloads import archive_prefix
+from app.storage import get_storage
+
+
+def _store(tmp_path, key: str) -> str:
+    path = tmp_path / "object"
+    path.write_bytes(b"x")
+    get_storage().put_file(key, str(path))
+    return key
+
+
+def test_delete_cascades_to_every_child_row(client, db, event_id, tmp_path):
+    keys = [_store(tmp_path, f"events/{event_id}/originals/{i}.jpg") for i in range(3)]
+    client.post(
+        f"/api/v1/events/{event_id}/photos:batch",
+        json=[{"title": "Photo", "url": "u", "storage_key": key} for key in keys],
+    )
+    assert client.post("/api/v1/uploads/", json={"event_id": event_id, "filename": "big.jpg"}).status_code == 200
+    db.add(models.AnalyticsHourly(
+        event_id=event_id, hour=datetime.datetime(2024, 1, 1), kind="view", count=1
+    ))
+    db.commit()
+
+    response = client.delete(f"/api/v1/events/{event_id}")
+    assert response.status_code == 202
+
+    db.expire_all()
+    assert db.get(models.Event, event_id) is None
+    for model in (models.Photo, models.UploadSession, models.EventStats, models.AnalyticsHourly):
+        assert db.query(model).filter(model.event_id == event_id).count() == 0
+
+
+def test_storage_is_cleaned_after_the_delete(client, db, event_id, tmp_path):
+    keys = [_store(tmp_path, f"events/{event_id}/originals/{i}.jpg") for i in range(3)]
+    client.post(
+        f"/api/v1/events/{event_id}/photos:batch",
+        json=[{"title": "Photo", "url": "u", "storage_key": key} for key in keys],
+    )
+    _store(tmp_path, f"{archive_prefix(event_id)}old.zip")
+    unrelated = _store(tmp_path, "events/other/keep.jpg")
+
+    client.delete(f"/api/v1/events/{event_id}")
+
+    cleanup = client.get(f"/api/v1/events/{event_id}/cleanup").json()
+    assert cleanup["status"] == "done"
+    assert cleanup["processed"] == cleanup["total"] == 4
+    storage = get_storage()
+    assert not any(storage.exists(key) for key in keys)
+    assert list(storage.list_keys(archive_prefix(event_id))) == []
+    assert storage.exists(unrelated)
+    assert db.query(models.StorageCleanup).count() == 0
+
+
+def test_delete_missing_event(client):
+    assert client.delete("/api/v1/events/999").status_code == 404
+    assert client.get("/api/v1/events/999/cleanup").status_code == 404
+
+
+def test_objects_of_other_events_survive(client, db, event_id, tmp_path):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+    own = _store(tmp_path, f"events/{event_id}/originals/own.jpg")
+    foreign = _store(tmp_path, f"events/{other}/originals/theirs.jpg")
+    escaping = _store(tmp_path, f"events/{other}/originals/escaping.jpg")
+    # Rows written before storage keys were checked against the event
+    db.add_all([
+        models.Photo(title="own", url="u", event_id=event_id, storage_key=own),
+        models.Photo(title="foreign", url="u", event_id=event_id, storage_key=foreign, thumbnail_key=foreign),
+        models.Photo(
+            title="escaping", url="u", event_id=event_id,
+            storage_key=escaping.replace(f"events/{other}/", f"events/{event_id}/../{other}/"),
+        ),
+    ])
+    db.commit()
+
+    client.delete(f"/api/v1/events/{event_id}")
+
+    storage = get_storage()
+    assert not storage.exists(own)
+    assert storage.exists(foreign)
+    assert storage.exists(escaping)
@@ -0,0 +1,79 @@
+from app import models
+from app.core.config import settings
+from app.services import analytics, event_stats
+from app.storage import get_storage
+
+
+def _stats(client, event_id: int) -> dict:
+    response = client.get(f"/api/v1/events/{event_id}/stats")
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_increment_creates_then_adds(db, event_id):
+    event_stats.increment(db, event_id, photo_count=2, total_bytes=100)
+    event_stats.increment(db, event_id, total_bytes=50)
+    db.commit()
+
+    stats = db.get(models.EventStats, event_id)
+    assert (stats.photo_count, stats.total_bytes, stats.download_count) == (2, 150, 0)
+
+
+def test_event_without_photos_reads_zeros(client, event_id):
+    assert _stats(client, event_id)["photo_count"] == 0
+    assert client.get("/api/v1/events/999/stats").status_code == 404
+
+
+def test_photo_writes_count_their_event(client, event_id):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+    photo = {"title": "Photo", "url": "https://example.com/p.jpg"}
+
+    client.post(f"/api/v1/events/{event_id}/photos", json={**photo, "event_id": event_id})
+    client.post(f"/api/v1/events/{event_id}/photos:batch", json=[photo, photo])
+    client.post("/api/v1/photos/", json={**photo, "event_id": other})
+
+    assert _stats(client, event_id)["photo_count"] == 3
+    assert _stats(client, other)["photo_count"] == 1
+
+
+def test_reconcile_repairs_drift(client, db, event_id):
+    client.post(f"/api/v1/events/{event_id}/photos:batch", json=[{"title": "Photo", "url": "u"}] * 2)
+    db.query(models.EventStats).filter(models.EventStats.event_id == event_id).update({"photo_count": 99})
+    db.commit()
+
+    assert event_stats.reconcile(db) == 1
+    assert event_stats.reconcile(db) == 0
+    assert _stats(client, event_id)["photo_count"] == 2
+
+
+def test_analytics_flush_adds_downloads(client, event_id):
+    for _ in range(3):
+        analytics.buffer.record(event_id, "download")
+    analytics.buffer.record(event_id, "view")
+
+    assert analytics.buffer.flush() == 4
+    stats = _stats(client, event_id)
+    assert (stats["download_count"], stats["face_search_count"]) == (3, 0)
+
+
+
+def test_total_bytes_counted_at_create_without_derivatives(client, db, event_id, tmp_path):
+    assert not settings.DERIVATIVES_ENABLED
+    keys = []
+    for i, size in enumerate((10, 20, 30, 40)):
+        path = tmp_path / f"{i}.jpg"
+        path.write_bytes(b"x" * size)
+        keys.append(f"events/{event_id}/originals/{i}.jpg")
+        get_storage().put_file(keys[-1], str(path))
+
+    client.post(f"/api/v1/events/{event_id}/photos", json={"title": "a", "url": "u", "storage_key": keys[0], "event_id": event_id})
+    client.post("/api/v1/photos/", json={"title": "b", "url": "u", "storage_key": keys[1], "event_id": event_id})
+    client.post(f"/api/v1/events/{event_id}/photos:batch", json=[
+        {"title": "c", "url": "u", "storage_key": keys[2]},
+        {"title": "d", "url": "u", "storage_key": keys[3]},
+        {"title": "e", "url": "u"},
+    ])
+
+    stats = _stats(client, event_id)
+    assert (stats["photo_count"], stats["total_bytes"]) == (5, 100)
+    assert event_stats.reconcile(db) == 0
@@ -0,0 +1,139 @@
+import datetime
+
+import pytest
+
+from app import models
+from app.core.config import settings
+from app.services import jobs
+
+WORKER = "worker-a"
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(jobs, "backoff", lambda attempts: 0)
+
+
+def _age(db, job_id: int, **values) -> None:
+    db.query(models.Job).filter(models.Job.id == job_id).update(values)
+    db.commit()
+
+
+def test_enqueue_dedupes_active_jobs(db):
+    first = jobs.enqueue(db, "archive", {"event_id": 1}, dedupe_key="archive:1")
+    second = jobs.enqueue(db, "archive", {"event_id": 1}, dedupe_key="archive:1")
+    other = jobs.enqueue(db, "archive", {"event_id": 2}, dedupe_key="archive:2")
+
+    assert second.id == first.id
+    assert other.id != first.id
+    assert db.query(models.Job).count() == 2
+
+
+def test_claim_takes_highest_priority_due_job_of_the_given_kinds(db):
+    later = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    jobs.enqueue(db, "archive", {}, priority=5, run_at=later)
+    low = jobs.enqueue(db, "archive", {}, priority=0)
+    high = jobs.enqueue(db, "archive", {}, priority=1)
+    jobs.enqueue(db, "other", {}, priority=10)
+
+    claimed = [jobs.claim(db, WORKER, ["archive"]) for _ in range(3)]
+
+    assert [context.id for context in claimed[:2]] == [high.id, low.id]
+    assert claimed[2] is None
+    db.refresh(high)
+    assert (high.status, high.attempts, high.locked_by) == ("running", 1, WORKER)
+
+
+def test_failed_job_is_retried_until_out_of_attempts(db, no_backoff):
+    job = jobs.enqueue(db, "archive", {}, max_attempts=2)
+
+    for attempt in (1, 2):
+        context = jobs.claim(db, WORKER, ["archive"])
+        assert context.attempt == attempt
+        jobs.fail(db, WORKER, context.id, "boom")
+
+    db.refresh(job)
+    assert (job.status, job.last_error, job.locked_by) == ("failed", "boom", None)
+    assert job.finished_at is not None
+    assert jobs.claim(db, WORKER, ["archive"]) is None
+
+
+def test_failure_waits_for_backoff(db):
+    job = jobs.enqueue(db, "archive", {})
+    jobs.fail(db, WORKER, jobs.claim(db, WORKER, ["archive"]).id, "boom")
+
+    db.refresh(job)
+    assert job.status == "queued"
+    assert job.run_at > datetime.datetime.utcnow()
+    assert jobs.claim(db, WORKER, ["archive"]) is None
+
+
+def test_backoff_grows_and_is_capped():
+    assert settings.JOB_RETRY_BASE_SECONDS / 2 <= jobs.backoff(1) <= settings.JOB_RETRY_BASE_SECONDS
+    assert jobs.backoff(100) <= settings.JOB_RETRY_MAX_SECONDS
+
+
+def test_only_the_lease_holder_records_the_outcome(db):
+    job = jobs.enqueue(db, "archive", {})
+    context = jobs.claim(db, WORKER, ["archive"])
+
+    jobs.succeed(db, "worker-b", context.id, {"ok": True})
+    db.refresh(job)
+    assert job.status == "running"
+
+    jobs.succeed(db, WORKER, context.id, {"ok": True})
+    db.refresh(job)
+    assert (job.status, job.result, job.locked_by) == ("succeeded", {"ok": True}, None)
+
+
+def test_reap_requeues_stale_jobs_and_fails_exhausted_ones(db):
+    stale = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)
+    retried = jobs.enqueue(db, "archive", {}, max_attempts=3)
+    exhausted = jobs.enqueue(db, "archive", {}, max_attempts=1)
+    alive = jobs.enqueue(db, "archive", {})
+    for job in (retried, exhausted, alive):
+        jobs.claim(db, WORKER, ["archive"])
+    _age(db, retried.id, locked_at=stale)
+    _age(db, exhausted.id, locked_at=stale)
+
+    assert jobs.reap(db) == 1
+
+    for job in (retried, exhausted, alive):
+        db.refresh(job)
+    assert (retried.status, retried.locked_by) == ("queued", None)
+    assert retried.last_error == "Worker stopped responding"
+    assert exhausted.status == "failed"
+    assert alive.status == "running"
+
+
+def test_reap_deletes_finished_jobs_past_retention(db):
+    old = jobs.enqueue(db, "archive", {})
+    recent = jobs.enqueue(db, "archive", {})
+    now = datetime.datetime.utcnow()
+    _age(db, old.id, status="succeeded", finished_at=now - datetime.timedelta(days=settings.JOB_RETENTION_DAYS + 1))
+    _age(db, recent.id, status="succeeded", finished_at=now)
+
+    jobs.reap(db)
+
+    assert [job.id for job in db.query(models.Job)] == [recent.id]
+
+
+def test_retry_endpoint(client, db, no_backoff):
+    job = jobs.enqueue(db, "archive", {}, max_attempts=1, dedupe_key="archive:1")
+    jobs.fail(db, WORKER, jobs.claim(db, WORKER, ["archive"]).id, "boom")
+
+    response = client.post(f"/api/v1/jobs/{job.id}/retry")
+    assert response.status_code == 200
+    assert (response.json()["status"], response.json()["attempts"]) == ("queued", 0)
+    assert client.post(f"/api/v1/jobs/{job.id}/retry").status_code == 409
+
+
+def test_retry_endpoint_refuses_when_an_equivalent_job_is_active(client, db, no_backoff):
+    failed = jobs.enqueue(db, "archive", {}, max_attempts=1, dedupe_key="archive:1")
+    jobs.fail(db, WORKER, jobs.claim(db, WORKER, ["archive"]).id, "boom")
+    jobs.enqueue(db, "archive", {}, dedupe_key="archive:1")
+
+    response = client.post(f"/api/v1/jobs/{failed.id}/retry")
+    assert response.status_code == 409
+    db.refresh(failed)
+    assert failed.status == "failed"
@@ -0,0 +1,88 @@
+from app import models
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _add_photos(client, event_id: int, count: int) -> list:
+    ids = []
+    for i in range(count):
+        response = client.post(
+            f"/api/v1/events/{event_id}/photos",
+            json={"title": f"Photo {i}", "url": f"https://example.com/{i}.jpg", "event_id": event_id},
+        )
+        assert response.status_code == 200
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(7, 42)) == (7, 42)
+    assert decode_cursor(encode_cursor(None, 42)) == (None, 42)
+
+
+def test_event_photos_cursor_walks_every_photo_once(client, event_id):
+    ids = _add_photos(client, event_id, 7)
+
+    seen = []
+    params = {"limit": 3}
+    while True:
+        response = client.get(f"/api/v1/events/{event_id}/photos", params=params)
+        assert response.status_code == 200
+        seen.extend(photo["id"] for photo in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params = {"limit": 3, "cursor": cursor}
+
+    assert seen == ids
+
+
+def test_last_full_page_has_a_cursor_to_an_empty_page(client, event_id):
+    _add_photos(client, event_id, 4)
+
+    response = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 2, "skip": 2})
+    cursor = response.headers[NEXT_CURSOR_HEADER]
+    response = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 2, "cursor": cursor})
+    assert response.json() == []
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_event_photos_rejects_other_events_cursor(client, event_id):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+    _add_photos(client, other, 2)
+    cursor = client.get(f"/api/v1/events/{other}/photos", params={"limit": 1}).headers[NEXT_CURSOR_HEADER]
+
+    response = client.get(f"/api/v1/events/{event_id}/photos", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_invalid_cursor(client, event_id):
+    assert client.get(f"/api/v1/events/{event_id}/photos", params={"cursor": "zz"}).status_code == 400
+    assert client.get("/api/v1/photos/", params={"cursor": "zz"}).status_code == 400
+
+
+def test_photos_cursor_across_events(client, event_id):
+    other = client.post("/api/v1/events/", json={"name": "Other"}).json()["id"]
+    ids = _add_photos(client, event_id, 3) + _add_photos(client, other, 3)
+
+    seen = []
+    params = {"limit": 4}
+    while True:
+        response = client.get("/api/v1/photos/", params=params)
+        seen.extend(photo["id"] for photo in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+        params = {"limit": 4, "cursor": cursor}
+
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+
+def test_listing_includes_derivative_urls(client, db, event_id):
+    photo_id = _add_photos(client, event_id, 1)[0]
+    db.query(models.Photo).filter(models.Photo.id == photo_id).update({"thumbnail_key": f"events/{event_id}/t.jpg"})
+    db.commit()
+
+    photo = client.get("/api/v1/photos/", params={"event_id": event_id}).json()[0]
+    assert photo["thumbnail_url"].endswith(f"/events/{event_id}/t.jpg")
+    assert photo["preview_url"] is None
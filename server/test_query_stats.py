@@ -0,0 +1,60 @@
+import pytest
+
+import app.db.session as session
+from app import models
+from app.core.config import settings
+from app.db import query_stats, sql_profiler
+from app.db.query_stats import fingerprint
+
+
+@pytest.mark.parametrize("statement", [
+    "SELECT * FROM photos WHERE id = 1",
+    "SELECT * FROM photos WHERE id = 42",
+    "SELECT *\n  FROM photos   WHERE id = -7",
+])
+def test_literals_collapse(statement):
+    assert fingerprint(statement) == "SELECT * FROM photos WHERE id = ?"
+
+
+def test_placeholders_are_kept():
+    # They are the same on every execution already
+    assert fingerprint("SELECT * FROM photos WHERE id = %(id_1)s") == "SELECT * FROM photos WHERE id = %(id_1)s"
+
+
+def test_in_lists_collapse_whatever_their_length():
+    assert (
+        fingerprint("SELECT * FROM photos WHERE id IN (1, 2, 3)")
+        == fingerprint("SELECT * FROM photos WHERE id IN (?)")
+        == fingerprint("SELECT * FROM photos WHERE id IN ($1, $2)")
+        == "SELECT * FROM photos WHERE id IN (...)"
+    )
+
+
+def test_strings_collapse_but_names_do_not():
+    assert fingerprint("SELECT * FROM t1 WHERE name = 'it''s'") == "SELECT * FROM t1 WHERE name = ?"
+    assert fingerprint("SELECT * FROM photos WHERE id = 1") != fingerprint("SELECT * FROM events WHERE id = 1")
+
+
+def test_loop_of_lookups_is_one_repeated_statement(db, monkeypatch):
+    query_stats.install(session.engine)
+    monkeypatch.setattr(settings, "SQL_PROFILING_REPEAT_THRESHOLD", 3)
+
+    token = query_stats.start(profile=True)
+    try:
+        for i in range(4):
+            db.query(models.Event).filter(models.Event.id == i).first()
+        db.query(models.Photo).count()
+    finally:
+        stats = query_stats.stop(token)
+
+    assert stats.count == 5
+    assert len(stats.statements) == 2
+    repeats = sql_profiler.repeated(stats)
+    assert [r["count"] for r in repeats] == [4]
+    assert "FROM events" in repeats[0]["statement"]
+
+
+def test_nothing_collected_outside_a_request(db):
+    query_stats.install(session.engine)
+    db.query(models.Event).count()
+    assert query_stats.current() is None
@@ -0,0 +1,127 @@
+from sqlalchemy import update
+
+from app import models
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services import analytics, response_cache
+from app.services.response_cache import get_response_cache
+
+
+def _add_photo(client, event_id: int, title: str = "Photo") -> None:
+    response = client.post(f"/api/v1/events/{event_id}/photos", json={"title": title, "url": "u", "event_id": event_id})
+    assert response.status_code == 200
+
+
+def test_event_not_modified_until_updated(client, event_id):
+    etag = client.get(f"/api/v1/events/{event_id}").headers["etag"]
+
+    response = client.get(f"/api/v1/events/{event_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    client.put(f"/api/v1/events/{event_id}", json={"name": "Renamed"})
+    response = client.get(f"/api/v1/events/{event_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert response.headers["etag"] != etag
+
+
+def test_photos_not_modified_keeps_the_cursor(client, event_id):
+    for i in range(3):
+        _add_photo(client, event_id, f"p{i}")
+    first = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 2})
+    etag = first.headers["etag"]
+
+    response = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers[NEXT_CURSOR_HEADER] == first.headers[NEXT_CURSOR_HEADER]
+
+
+def test_new_photo_changes_the_photos_etag(client, event_id):
+    _add_photo(client, event_id)
+    etag = client.get(f"/api/v1/events/{event_id}/photos").headers["etag"]
+
+    _add_photo(client, event_id)
+    response = client.get(f"/api/v1/events/{event_id}/photos", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_etag_is_per_query(client, event_id):
+    for i in range(3):
+        _add_photo(client, event_id, f"p{i}")
+    etag = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 2}).headers["etag"]
+
+    response = client.get(f"/api/v1/events/{event_id}/photos", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_undeclared_parameters_share_an_entry(client, event_id):
+    cache = get_response_cache()
+    client.get(f"/api/v1/events/{event_id}")
+    hits = cache.hits
+
+    response = client.get(f"/api/v1/events/{event_id}", params={"utm_source": "mail"})
+    assert response.status_code == 200
+    assert cache.hits == hits + 1
+
+
+def test_deleted_event_is_not_served_from_cache(client, event_id):
+    client.get(f"/api/v1/events/{event_id}")
+    client.get(f"/api/v1/events/{event_id}/photos")
+
+    client.delete(f"/api/v1/events/{event_id}")
+    assert client.get(f"/api/v1/events/{event_id}").status_code == 404
+    assert client.get(f"/api/v1/events/{event_id}/photos").status_code == 404
+
+
+def test_analytics_flush_keeps_photo_pages_cached(client, event_id):
+    _add_photo(client, event_id)
+    etag = client.get(f"/api/v1/events/{event_id}/photos").headers["etag"]
+
+    analytics.buffer.record(event_id, "download")
+    analytics.buffer.record(event_id, "face_search")
+    analytics.buffer.flush()
+
+    response = client.get(f"/api/v1/events/{event_id}/photos", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_known_version_answers_without_the_database(client, event_id, monkeypatch):
+    etag = client.get(f"/api/v1/events/{event_id}").headers["etag"]
+    reads = []
+    read_version = response_cache._read_version
+
+    async def counting_read_version(db, scope):
+        reads.append(scope)
+        return await read_version(db, scope)
+
+    monkeypatch.setattr(response_cache, "_read_version", counting_read_version)
+    assert client.get(f"/api/v1/events/{event_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert reads == []
+
+    # Changes committed elsewhere are picked up once the remembered version expires
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_VERSION_TTL_SECONDS", 0)
+    assert client.get(f"/api/v1/events/{event_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert reads == [f"event:{event_id}"]
+
+
+def test_write_in_another_worker_is_seen_after_the_version_expires(client, db, event_id, monkeypatch):
+    _add_photo(client, event_id)
+    etag = client.get(f"/api/v1/events/{event_id}/photos").headers["etag"]
+    # Core update: nothing in this process marks the scope as changed
+    db.execute(
+        update(models.Photo.__table__).where(models.Photo.event_id == event_id).values(title="Changed")
+    )
+    db.execute(
+        update(models.EventStats.__table__).where(models.EventStats.event_id == event_id)
+        .values(photo_revision=models.EventStats.photo_revision + 1)
+    )
+    db.commit()
+
+    assert client.get(f"/api/v1/events/{event_id}/photos", headers={"If-None-Match": etag}).status_code == 304
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_VERSION_TTL_SECONDS", 0)
+    response = client.get(f"/api/v1/events/{event_id}/photos", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Changed"
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+import app.db.session as session
+from app import models
+from app.services import user_cache
+
+
+class RecordingBackend(user_cache.LocalBackend):
+    blocking = True
+
+    def __init__(self):
+        super().__init__(max_entries=10, ttl=60)
+        self.delete_threads = []
+
+    def delete(self, key: str) -> None:
+        self.delete_threads.append(threading.get_ident())
+        super().delete(key)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = user_cache.UserCache(RecordingBackend())
+    monkeypatch.setattr(user_cache, "get_user_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def user_id(db) -> int:
+    user = models.User(email="a@example.com", hashed_password="x", full_name="A")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_sync_commit_invalidates_before_returning(cache, db, user_id):
+    cache.backend.set(str(user_id), {"id": user_id})
+
+    db.get(models.User, user_id).full_name = "B"
+    db.commit()
+
+    assert cache.backend.get(str(user_id)) is None
+    assert cache.backend.delete_threads == [threading.get_ident()]
+
+
+def test_async_commit_does_not_block_the_event_loop(cache, user_id):
+    cache.backend.set(str(user_id), {"id": user_id})
+
+    async def rename() -> int:
+        async with session.AsyncSessionLocal() as db:
+            (await db.get(models.User, user_id)).full_name = "B"
+            await db.commit()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(rename())
+
+    assert cache.backend.get(str(user_id)) is None
+    assert cache.invalidations == 1
+    assert cache.backend.delete_threads and loop_thread not in cache.backend.delete_threads
@@ -0,0 +1,31 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.services import derivatives, downloads, event_cleanup, face_index, faces
+from app.services.jobs import Worker
+
+TASKS = {
+    "derivatives": derivatives.run_job,
+    "faces": faces.run_job,
+    "face_index": face_index.run_job,
+    "archive": downloads.run_job,
+    "event_cleanup": event_cleanup.run_job,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background jobs from the jobs table")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY, help="Jobs run at once")
+    parser.add_argument("--kinds", default=",".join(TASKS), help="Comma-separated job kinds to run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in TASKS]
+    if unknown:
+        print(f"ERROR: unknown job kind(s): {', '.join(unknown)}")
+    else:
+        Worker(
+            {kind: TASKS[kind] for kind in kinds},
+            concurrency=args.concurrency,
+            kind_limits=settings.JOB_KIND_CONCURRENCY,
+        ).run()
@@ -22,6 +22,26 @@ export interface Photo {
     title: string;
     url: string;
     event_id: number;
+    // Downscaled renditions; null until the derivatives have been generated
+    thumbnail_url: string | null;
+    preview_url: string | null;
+    web_url: string | null;
+}
+
+export interface EventSummary extends Event {
+    photo_count: number;
+    cover_photo: Photo | null;
+}
+
+export interface EventListParams {
+    status?: string;
+    event_type?: string;
+    date_from?: string;
+    date_to?: string;
+    q?: string;
+    sort?: string;
+    skip?: number;
+    limit?: number;
 }
 
 export interface PhotoCreate {
@@ -30,9 +50,34 @@ export interface PhotoCreate {
     event_id: number;
 }
 
+export interface AnalyticsCounts {
+    view: number;
+    photo_view: number;
+    download: number;
+    face_search: number;
+}
+
+export interface AnalyticsPoint extends AnalyticsCounts {
+    bucket: string;
+}
+
+export interface AnalyticsReport {
+    interval: 'hour' | 'day';
+    since: string;
+    until: string;
+    totals: AnalyticsCounts;
+    points: AnalyticsPoint[];
+}
+
+export interface AnalyticsParams {
+    since?: string;
+    until?: string;
+    interval?: 'hour' | 'day';
+}
+
 export const eventService = {
-    getAll: async () => {
-        const response = await api.get<Event[]>('/events/');
+    getAll: async (params?: EventListParams) => {
+        const response = await api.get<EventSummary[]>('/events/', { params });
         return response.data;
     },
 
@@ -64,5 +109,20 @@ export const eventService = {
     uploadPhoto: async (eventId: number, data: PhotoCreate) => {
         const response = await api.post<Photo>(`/events/${eventId}/photos`, data);
         return response.data;
+    },
+
+    // Gallery views are counted by the server when the photos are loaded
+    trackPhotoView: async (eventId: number) => {
+        await api.post(`/analytics/events/${eventId}`, { kind: 'photo_view' });
+    },
+
+    getAnalytics: async (eventId: number, params?: AnalyticsParams) => {
+        const response = await api.get<AnalyticsReport>(`/analytics/events/${eventId}`, { params });
+        return response.data;
+    },
+
+    getPlatformAnalytics: async (params?: AnalyticsParams) => {
+        const response = await api.get<AnalyticsReport>('/analytics/', { params });
+        return response.data;
     }
 };